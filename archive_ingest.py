@@ -0,0 +1,185 @@
+import hashlib
+import os
+import tarfile
+import zipfile
+from pathlib import PurePosixPath
+
+MAX_MEMBERS = int(os.getenv("ARCHIVE_MAX_MEMBERS", "2000"))
+MAX_TOTAL_BYTES = int(os.getenv("ARCHIVE_MAX_TOTAL_MB", "500")) * 1024 * 1024
+MAX_MEMBER_BYTES = int(os.getenv("ARCHIVE_MAX_MEMBER_MB", "20")) * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+class ArchiveLimitError(Exception):
+    """Raised when an archive exceeds the member count or uncompressed size limits."""
+
+class UnsupportedArchiveError(Exception):
+    """Raised when the upload is not a zip or tar(.gz) archive."""
+
+def archive_kind(filename):
+    name = filename.lower()
+    if name.endswith('.zip'):
+        return 'zip'
+    if name.endswith(('.tar.gz', '.tgz', '.tar')):
+        return 'tar'
+    return None
+
+def _is_candidate(name):
+    path = PurePosixPath(name)
+    if any(part.startswith('.') or part == '__MACOSX' for part in path.parts):
+        return False
+    return path.suffix.lower() == '.pdf'
+
+class ArchiveIngest:
+    """
+    Iterate the PDFs inside a zip or tar archive one member at a time.
+
+    Members are decompressed in chunks straight from the uploaded file, never
+    extracted to disk. Non-PDF members and byte-identical duplicates are skipped
+    and counted in the stats. Limits are enforced on the bytes actually
+    decompressed, not on sizes declared in archive headers.
+    """
+
+    def __init__(self, fileobj, filename, max_members=None, max_total_bytes=None, max_member_bytes=None):
+        self.kind = archive_kind(filename)
+        if self.kind is None:
+            raise UnsupportedArchiveError("Archive must be a .zip, .tar or .tar.gz file")
+
+        self.fileobj = fileobj
+        self.max_members = max_members or MAX_MEMBERS
+        self.max_total_bytes = max_total_bytes or MAX_TOTAL_BYTES
+        self.max_member_bytes = max_member_bytes or MAX_MEMBER_BYTES
+
+        self.members = 0
+        self.total_bytes = 0
+        self.pdfs = 0
+        self.skipped_non_pdf = 0
+        self.skipped_duplicates = 0
+        self.skipped_too_large = 0
+        self._seen_hashes = set()
+
+    def stats(self):
+        return {
+            "members": self.members,
+            "pdfs": self.pdfs,
+            "uncompressed_bytes": self.total_bytes,
+            "skipped_non_pdf": self.skipped_non_pdf,
+            "skipped_duplicates": self.skipped_duplicates,
+            "skipped_too_large": self.skipped_too_large
+        }
+
+    def _count_member(self):
+        self.members += 1
+        if self.members > self.max_members:
+            raise ArchiveLimitError(f"Archive has more than {self.max_members} members")
+
+    def _count_bytes(self, size):
+        self.total_bytes += size
+        if self.total_bytes > self.max_total_bytes:
+            raise ArchiveLimitError(f"Archive expands to more than {self.max_total_bytes // (1024 * 1024)} MB")
+
+    def _read_member(self, stream):
+        digest = hashlib.sha256()
+        chunks = []
+        size = 0
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            self._count_bytes(len(chunk))
+            size += len(chunk)
+            if size > self.max_member_bytes:
+                # Keep draining so the total limit still sees these bytes, but drop the data
+                chunks = None
+                continue
+            digest.update(chunk)
+            chunks.append(chunk)
+
+        if chunks is None:
+            self.skipped_too_large += 1
+            return None, None
+        return b"".join(chunks), digest.hexdigest()
+
+    def _accept(self, name, data, sha256):
+        if data is None:
+            return None
+        if not data.startswith(b"%PDF-"):
+            self.skipped_non_pdf += 1
+            return None
+        if sha256 in self._seen_hashes:
+            self.skipped_duplicates += 1
+            return None
+        self._seen_hashes.add(sha256)
+        self.pdfs += 1
+        return PurePosixPath(name).name, data, sha256
+
+    def _iter_zip(self):
+        with zipfile.ZipFile(self.fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                self._count_member()
+                if not _is_candidate(info.filename):
+                    self.skipped_non_pdf += 1
+                    continue
+                with archive.open(info) as stream:
+                    data, sha256 = self._read_member(stream)
+                accepted = self._accept(info.filename, data, sha256)
+                if accepted:
+                    yield accepted
+
+    def _iter_tar(self):
+        # Stream mode reads the archive strictly forwards, decompressing as it goes
+        with tarfile.open(fileobj=self.fileobj, mode="r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                self._count_member()
+                if not _is_candidate(member.name):
+                    self.skipped_non_pdf += 1
+                    # Skipped members still get decompressed to reach the next header
+                    self._count_bytes(member.size)
+                    continue
+                stream = archive.extractfile(member)
+                if stream is None:
+                    continue
+                data, sha256 = self._read_member(stream)
+                accepted = self._accept(member.name, data, sha256)
+                if accepted:
+                    yield accepted
+
+    def __iter__(self):
+        """Yield (filename, pdf_bytes, sha256) for each unique PDF member."""
+        try:
+            if self.kind == 'zip':
+                yield from self._iter_zip()
+            else:
+                yield from self._iter_tar()
+        except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+            raise UnsupportedArchiveError(f"Unable to read archive: {e}")
+
+def enqueue_archive(fileobj, filename, jd_id, jd_filename, job_title):
+    """
+    Create a job and queue every PDF in the archive as soon as it is decompressed,
+    so workers start parsing while the rest of the archive is still being read.
+
+    Returns (job_id, stats). On a limit violation the job is failed and the
+    ArchiveLimitError is re-raised.
+    """
+    from jobs import create_job, add_job_item, seal_job, fail_job
+
+    ingest = ArchiveIngest(fileobj, filename)
+    job_id = create_job(jd_id, jd_filename, job_title, source="archive")
+    if job_id is None:
+        return None, ingest.stats()
+
+    queued = 0
+    try:
+        for name, data, sha256 in ingest:
+            add_job_item(job_id, name, data, queued, sha256=sha256)
+            queued += 1
+    except (ArchiveLimitError, UnsupportedArchiveError) as e:
+        fail_job(job_id, str(e))
+        raise
+
+    seal_job(job_id, queued)
+    return job_id, ingest.stats()
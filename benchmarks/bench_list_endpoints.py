@@ -0,0 +1,139 @@
+"""
+Fetch, serialization and compression cost of /api/scores at 10k documents.
+
+    python -m benchmarks.bench_list_endpoints --scores 10000
+    python -m benchmarks.bench_list_endpoints --mongo-uri mongodb://localhost:27017
+
+Score documents are real get_detailed_score() results for synthetic resumes
+and JDs, stored through database.save_score(). Each stage is timed both ways:
+
+- fetch: find() plus a Python loop over _id, against the $toString aggregation;
+- encode: FastAPI's default (jsonable_encoder, then json) against orjson;
+- compress: gzip and brotli (if installed) on the encoded body;
+- end to end: GET /api/scores?limit=N per Accept-Encoding, with bytes on the wire.
+
+Without --mongo-uri the database is mongomock, which runs aggregations in
+Python, so its fetch numbers say little about a real server. The
+benchmark writes into DB_NAME "benchmark_list_endpoints" and drops it
+afterwards.
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.pop("GEMINI_API_KEY", None)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import compression
+import database
+from benchmarks.synthetic import jd_text, resume_text
+from fast_json import FastJSONResponse
+from llm_scorer import get_detailed_score
+from parsers.jd_parser import (extract_company_name, extract_experience_required, extract_job_title,
+                               extract_qualifications, extract_required_skills, extract_responsibilities)
+from parsers.resume_parser import resume_data_from_text
+
+DB_NAME = "benchmark_list_endpoints"
+
+def timed(function, repeats: int):
+    """Median seconds of repeats calls, and the last result."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+def connect(mongo_uri):
+    if mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000)
+    else:
+        import mongomock
+        client = mongomock.MongoClient()
+    database.db_client = client
+    database.db = client[DB_NAME]
+    database.ensure_indexes(database.db)
+    return client
+
+def jd_data(text):
+    return {
+        "job_title": extract_job_title(text),
+        "company": extract_company_name(text),
+        "required_skills": extract_required_skills(text),
+        "experience_required": extract_experience_required(text),
+        "qualifications": extract_qualifications(text),
+        "responsibilities": extract_responsibilities(text),
+        "raw_text": text[:500]
+    }
+
+def populate(count: int, distinct: int):
+    """Store count scores, cycling through `distinct` real scoring results."""
+    resumes = [resume_data_from_text(resume_text(seed), use_llm=False) for seed in range(distinct)]
+    jds = [jd_data(jd_text(seed)) for seed in range(max(1, distinct // 10))]
+    results = [get_detailed_score(resume, jds[i % len(jds)], use_llm=False) for i, resume in enumerate(resumes)]
+    for i in range(count):
+        database.save_score(f"resume-{i}", f"jd-{i % len(jds)}", results[i % distinct], f"resume-{i}.pdf", f"jd-{i % len(jds)}.pdf")
+
+def find_and_loop(limit: int):
+    # What the list endpoints did before the $toString projection
+    scores = list(database.db.scores.find().sort("timestamp", -1).limit(limit))
+    for score in scores:
+        score["_id"] = str(score["_id"])
+    return scores
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_list_endpoints")
+    parser.add_argument("--scores", type=int, default=10000)
+    parser.add_argument("--distinct", type=int, default=1000, help="distinct scoring results to cycle through")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--mongo-uri", help="real MongoDB instead of mongomock")
+    args = parser.parse_args(argv)
+
+    client = connect(args.mongo_uri)
+    try:
+        start = time.perf_counter()
+        populate(args.scores, args.distinct)
+        print(f"stored {args.scores} scores in {time.perf_counter() - start:.1f}s "
+              f"({'MongoDB' if args.mongo_uri else 'mongomock'})\n")
+
+        rows = []
+        loop_seconds, _ = timed(lambda: find_and_loop(args.scores), args.repeats)
+        projected_seconds, scores = timed(lambda: database.get_all_scores(0, args.scores), args.repeats)
+        rows.append(("fetch find + _id loop", loop_seconds, None))
+        rows.append(("fetch $toString", projected_seconds, None))
+
+        payload = {"status": "success", "count": len(scores), "data": scores}
+        default_seconds, default_body = timed(lambda: JSONResponse(jsonable_encoder(payload)).body, args.repeats)
+        orjson_seconds, body = timed(lambda: FastJSONResponse(payload).body, args.repeats)
+        rows.append(("encode jsonable_encoder + json", default_seconds, len(default_body)))
+        rows.append(("encode orjson", orjson_seconds, len(body)))
+
+        encodings = ["gzip"] + (["br"] if compression.brotli is not None else [])
+        for encoding in encodings:
+            seconds, compressed = timed(lambda: compression.compress(body, encoding), args.repeats)
+            rows.append((f"compress {encoding}", seconds, len(compressed)))
+
+        from fastapi.testclient import TestClient
+        from main import app
+        http = TestClient(app)
+        for encoding in ["identity"] + encodings:
+            def request():
+                response = http.get(f"/api/scores?limit={args.scores}", headers={"Accept-Encoding": encoding})
+                response.raise_for_status()
+                return response
+            seconds, response = timed(request, args.repeats)
+            rows.append((f"GET /api/scores ({encoding})", seconds, response.num_bytes_downloaded))
+
+        print(f"{'stage':<34} {'ms':>9} {'bytes':>12}")
+        for name, seconds, size in rows:
+            print(f"{name:<34} {seconds * 1000:>9.1f} {'' if size is None else f'{size:,}':>12}")
+    finally:
+        client.drop_database(DB_NAME)
+        client.close()
+
+if __name__ == "__main__":
+    main()
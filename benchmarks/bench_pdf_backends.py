@@ -0,0 +1,82 @@
+"""
+Throughput and field-extraction parity of the PDF text backends.
+
+    python -m benchmarks.bench_pdf_backends --resumes 300 --jds 50
+
+Every installed backend extracts the same synthetic PDFs. Throughput is
+reported in documents per second, and parity is the share of documents
+whose parsed fields match what the parsers extract from pdfminer's text.
+Gemini enhancement is disabled, so only the regex extraction is compared.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.pop("GEMINI_API_KEY", None)
+
+from benchmarks.synthetic import write_corpus
+from llm_scorer import calculate_education_score
+from parsers import jd_parser, resume_parser
+from parsers.pdf_text import BACKENDS, available_backends, looks_garbled
+
+RESUME_FIELDS = {
+    "name": resume_parser.extract_name,
+    "email": resume_parser.extract_email,
+    "phone": resume_parser.extract_phone,
+    "skills": lambda text: sorted(resume_parser.extract_skills(text)),
+    # The education text is compared verbatim, and so is the score the scorer derives from it
+    "education_text": resume_parser.extract_education,
+    "education_score": lambda text: calculate_education_score(
+        {"education": resume_parser.extract_education(text)}, {"qualifications": ["Bachelor degree"]}, use_llm=False
+    )[0],
+    "experience": resume_parser.extract_experience,
+    "projects": resume_parser.extract_projects,
+}
+JD_FIELDS = {
+    "job_title": jd_parser.extract_job_title,
+    "company": jd_parser.extract_company_name,
+    "location": jd_parser.extract_location,
+    "required_skills": lambda text: sorted(jd_parser.extract_required_skills(text)),
+    "experience_required": jd_parser.extract_experience_required,
+    "qualifications": jd_parser.extract_qualifications,
+    "responsibilities": jd_parser.extract_responsibilities,
+}
+
+def extract_all(backend, paths):
+    extract = BACKENDS[backend]
+    start = time.perf_counter()
+    texts = [extract(str(path)).replace("\r\n", "\n").replace("\r", "\n") for path in paths]
+    return texts, time.perf_counter() - start
+
+def parity(fields, reference_texts, texts):
+    """Share of documents per field whose extracted value equals the pdfminer one."""
+    matches = {field: 0 for field in fields}
+    for reference, text in zip(reference_texts, texts):
+        for field, extract in fields.items():
+            matches[field] += extract(reference) == extract(text)
+    return {field: count / len(texts) for field, count in matches.items()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_pdf_backends")
+    parser.add_argument("--resumes", type=int, default=300)
+    parser.add_argument("--jds", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    backends = available_backends()
+    print(f"installed backends: {', '.join(backends)}")
+    with tempfile.TemporaryDirectory() as directory:
+        resume_paths, jd_paths = write_corpus(directory, args.resumes, args.jds)
+        for kind, paths, fields in (("resumes", resume_paths, RESUME_FIELDS), ("jds", jd_paths, JD_FIELDS)):
+            reference, reference_seconds = extract_all("pdfminer", paths)
+            print(f"\n{kind} ({len(paths)} PDFs)")
+            print(f"{'backend':<10} {'docs/s':>8} {'speedup':>8} {'garbled':>8}  field parity vs pdfminer")
+            for backend in backends:
+                texts, seconds = (reference, reference_seconds) if backend == "pdfminer" else extract_all(backend, paths)
+                garbled = sum(looks_garbled(text) for text in texts)
+                shares = parity(fields, reference, texts)
+                summary = " ".join(f"{field}={share:.0%}" for field, share in shares.items())
+                print(f"{backend:<10} {len(paths) / seconds:>8.1f} {reference_seconds / seconds:>7.1f}x {garbled:>8}  {summary}")
+
+if __name__ == "__main__":
+    main()
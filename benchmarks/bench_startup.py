@@ -0,0 +1,124 @@
+"""
+Startup time and worker memory of the API.
+
+    python -m benchmarks.bench_startup --workers 4
+
+Measures, each in fresh processes:
+
+- import: `import main` in a new interpreter (median of --repeats);
+- uvicorn / serve.py: seconds from launch until every worker has finished
+  its lifespan startup, warm-up included, and the summed PSS of the workers.
+
+MongoDB defaults to an address nothing listens on, so a connect that blocked
+startup would show up as the full 3s server selection timeout. The parse pool
+and the job workers are off so only the API processes are compared.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def import_seconds(env: Dict[str, str], repeats: int) -> float:
+    code = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def descendants(pid: int) -> List[int]:
+    """Child processes of pid, from /proc."""
+    children: Dict[int, List[int]] = {}
+    for entry in Path("/proc").iterdir():
+        if entry.name.isdigit():
+            try:
+                # The command name may contain spaces, so the fields after it are split from the last ')'
+                ppid = int((entry / "stat").read_text().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry.name))
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+def pss_mb(pid: int) -> float:
+    try:
+        for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def run_server(command: List[str], env: Dict[str, str], workers: int, timeout: float):
+    """Seconds until every worker logged that its startup completed (None on timeout), and their summed PSS."""
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    start = time.perf_counter()
+    started: List[float] = []
+    all_started = threading.Event()
+
+    def read_log():
+        for line in process.stderr:
+            if "Application startup complete" in line:
+                started.append(time.perf_counter() - start)
+                if len(started) >= workers:
+                    all_started.set()
+
+    threading.Thread(target=read_log, daemon=True).start()
+    try:
+        all_started.wait(timeout)
+        time.sleep(0.5)
+        memory = sum(pss_mb(pid) for pid in descendants(process.pid))
+        return (started[workers - 1] if len(started) >= workers else None), memory
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_startup")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--mongo-uri", default="mongodb://127.0.0.1:9/?serverSelectionTimeoutMS=3000",
+                        help="MongoDB the workers connect to at startup (default: an unreachable address)")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args(argv)
+
+    # Workers report startup complete once warm, without waiting for the unreachable database
+    env = dict(os.environ, MONGO_URI=args.mongo_uri, PARSE_WORKERS="0", JOB_WORKERS="0", PYTHONWARNINGS="ignore",
+               WARMUP_MODE="blocking", WARMUP_DB_WAIT_SECONDS="0")
+    env.pop("GEMINI_API_KEY", None)
+    print(f"import main: {import_seconds(env, args.repeats):.2f}s (median of {args.repeats})")
+    print(f"\n{args.workers} workers        {'ready s':>8} {'workers PSS MB':>15}")
+    servers = {
+        "uvicorn --workers": [sys.executable, "-m", "uvicorn", "main:app", "--workers", str(args.workers)],
+        "serve.py": [sys.executable, "serve.py", "--workers", str(args.workers)]
+    }
+    for name, command in servers.items():
+        port = free_port()
+        ready, memory = run_server(command + ["--port", str(port)], env, args.workers, args.timeout)
+        ready_text = f"{ready:8.2f}" if ready is not None else f"{'timeout':>8}"
+        print(f"{name:<20} {ready_text} {memory:15.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Query latency of the BM25 resume text index.
+
+    python -m benchmarks.bench_text_search --docs 100000 --queries 500
+
+Documents are synthetic resumes of about 300 words drawn from a
+Zipf-distributed vocabulary whose most frequent words are English stop
+words, as in real text. Queries are two to four content words sampled with
+the same Zipf skew, so the most common non-stop words dominate them.
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from text_search import TextSearchIndex
+from text_vectors import STOP_WORDS
+
+def vocabulary(vocab_size):
+    stop_words = sorted(STOP_WORDS)
+    return np.array(stop_words + [f"w{i}" for i in range(vocab_size - len(stop_words))])
+
+def synthetic_documents(n_docs, vocab_size=20000, words_per_doc=300, seed=0):
+    rng = np.random.default_rng(seed)
+    vocab = vocabulary(vocab_size)
+    for i in range(n_docs):
+        words = vocab[(rng.zipf(1.3, words_per_doc) - 1) % vocab_size]
+        yield f"{i:024d}", " ".join(words)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_text_search")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--mode", default="all", choices=("all", "any"))
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = TextSearchIndex(os.path.join(directory, "bench.sqlite3"))
+        start = time.perf_counter()
+        index.add_many(synthetic_documents(args.docs))
+        print(f"indexed {args.docs} documents in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(index.path) / 1e6:.0f} MB)")
+
+        rng = np.random.default_rng(1)
+        content = vocabulary(20000)[len(STOP_WORDS):]
+        latencies = []
+        matches = []
+        for _ in range(args.queries):
+            terms = content[(rng.zipf(1.3, rng.integers(2, 5)) - 1) % len(content)]
+            start = time.perf_counter()
+            total, _ = index.search(" ".join(terms), args.mode, 0, 20)
+            latencies.append((time.perf_counter() - start) * 1000)
+            matches.append(total)
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"{args.queries} queries (mode={args.mode}), median {int(np.median(matches))} matches: "
+              f"p50 {p50:.1f} ms  p95 {p95:.1f} ms  p99 {p99:.1f} ms")
+        index.close()
+
+if __name__ == "__main__":
+    main()
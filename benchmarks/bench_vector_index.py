@@ -0,0 +1,69 @@
+"""
+Recall vs latency of the IVF vector index against exact search.
+
+    python -m benchmarks.bench_vector_index --docs 100000 --queries 200
+
+Documents are synthetic: each draws its words from a mixture of a few topic
+vocabularies, so the corpus has cluster structure like real resumes do.
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+from text_vectors import VECTOR_DIM, _bucket
+from vector_index import VectorIndex
+
+def synthetic_corpus(n_docs, n_topics=40, vocab_per_topic=150, words_per_doc=200, seed=0):
+    rng = np.random.default_rng(seed)
+    vocab = [f"term{i}" for i in range(n_topics * vocab_per_topic)]
+    buckets = np.array([_bucket(term, VECTOR_DIM)[0] for term in vocab])
+    signs = np.array([_bucket(term, VECTOR_DIM)[1] for term in vocab], dtype=np.float32)
+
+    vectors = np.zeros((n_docs, VECTOR_DIM), dtype=np.float32)
+    for i in range(n_docs):
+        topics = rng.choice(n_topics, 3, replace=False)
+        mix = rng.dirichlet(np.ones(3))
+        counts = rng.multinomial(words_per_doc, mix)
+        words = np.concatenate([
+            topic * vocab_per_topic + rng.zipf(1.5, count) % vocab_per_topic
+            for topic, count in zip(topics, counts)
+        ])
+        terms, tf = np.unique(words, return_counts=True)
+        np.add.at(vectors[i], buckets[terms], signs[terms] * (1 + np.log(tf)))
+    return vectors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_vector_index")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    corpus = synthetic_corpus(args.docs + args.queries)
+    documents, queries = corpus[:args.docs], corpus[args.docs:]
+    df = np.count_nonzero(documents, axis=0)
+    idf = (np.log((1.0 + len(documents)) / (1.0 + df)) + 1.0).astype(np.float32)
+    print(f"generated {args.docs} documents in {time.perf_counter() - start:.1f}s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = VectorIndex(directory)
+        start = time.perf_counter()
+        index.build_from([f"{i:024d}" for i in range(args.docs)], documents, idf=idf)
+        print(f"built {len(index.centroids)} lists in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        exact = [{doc_id for doc_id, _ in index.exact_search(q, args.k)} for q in queries]
+        exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        print(f"{'exact':>8}  recall@{args.k} 1.000  {exact_ms:8.2f} ms/query")
+
+        for nprobe in (int(n) for n in args.nprobe.split(",")):
+            start = time.perf_counter()
+            found = [{doc_id for doc_id, _ in index.search(q, args.k, nprobe)} for q in queries]
+            ms = (time.perf_counter() - start) * 1000 / len(queries)
+            recall = np.mean([len(f & e) / len(e) for f, e in zip(found, exact)])
+            print(f"nprobe={nprobe:<2}  recall@{args.k} {recall:.3f}  {ms:8.2f} ms/query  ({exact_ms / ms:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+In-process stand-in for the Gemini SDK, for benchmarks and load tests.
+
+install() swaps llm_client's `genai` module for a fake whose models answer
+after a configurable latency and fail at a configurable rate. Every call
+still goes through generate_text, so the circuit breaker, response cache and
+metrics run as in production; only the network round trip is replaced.
+"""
+import os
+import random
+import threading
+import time
+import types
+import llm_client
+
+class FakeGeminiError(Exception):
+    """Simulated Gemini API failure."""
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+def answer(prompt: str) -> str:
+    """A plausible reply for each prompt the application sends."""
+    if "HIGHEST academic performance" in prompt:
+        return "CGPA: 8.4"
+    if "Enhanced education details" in prompt:
+        return "B.Tech in Computer Science, National Institute of Technology, 2020, CGPA 8.4/10"
+    return ("Strengths: relevant backend experience and most required skills. "
+            "Gaps: limited exposure to the cloud platform. Recommendation: interview.")
+
+class FakeGemini:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        with self._lock:
+            self.calls += 1
+            return self._rng.random(), self._rng.uniform(-self.jitter, self.jitter)
+
+    def generate(self, prompt: str, timeout=None) -> _Response:
+        failure, jitter = self._draw()
+        delay = max(0.0, self.latency + jitter)
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise FakeGeminiError("Deadline exceeded")
+        if delay:
+            time.sleep(delay)
+        if failure < self.error_rate:
+            raise FakeGeminiError("503 Service Unavailable")
+        return _Response(answer(prompt))
+
+    def module(self) -> types.SimpleNamespace:
+        fake = self
+
+        class GenerativeModel:
+            def __init__(self, model_name):
+                self.model_name = model_name
+
+            def generate_content(self, prompt, request_options=None):
+                return fake.generate(prompt, (request_options or {}).get("timeout"))
+
+        return types.SimpleNamespace(configure=lambda **kwargs: None, GenerativeModel=GenerativeModel)
+
+def install(latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0, api_key: str = "fake-gemini-key") -> FakeGemini:
+    """Route all Gemini calls in this process to a FakeGemini and return it."""
+    fake = FakeGemini(latency, jitter, error_rate, seed)
+    os.environ["GEMINI_API_KEY"] = api_key
+    llm_client.genai = fake.module()
+    return fake
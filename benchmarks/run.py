@@ -0,0 +1,224 @@
+"""
+Benchmark suite for the parsers and the scorer.
+
+    python -m benchmarks.run                    # run and compare with benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline    # record a new baseline
+    python -m benchmarks.run --filter score. --quick
+
+Inputs come from benchmarks.synthetic (deterministic resumes and JDs of
+varied length, written as PDFs to a temporary directory) and Gemini is
+replaced by benchmarks.fake_gemini, so runs need no network or database.
+Each benchmark is timed like timeit: the number of calls per round is
+calibrated to fill --min-time, and the best of --repeat rounds is kept. A
+result slower than the baseline by more than --tolerance is a regression,
+and the run exits with status 1.
+
+Baselines are only comparable on the machine that recorded them; record a
+new one after changing hardware or Python version. The baseline also records
+the PDF backend, and the benchmarks that read PDFs are not compared against
+a baseline taken with another backend.
+"""
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks import fake_gemini
+from benchmarks.synthetic import resume_text, write_corpus
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+# Benchmarks whose cost is mostly the PDF backend's
+PDF_BENCHMARKS = ("parse.extract_resume_data", "parse.extract_jd_data")
+
+# name -> setup(corpus) returning (operation, items processed per operation)
+BENCHMARKS: List[Tuple[str, Callable]] = []
+
+def benchmark(name: str):
+    def decorator(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return decorator
+
+class Corpus:
+    """PDF files plus already-parsed resumes and JDs shared by all benchmarks."""
+
+    def __init__(self, directory: str, resumes: int, jds: int):
+        from parsers.resume_parser import resume_data_from_text
+        from parsers.jd_parser import extract_jd_data
+
+        self.resume_paths, self.jd_paths = write_corpus(directory, resumes, jds)
+        self.texts = [resume_text(i) for i in range(resumes)]
+        self.resumes = [resume_data_from_text(text) for text in self.texts]
+        self.jds = [extract_jd_data(str(path)) for path in self.jd_paths]
+
+    def pairs(self):
+        """Endless (resume, jd) pairs cycling through the corpus."""
+        return zip(itertools.cycle(self.resumes), itertools.cycle(self.jds))
+
+@benchmark("parse.extract_resume_data")
+def _extract_resume_data(corpus):
+    from parsers.resume_parser import extract_resume_data
+    paths = itertools.cycle(str(path) for path in corpus.resume_paths)
+    return lambda: extract_resume_data(next(paths)), 1
+
+@benchmark("parse.resume_data_from_text")
+def _resume_data_from_text(corpus):
+    from parsers.resume_parser import resume_data_from_text
+    texts = itertools.cycle(corpus.texts)
+    return lambda: resume_data_from_text(next(texts)), 1
+
+@benchmark("parse.extract_jd_data")
+def _extract_jd_data(corpus):
+    from parsers.jd_parser import extract_jd_data
+    paths = itertools.cycle(str(path) for path in corpus.jd_paths)
+    return lambda: extract_jd_data(next(paths)), 1
+
+@benchmark("score.calculate_skill_match_score")
+def _skill_match(corpus):
+    from llm_scorer import calculate_skill_match_score
+    pairs = corpus.pairs()
+    return lambda: calculate_skill_match_score(*next(pairs)), 1
+
+@benchmark("score.calculate_experience_score")
+def _experience(corpus):
+    from llm_scorer import calculate_experience_score, infer_seniority_level
+    pairs = corpus.pairs()
+
+    def run():
+        resume, jd = next(pairs)
+        calculate_experience_score(resume, jd, infer_seniority_level(jd)[0])
+    return run, 1
+
+@benchmark("score.calculate_education_score")
+def _education(corpus):
+    from llm_scorer import calculate_education_score
+    pairs = corpus.pairs()
+    return lambda: calculate_education_score(*next(pairs), use_llm=False), 1
+
+@benchmark("score.get_detailed_score")
+def _detailed(corpus):
+    from llm_scorer import get_detailed_score
+    pairs = corpus.pairs()
+    return lambda: get_detailed_score(*next(pairs), use_llm=False), 1
+
+@benchmark("score.get_detailed_score[llm]")
+def _detailed_llm(corpus):
+    from llm_scorer import get_detailed_score
+    pairs = corpus.pairs()
+    return lambda: get_detailed_score(*next(pairs)), 1
+
+@benchmark("bulk.rank_resumes")
+def _bulk(corpus):
+    from pipeline import rank_resumes
+    jds = itertools.cycle(corpus.jds)
+    return lambda: rank_resumes(corpus.resumes, next(jds)), len(corpus.resumes)
+
+def measure(operation: Callable, min_time: float, repeat: int) -> Dict[str, float]:
+    """Seconds per call: best and median of `repeat` rounds of a calibrated number of calls."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        rounds.append((time.perf_counter() - start) / number)
+    return {"best": min(rounds), "median": statistics.median(rounds), "calls": number}
+
+def load_baseline(path: Path) -> Dict[str, float]:
+    """Best time per benchmark, leaving out PDF benchmarks recorded with another backend."""
+    from parsers.pdf_text import resolve_backend
+    if not path.exists():
+        return {}
+    document = json.loads(path.read_text())
+    baseline = {name: result["best"] for name, result in document["results"].items()}
+    backend = resolve_backend()
+    if document.get("pdf_backend") != backend:
+        print(f"baseline was recorded with PDF backend {document.get('pdf_backend', 'unknown')}, this run uses "
+              f"{backend}; not comparing {', '.join(PDF_BENCHMARKS)}\n")
+        for name in PDF_BENCHMARKS:
+            baseline.pop(name, None)
+    return baseline
+
+def save_baseline(path: Path, results: Dict[str, Dict[str, float]]):
+    """Write the results into the baseline, keeping entries for benchmarks that were not run."""
+    from parsers.pdf_text import resolve_backend
+    previous = json.loads(path.read_text())["results"] if path.exists() else {}
+    previous.update({name: {"best": round(result["best"], 9), "items": result["items"]} for name, result in results.items()})
+    document = {
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "pdf_backend": resolve_backend(),
+        "recorded": time.strftime("%Y-%m-%d"),
+        "results": previous
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+
+def _format(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:8.2f} s "
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds * 1e6:8.1f} us"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--jds", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per round")
+    parser.add_argument("--quick", action="store_true", help="1 round of 0.05 s, 50 resumes")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed slowdown vs. baseline, 0.3 = 30%%")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.repeat, args.min_time, args.resumes = 1, 0.05, min(args.resumes, 50)
+
+    fake_gemini.install()
+    selected = [(name, setup) for name, setup in BENCHMARKS if args.filter in name]
+    baseline = {} if args.save_baseline else load_baseline(args.baseline)
+    results = {}
+    regressions = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = Corpus(directory, args.resumes, args.jds)
+        print(f"{'benchmark':<36} {'per op':>11} {'per item':>11} {'baseline':>11}  ratio")
+        for name, setup in selected:
+            operation, items = setup(corpus)
+            result = measure(operation, args.min_time, args.repeat)
+            result["items"] = items
+            results[name] = result
+            line = f"{name:<36} {_format(result['best'])} {_format(result['best'] / items)}"
+            if name in baseline:
+                ratio = result["best"] / baseline[name]
+                flag = "  REGRESSION" if ratio > 1 + args.tolerance else ""
+                line += f" {_format(baseline[name])}  {ratio:5.2f}x{flag}"
+                if flag:
+                    regressions.append(name)
+            print(line, flush=True)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"baseline written to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Deterministic synthetic resumes and job descriptions, as text and as PDFs.
+
+    python -m benchmarks.synthetic --out corpus --resumes 2000 --jds 20
+
+The same seed always produces the same documents. Resumes vary in length
+from a half-page fresher resume to two pages of experience, and use the
+section headings, grade formats and skill names the parsers look for, so
+every extraction path is exercised. PDFs are written by a small writer that
+emits uncompressed Helvetica text pages, with no PDF library needed.
+"""
+import argparse
+import random
+import textwrap
+from pathlib import Path
+from typing import List
+from parsers.skill_taxonomy import SKILL_KEYWORDS
+
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Sneha", "Arjun", "Meera", "Rohan", "Kavya",
+               "James", "Emily", "Daniel", "Sofia", "Lucas", "Hannah", "Omar", "Chen", "Fatima", "Mateo"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Reddy", "Gupta", "Nair", "Khan", "Singh", "Mehta", "Das",
+              "Smith", "Garcia", "Brown", "Martin", "Rossi", "Kim", "Nguyen", "Silva", "Weber", "Cohen"]
+DEGREES = ["B.Tech in Computer Science", "B.E. Information Technology", "Bachelor of Science, Computer Science",
+           "M.Tech in Software Engineering", "Master of Computer Applications (MCA)", "BCA", "B.Sc Electrical Engineering"]
+INSTITUTES = ["National Institute of Technology", "State University", "Institute of Engineering and Technology",
+              "City College of Engineering", "Technical University"]
+ROLES = ["Software Engineer", "Backend Developer", "Frontend Developer", "Data Analyst", "ML Engineer",
+         "DevOps Engineer", "Full Stack Developer", "Platform Engineer"]
+COMPANIES = ["Acme Technologies", "Globex Solutions", "Initech Systems", "Umbrella Services", "Stark Labs Pvt Ltd",
+             "Wayne Corporation", "Hooli Inc"]
+LOCATIONS = ["Remote", "Hybrid", "Bengaluru, KA", "Austin, TX", "Seattle, WA", "Pune, MH"]
+VERBS = ["Built", "Designed", "Optimised", "Migrated", "Maintained", "Led", "Automated", "Implemented", "Scaled"]
+OBJECTS = ["a payments service", "the search pipeline", "an internal analytics dashboard", "REST endpoints",
+           "the CI/CD workflow", "a recommendation model", "event-driven microservices", "the data warehouse",
+           "authentication with OAuth and JWT", "a real-time notification system"]
+OUTCOMES = ["cutting latency by {n}%", "serving {n}k requests per minute", "reducing cloud cost by {n}%",
+            "improving conversion by {n}%", "for {n} internal teams", "with {n}% test coverage"]
+
+def _skills(rng: random.Random, low: int, high: int) -> List[str]:
+    return rng.sample(SKILL_KEYWORDS, rng.randint(low, high))
+
+def _bullet(rng: random.Random, skills: List[str]) -> str:
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+    return f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)}, {outcome}"
+
+def resume_lines(seed: int) -> List[str]:
+    """One synthetic resume; the seed decides its length (half a page to two pages)."""
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = _skills(rng, 4, 18)
+    years = rng.choice([0, 0, 1, 2, 3, 4, 5, 6, 8, 10, 12])
+    jobs = 0 if years == 0 else rng.randint(1, 5)
+    grade = (f"CGPA: {rng.uniform(6.0, 9.9):.1f}/10" if rng.random() < 0.6
+             else f"Percentage: {rng.uniform(55, 96):.1f}%")
+
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}{seed}@example.com",
+        f"+1 {rng.randint(200, 999)} {rng.randint(200, 999)} {rng.randint(1000, 9999)}",
+        "",
+        "Summary",
+        f"{rng.choice(ROLES)} with {years} years of experience across {', '.join(skills[:3])}." if years
+        else f"Recent graduate looking for an entry-level role working with {', '.join(skills[:3])}.",
+        "",
+        "Education",
+        f"{rng.choice(DEGREES)}, {rng.choice(INSTITUTES)}, {rng.randint(2008, 2024)}",
+        grade,
+    ]
+    if rng.random() < 0.4:
+        lines.append(f"12th CBSE: {rng.randint(70, 98)}%")
+
+    lines += ["", "Experience"]
+    if jobs == 0:
+        lines.append("Internship projects and coursework only")
+    for _ in range(jobs):
+        start = rng.randint(2010, 2022)
+        lines.append(f"{rng.choice(ROLES)}, {rng.choice(COMPANIES)} ({start} - {start + rng.randint(1, 4)})")
+        lines += [_bullet(rng, skills) for _ in range(rng.randint(2, 8))]
+
+    lines += ["", "Skills", ", ".join(skill.title() for skill in skills), "", "Projects"]
+    for _ in range(rng.randint(1, 6)):
+        lines.append(f"- {rng.choice(OBJECTS).capitalize()} with {rng.choice(skills)}")
+        if rng.random() < 0.5:
+            lines.append(_bullet(rng, skills)[2:])
+    return lines
+
+def jd_lines(seed: int) -> List[str]:
+    rng = random.Random(10_000_000 + seed)
+    low = rng.choice([0, 1, 2, 3, 5, 7])
+    skills = _skills(rng, 3, 10)
+    level = "Junior" if low <= 1 else "Senior" if low >= 5 else ""
+    return [
+        f"{level} {rng.choice(ROLES)}".strip(),
+        f"Company: {rng.choice(COMPANIES)}",
+        rng.choice(LOCATIONS),
+        "",
+        "Requirements",
+        f"{low}-{low + rng.randint(1, 4)} years of experience",
+        f"Strong knowledge of {', '.join(skills)}",
+        f"{rng.choice(['Bachelor', 'Master'])} degree in Computer Science or related field",
+        "",
+        "Responsibilities",
+    ] + [_bullet(rng, skills) for _ in range(rng.randint(3, 7))]
+
+def resume_text(seed: int) -> str:
+    return "\n".join(resume_lines(seed))
+
+def jd_text(seed: int) -> str:
+    return "\n".join(jd_lines(seed))
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def make_pdf(lines: List[str], lines_per_page: int = 52, width: int = 95) -> bytes:
+    """A minimal valid PDF with the lines wrapped and split across Letter-size pages."""
+    wrapped = []
+    for line in lines:
+        wrapped.extend(textwrap.wrap(line, width) or [""])
+    pages = [wrapped[i:i + lines_per_page] for i in range(0, len(wrapped), lines_per_page)] or [[]]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a (page, contents) pair per page
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        content = "BT /F1 10 Tf 50 760 Td 14 TL " + " ".join(f"({_escape(line)}) Tj T*" for line in page) + " ET"
+        page_number = len(objects) + 1
+        kids.append(f"{page_number} 0 R")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {page_number + 1} 0 R "
+                       f"/Resources << /Font << /F1 3 0 R >> >> >>")
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "replace")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def write_corpus(directory, resumes: int, jds: int, seed: int = 0):
+    """Write resume_<n>.pdf and jd_<n>.pdf files; returns (resume_paths, jd_paths)."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    resume_paths, jd_paths = [], []
+    for i in range(resumes):
+        path = directory / f"resume_{i:05d}.pdf"
+        path.write_bytes(make_pdf(resume_lines(seed + i)))
+        resume_paths.append(path)
+    for i in range(jds):
+        path = directory / f"jd_{i:04d}.pdf"
+        path.write_bytes(make_pdf(jd_lines(seed + i)))
+        jd_paths.append(path)
+    return resume_paths, jd_paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.synthetic")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--jds", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    resume_paths, jd_paths = write_corpus(args.out, args.resumes, args.jds, args.seed)
+    size = sum(path.stat().st_size for path in resume_paths + jd_paths)
+    print(f"wrote {len(resume_paths)} resumes and {len(jd_paths)} job descriptions to {args.out} ({size / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
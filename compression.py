@@ -0,0 +1,109 @@
+"""
+Response compression with Accept-Encoding negotiation.
+
+Score lists carry long justifications and nested details, and compress about
+tenfold. Brotli is used when the client accepts it and the `brotli` package
+is installed, gzip otherwise. Only complete bodies of at least
+COMPRESSION_MIN_BYTES are compressed: streamed responses (server-sent
+events, profile downloads) and small ones go out as they are. Bodies of
+THREAD_MIN_BYTES or more are compressed on a worker thread so the event
+loop keeps serving other requests.
+"""
+import gzip
+import os
+from typing import Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# Quality 4 compresses smaller than gzip -6 at a similar speed; higher levels are for static assets
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+THREAD_MIN_BYTES = 256 * 1024
+# Already compressed, or streamed
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "application/gzip", "application/zip", "image/", "audio/", "video/")
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The preferred supported encoding of an Accept-Encoding header, brotli winning ties; None for identity."""
+    best, best_q = None, 0.0
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            coding = "br" if brotli is not None else "gzip"
+        if coding not in ("br", "gzip") or (coding == "br" and brotli is None) or q <= 0:
+            continue
+        if q > best_q or (q == best_q and coding == "br"):
+            best, best_q = coding, q
+    return best
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            headers = Headers(raw=start_message["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (message.get("more_body", False) or len(body) < self.minimum_size or "content-encoding" in headers
+                    or any(content_type.startswith(excluded) for excluded in EXCLUDED_CONTENT_TYPES)):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= THREAD_MIN_BYTES:
+                compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            response_headers = MutableHeaders(raw=start_message["headers"])
+            response_headers["Content-Encoding"] = encoding
+            response_headers["Content-Length"] = str(len(compressed))
+            response_headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,13 +1,27 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, DESCENDING
 from dotenv import load_dotenv
 from datetime import datetime
 from bson import ObjectId
 import os
+import threading
+import time
+import leaderboard
+from skill_index import resume_skill_index, jd_skill_index
+from text_vectors import corpus_stats, decode_vector, vector_to_bytes
+from vector_index import resume_vector_index, DEFAULT_NPROBE
+from near_duplicates import resume_lsh, decode_signature, signature_to_bytes, lsh_bands
+from text_search import resume_text_index, compress_text
+from metrics import timed_stage
 
 load_dotenv()
 
 db_client = None
 db = None
+_connect_lock = threading.Lock()
+# After a failed connect, requests get None at once instead of each waiting out the timeout again
+RECONNECT_SECONDS = float(os.getenv("MONGO_RECONNECT_SECONDS", "30"))
+_last_failure = None
+_stop_connecting = threading.Event()
 
 def get_db_client():
     global db_client, db
@@ -19,17 +33,107 @@ def get_db_client():
         print("MongoDB URI not configured")
         return None
     
+    # A request arriving during a background connect waits for it instead of opening a second client
+    with _connect_lock:
+        if db_client is not None:
+            return db_client
+        if _last_failure is not None and time.monotonic() - _last_failure < RECONNECT_SECONDS:
+            return None
+        return _connect(mongo_uri)
+
+def _connect(mongo_uri):
+    global db_client, db, _last_failure
+    client = None
     try:
-        db_client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000)
-        db_client.admin.command('ping')
+        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000)
+        client.admin.command('ping')
         db_name = os.getenv("DB_NAME", "smart_resume_screener")
-        db = db_client[db_name]
+        ensure_indexes(client[db_name])
+        load_corpus_stats(client[db_name])
+        # Published only when ready: other threads read db_client without the lock
+        db = client[db_name]
+        db_client = client
+        _last_failure = None
         print("MongoDB connected")
         return db_client
     except Exception as e:
         print(f"MongoDB connection failed: {e}")
+        _last_failure = time.monotonic()
+        if client is not None:
+            client.close()
         return None
 
+def connect_in_background(on_connected=None) -> threading.Thread:
+    """
+    Connect (ping, indexes, corpus statistics) on a daemon thread so the API starts serving at once.
+
+    A failed connect is retried every MONGO_RECONNECT_SECONDS until it succeeds or
+    stop_connecting() is called. on_connected(client) runs on that thread once the
+    connection is up.
+    """
+    _stop_connecting.clear()
+    def _run():
+        client = get_db_client()
+        while client is None and os.getenv("MONGO_URI") and not _stop_connecting.wait(RECONNECT_SECONDS):
+            client = get_db_client()
+        if client is not None and on_connected is not None:
+            on_connected(client)
+    thread = threading.Thread(target=_run, name="mongo-connect", daemon=True)
+    thread.start()
+    return thread
+
+def stop_connecting():
+    _stop_connecting.set()
+
+def ensure_indexes(db):
+    try:
+        db.scores.create_index([("jd_id", ASCENDING), ("overall_fit", DESCENDING)])
+        db.scores.create_index([("resume_id", ASCENDING), ("jd_id", ASCENDING)])
+        db.resumes.create_index([("skills", ASCENDING)])
+        db.resumes.create_index([("lsh_bands", ASCENDING)])
+        # The list endpoints return the newest documents first
+        db.scores.create_index([("timestamp", DESCENDING)])
+        db.resumes.create_index([("timestamp", DESCENDING)])
+        db.job_descriptions.create_index([("timestamp", DESCENDING)])
+    except Exception as e:
+        print(f"Error creating indexes: {e}")
+
+# Vectors are only read by the scorer, never sent back by the list endpoints
+LIST_PROJECTION = {"text_vector": 0, "minhash": 0, "lsh_bands": 0, "full_text": 0}
+
+def list_newest(collection, match=None, projection=None, skip=0, limit=None):
+    """
+    Newest documents first, with _id already a string.
+
+    The server converts _id with $toString, so the documents can be serialized
+    as they are instead of being patched one by one in Python.
+    """
+    pipeline = [{"$match": match or {}}, {"$sort": {"timestamp": -1}}]
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit is not None:
+        pipeline.append({"$limit": limit})
+    if projection:
+        pipeline.append({"$project": projection})
+    pipeline.append({"$addFields": {"_id": {"$toString": "$_id"}}})
+    return list(collection.aggregate(pipeline))
+
+def load_corpus_stats(db):
+    try:
+        stats = db.corpus_stats.find_one({"_id": "text_vectors"}) or {}
+        corpus_stats.load(stats.get("documents", 0), stats.get("df", {}))
+    except Exception as e:
+        print(f"Error loading corpus statistics: {e}")
+
+def update_corpus_stats(db, vector, sign=1):
+    if vector is None:
+        return
+    increments = {"documents": sign}
+    for bucket in vector.nonzero()[0]:
+        increments[f"df.{bucket}"] = sign
+    db.corpus_stats.update_one({"_id": "text_vectors"}, {"$inc": increments}, upsert=True)
+    corpus_stats.add(vector, sign)
+
 def get_database():
     global db
     if db is None:
@@ -51,7 +155,8 @@ def close_db_client(client=None):
         except:
             pass
 
-def save_resume(resume_data, filename):
+@timed_stage("db")
+def save_resume(resume_data, filename, full_text=None):
     db = get_database()
     if db is None:
         return None
@@ -66,14 +171,40 @@ def save_resume(resume_data, filename):
             "education": resume_data.get("education", []),
             "experience": resume_data.get("experience", []),
             "projects": resume_data.get("projects", []),
+            "llm_degraded": resume_data.get("llm_degraded", False),
             "timestamp": datetime.utcnow()
         }
+        vector = decode_vector(resume_data.get("text_vector"))
+        if vector is not None:
+            resume_doc["text_vector"] = vector_to_bytes(vector)
+        signature = decode_signature(resume_data.get("minhash"))
+        if signature is not None:
+            resume_doc["minhash"] = signature_to_bytes(signature)
+            resume_doc["lsh_bands"] = lsh_bands(signature)
+        if full_text:
+            resume_doc["full_text"] = compress_text(full_text)
         result = db.resumes.insert_one(resume_doc)
-        return str(result.inserted_id)
+        resume_id = str(result.inserted_id)
+        # The resume is stored from here on; a failed index update must not make the save look failed
+        try:
+            update_corpus_stats(db, vector)
+            resume_skill_index.add(resume_id, resume_doc["skills"])
+            resume_vector_index.add(resume_id, vector)
+            resume_lsh.add(resume_id, signature)
+        except Exception as e:
+            print(f"Error indexing resume: {e}")
+        if full_text:
+            try:
+                resume_text_index.add(resume_id, full_text)
+            except Exception as e:
+                # The stored text lets the index be rebuilt, so the resume itself is still saved
+                print(f"Error indexing resume text: {e}")
+        return resume_id
     except Exception as e:
         print(f"Error saving resume: {e}")
         return None
 
+@timed_stage("db")
 def save_job_description(jd_data, filename):
     db = get_database()
     if db is None:
@@ -91,12 +222,19 @@ def save_job_description(jd_data, filename):
             "responsibilities": jd_data.get("responsibilities", []),
             "timestamp": datetime.utcnow()
         }
+        vector = decode_vector(jd_data.get("text_vector"))
+        if vector is not None:
+            jd_doc["text_vector"] = vector_to_bytes(vector)
         result = db.job_descriptions.insert_one(jd_doc)
-        return str(result.inserted_id)
+        update_corpus_stats(db, vector)
+        jd_id = str(result.inserted_id)
+        jd_skill_index.add(jd_id, jd_doc["required_skills"])
+        return jd_id
     except Exception as e:
         print(f"Error saving job description: {e}")
         return None
 
+@timed_stage("db")
 def save_score(resume_id, jd_id, score_data, resume_filename, jd_filename):
     db = get_database()
     if db is None:
@@ -119,10 +257,14 @@ def save_score(resume_id, jd_id, score_data, resume_filename, jd_filename):
             "seniority_level": score_data.get("seniority_level", "unknown"),
             "weights": score_data.get("weights", {"skills": 0.5, "experience": 0.3, "education": 0.2}),
             "details": score_data.get("details", {}),
+            "semantic_match": score_data.get("semantic_match"),
+            "llm_degraded": score_data.get("llm_degraded", False),
             "timestamp": datetime.utcnow()
         }
         result = db.scores.insert_one(score_doc)
-        return str(result.inserted_id)
+        score_id = str(result.inserted_id)
+        leaderboard.record_score(jd_id, score_id, resume_id, score_doc["overall_fit"])
+        return score_id
     except Exception as e:
         print(f"Error saving score: {e}")
         return None
@@ -141,53 +283,186 @@ def get_db_status():
                 "resumes": db.resumes.count_documents({}),
                 "job_descriptions": db.job_descriptions.count_documents({}),
                 "scores": db.scores.count_documents({})
+            },
+            "llm_degraded": {
+                "resumes": db.resumes.count_documents({"llm_degraded": True}),
+                "scores": db.scores.count_documents({"llm_degraded": True})
             }
         }
     except Exception as e:
         return {"connected": False, "error": str(e)}
 
-def get_all_resumes():
+def get_all_resumes(skip=0, limit=100):
     db = get_database()
     if db is None:
         return []
     
     try:
-        resumes = list(db.resumes.find().sort("timestamp", -1).limit(100))
-        for resume in resumes:
-            resume["_id"] = str(resume["_id"])
-        return resumes
+        return list_newest(db.resumes, projection=LIST_PROJECTION, skip=skip, limit=limit)
     except Exception as e:
         print(f"Error fetching resumes: {e}")
         return []
 
-def get_all_scores():
+def get_all_scores(skip=0, limit=100):
     db = get_database()
     if db is None:
         return []
     
     try:
-        scores = list(db.scores.find().sort("timestamp", -1).limit(100))
-        for score in scores:
-            score["_id"] = str(score["_id"])
-        return scores
+        return list_newest(db.scores, skip=skip, limit=limit)
     except Exception as e:
         print(f"Error fetching scores: {e}")
         return []
 
-def get_all_job_descriptions():
+def get_all_job_descriptions(skip=0, limit=100):
     db = get_database()
     if db is None:
         return []
     
     try:
-        jds = list(db.job_descriptions.find().sort("timestamp", -1).limit(100))
-        for jd in jds:
-            jd["_id"] = str(jd["_id"])
-        return jds
+        return list_newest(db.job_descriptions, projection=LIST_PROJECTION, skip=skip, limit=limit)
     except Exception as e:
         print(f"Error fetching job descriptions: {e}")
         return []
 
+def search_resumes_by_skills(skills, mode="all", skip=0, limit=20):
+    db = get_database()
+    if db is None:
+        return None
+    
+    try:
+        resume_skill_index.ensure_loaded(db)
+        resume_ids = resume_skill_index.search(skills, mode)
+        page_ids = resume_ids[skip:skip + limit]
+        
+        docs = db.resumes.find({"_id": {"$in": [ObjectId(resume_id) for resume_id in page_ids]}}, LIST_PROJECTION)
+        by_id = {str(doc["_id"]): doc for doc in docs}
+        
+        resumes = []
+        for resume_id in page_ids:
+            doc = by_id.get(resume_id)
+            if doc is not None:
+                doc["_id"] = resume_id
+                resumes.append(doc)
+        return {"total": len(resume_ids), "resumes": resumes}
+    except Exception as e:
+        print(f"Error searching resumes: {e}")
+        return None
+
+def find_similar_candidates(jd_id, k=10, nprobe=None):
+    db = get_database()
+    if db is None:
+        return None
+    
+    try:
+        jd = db.job_descriptions.find_one({"_id": ObjectId(jd_id)}, {"text_vector": 1})
+        if jd is None:
+            return {"job_description": None, "candidates": []}
+        
+        vector = decode_vector(jd.get("text_vector"))
+        if vector is None:
+            return {"job_description": jd_id, "vector": False, "candidates": []}
+        
+        resume_vector_index.ensure_loaded(db)
+        hits = resume_vector_index.search(vector, k, nprobe or DEFAULT_NPROBE)
+        
+        docs = db.resumes.find({"_id": {"$in": [ObjectId(resume_id) for resume_id, _ in hits]}}, LIST_PROJECTION)
+        by_id = {str(doc["_id"]): doc for doc in docs}
+        
+        candidates = []
+        for resume_id, similarity in hits:
+            doc = by_id.get(resume_id)
+            if doc is not None:
+                doc["_id"] = resume_id
+                doc["similarity"] = round(similarity, 4)
+                candidates.append(doc)
+        return {"job_description": jd_id, "vector": True, "indexed": len(resume_vector_index), "candidates": candidates}
+    except Exception as e:
+        print(f"Error finding similar candidates: {e}")
+        return None
+
+def search_resumes_by_text(q, skills=None, mode="all", skip=0, limit=20):
+    db = get_database()
+    if db is None:
+        return None
+    
+    try:
+        resume_text_index.ensure_built(db)
+        if skills:
+            resume_skill_index.ensure_loaded(db)
+            allowed = set(resume_skill_index.search(skills, mode))
+            _, hits = resume_text_index.search(q, mode, 0, None)
+            hits = [hit for hit in hits if hit[0] in allowed]
+            total, page = len(hits), hits[skip:skip + limit]
+        else:
+            total, page = resume_text_index.search(q, mode, skip, limit)
+        
+        docs = db.resumes.find({"_id": {"$in": [ObjectId(resume_id) for resume_id, _, _ in page]}}, LIST_PROJECTION)
+        by_id = {str(doc["_id"]): doc for doc in docs}
+        
+        resumes = []
+        for resume_id, score, snippet in page:
+            doc = by_id.get(resume_id)
+            if doc is not None:
+                doc["_id"] = resume_id
+                doc["score"] = score
+                doc["snippet"] = snippet
+                resumes.append(doc)
+        return {"total": total, "resumes": resumes}
+    except Exception as e:
+        print(f"Error searching resume text: {e}")
+        return None
+
+def find_near_duplicate_resume(signature):
+    """Stored resume whose text is a near-duplicate of the signature, as (resume_doc, similarity), or None."""
+    db = get_database()
+    if db is None or signature is None:
+        return None
+    
+    try:
+        resume_lsh.ensure_loaded(db)
+        match = resume_lsh.query(signature)
+        if match is None:
+            return None
+        # The reused resume is scored again, so keep its text_vector but not the MinHash blobs or full text
+        resume = db.resumes.find_one({"_id": ObjectId(match[0])}, {"minhash": 0, "lsh_bands": 0, "full_text": 0})
+        if resume is None:
+            resume_lsh.remove(match[0])
+            return None
+        resume["_id"] = match[0]
+        return resume, match[1]
+    except Exception as e:
+        print(f"Error checking for near-duplicate resumes: {e}")
+        return None
+
+def get_score_for_pair(resume_id, jd_id):
+    db = get_database()
+    if db is None:
+        return None
+    
+    try:
+        score = db.scores.find_one({"resume_id": resume_id, "jd_id": jd_id}, sort=[("timestamp", -1)])
+        if score:
+            score["_id"] = str(score["_id"])
+        return score
+    except Exception as e:
+        print(f"Error fetching score: {e}")
+        return None
+
+def get_resume_by_id(resume_id):
+    db = get_database()
+    if db is None:
+        return None
+    
+    try:
+        resume = db.resumes.find_one({"_id": ObjectId(resume_id)})
+        if resume:
+            resume["_id"] = str(resume["_id"])
+        return resume
+    except Exception as e:
+        print(f"Error fetching resume: {e}")
+        return None
+
 def get_job_description_by_id(jd_id):
     db = get_database()
     if db is None:
@@ -202,16 +477,34 @@ def get_job_description_by_id(jd_id):
         print(f"Error fetching job description: {e}")
         return None
 
+def job_description_to_data(jd_doc):
+    return {
+        "job_title": jd_doc.get("job_title", "Unknown"),
+        "company": jd_doc.get("company", ""),
+        "location": jd_doc.get("location", ""),
+        "required_skills": jd_doc.get("required_skills", []),
+        "experience_required": jd_doc.get("experience_required", ""),
+        "qualifications": jd_doc.get("qualifications", []),
+        "responsibilities": jd_doc.get("responsibilities", []),
+        "text_vector": jd_doc.get("text_vector")
+    }
+
 def delete_resume(resume_id):
     db = get_database()
     if db is None:
         return False
     
     try:
-        resume_result = db.resumes.delete_one({"_id": ObjectId(resume_id)})
+        deleted = db.resumes.find_one_and_delete({"_id": ObjectId(resume_id)}, {"text_vector": 1})
         
-        if resume_result.deleted_count > 0:
+        if deleted is not None:
+            update_corpus_stats(db, decode_vector(deleted.get("text_vector")), -1)
             scores_result = db.scores.delete_many({"resume_id": resume_id})
+            leaderboard.remove_resume(resume_id)
+            resume_skill_index.remove(resume_id)
+            resume_vector_index.remove(resume_id)
+            resume_lsh.remove(resume_id)
+            resume_text_index.remove(resume_id)
             print(f"Deleted resume {resume_id} and {scores_result.deleted_count} associated scores")
             return True
         
@@ -226,8 +519,11 @@ def delete_score(score_id):
         return False
     
     try:
-        result = db.scores.delete_one({"_id": ObjectId(score_id)})
-        return result.deleted_count > 0
+        deleted = db.scores.find_one_and_delete({"_id": ObjectId(score_id)}, {"jd_id": 1})
+        if deleted is None:
+            return False
+        leaderboard.remove_score(deleted.get("jd_id"), score_id)
+        return True
     except Exception as e:
         print(f"Error deleting score: {e}")
         return False
@@ -238,10 +534,13 @@ def delete_job_description(jd_id):
         return False
     
     try:
-        jd_result = db.job_descriptions.delete_one({"_id": ObjectId(jd_id)})
+        deleted = db.job_descriptions.find_one_and_delete({"_id": ObjectId(jd_id)}, {"text_vector": 1})
         
-        if jd_result.deleted_count > 0:
+        if deleted is not None:
+            update_corpus_stats(db, decode_vector(deleted.get("text_vector")), -1)
             scores_result = db.scores.delete_many({"jd_id": jd_id})
+            leaderboard.invalidate(jd_id)
+            jd_skill_index.remove(jd_id)
             print(f"Deleted job description {jd_id} and {scores_result.deleted_count} associated scores")
             return True
         
@@ -263,6 +562,7 @@ def cleanup_orphaned_scores():
         for score in db.scores.find():
             if score["resume_id"] not in resume_ids or score["jd_id"] not in jd_ids:
                 db.scores.delete_one({"_id": score["_id"]})
+                leaderboard.remove_score(score["jd_id"], str(score["_id"]))
                 orphaned_count += 1
         
         if orphaned_count > 0:
@@ -282,6 +582,14 @@ def clear_all_data():
         resumes_count = db.resumes.delete_many({}).deleted_count
         jds_count = db.job_descriptions.delete_many({}).deleted_count
         scores_count = db.scores.delete_many({}).deleted_count
+        db.corpus_stats.delete_many({})
+        corpus_stats.reset()
+        leaderboard.invalidate()
+        resume_skill_index.invalidate()
+        jd_skill_index.invalidate()
+        resume_vector_index.invalidate()
+        resume_lsh.invalidate()
+        resume_text_index.clear()
         print(f"Cleared {resumes_count} resumes, {jds_count} job descriptions, {scores_count} scores")
         return True
     except Exception as e:
@@ -294,14 +602,79 @@ def get_resume_scores(resume_id):
         return []
     
     try:
-        scores = list(db.scores.find({"resume_id": resume_id}).sort("timestamp", -1))
-        for score in scores:
-            score["_id"] = str(score["_id"])
-        return scores
+        return list_newest(db.scores, match={"resume_id": resume_id})
     except Exception as e:
         print(f"Error fetching resume scores: {e}")
         return []
 
+def get_top_scores(jd_id, k=10):
+    db = get_database()
+    if db is None:
+        return None
+    
+    try:
+        board = leaderboard.get_board(db, jd_id)
+        top = board.top(k)
+        if not top:
+            return {"total": len(board), "scores": []}
+        
+        docs = db.scores.find({"_id": {"$in": [ObjectId(score_id) for score_id, _ in top]}})
+        by_id = {str(doc["_id"]): doc for doc in docs}
+        
+        scores = []
+        for score_id, _ in top:
+            doc = by_id.get(score_id)
+            if doc is None:
+                continue
+            doc["_id"] = score_id
+            doc["rank"] = board.rank_of_score(score_id)
+            scores.append(doc)
+        return {"total": len(board), "scores": scores}
+    except Exception as e:
+        print(f"Error fetching top scores: {e}")
+        return None
+
+def get_score_components(jd_id):
+    db = get_database()
+    if db is None:
+        return []
+    
+    try:
+        return list(db.scores.find(
+            {"jd_id": jd_id},
+            {
+                "resume_id": 1, "candidate_name": 1, "skills_match": 1, "experience_relevance": 1,
+                "education_fit": 1, "overall_fit": 1, "is_shortlisted": 1, "details.skills.critical_missing": 1,
+                "semantic_match": 1, "details.semantic.weight": 1
+            }
+        ))
+    except Exception as e:
+        print(f"Error fetching score components: {e}")
+        return []
+
+def get_candidate_rank(jd_id, resume_id):
+    db = get_database()
+    if db is None:
+        return None
+    
+    try:
+        board = leaderboard.get_board(db, jd_id)
+        best = board.rank_of_resume(resume_id)
+        if best is None:
+            return None
+        rank, score_id, overall_fit = best
+        return {
+            "jd_id": jd_id,
+            "resume_id": resume_id,
+            "score_id": score_id,
+            "overall_fit": overall_fit,
+            "rank": rank,
+            "total": len(board)
+        }
+    except Exception as e:
+        print(f"Error fetching candidate rank: {e}")
+        return None
+
 def get_analytics_data():
     db = get_database()
     if db is None:
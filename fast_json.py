@@ -0,0 +1,30 @@
+"""
+orjson-backed JSON responses.
+
+FastAPI renders a returned dict by first walking it with jsonable_encoder,
+then dumping it with the standard json module; for a list of thousands of
+score documents both passes are slow. FastJSONResponse renders with orjson,
+which serializes datetimes, numpy values and dicts natively. It is the app's
+default response class, and list endpoints return it directly so the
+jsonable_encoder walk is skipped altogether. Without orjson installed it
+falls back to the standard encoder.
+"""
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content, custom_encoder={ObjectId: str}))
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,461 @@
+from pymongo import ReturnDocument, ASCENDING
+from bson import ObjectId, Binary
+from datetime import datetime, timedelta
+import asyncio
+import bisect
+import hashlib
+import io
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from metrics import JOB_ITEMS, JOB_QUEUE_DEPTH
+
+LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+EVENTS_POLL_INTERVAL = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", "0.5"))
+EVENTS_GAP_TIMEOUT = float(os.getenv("JOB_EVENTS_GAP_TIMEOUT", "10"))
+EVENTS_TOP_N = 5
+
+_indexes_ready = False
+_workers = []
+_stop_event = threading.Event()
+
+def _get_db():
+    global _indexes_ready
+    from database import get_database
+    db = get_database()
+    if db is not None and not _indexes_ready:
+        try:
+            db.job_items.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING), ("created_at", ASCENDING)])
+            db.job_items.create_index([("job_id", ASCENDING), ("index", ASCENDING)])
+            db.job_items.create_index([("job_id", ASCENDING), ("seq", ASCENDING)])
+            _indexes_ready = True
+        except Exception as e:
+            print(f"Error creating job indexes: {e}")
+    return db
+
+def _update_queue_depth(db):
+    """Refresh the queue depth gauge; done when jobs are enqueued or items claimed, not on every scrape."""
+    try:
+        JOB_QUEUE_DEPTH.set(db.job_items.count_documents({"status": "queued"}))
+    except Exception as e:
+        print(f"Error counting queued job items: {e}")
+
+def create_job(jd_id, jd_filename, job_title, source="upload"):
+    """Create an open job. Items are added with add_job_item and the job is sealed with seal_job."""
+    db = _get_db()
+    if db is None:
+        return None
+
+    now = datetime.utcnow()
+    result = db.jobs.insert_one({
+        "jd_id": jd_id,
+        "jd_filename": jd_filename,
+        "job_title": job_title,
+        "source": source,
+        "status": "queued",
+        "sealed": False,
+        "total": 0,
+        "processed": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "seq": 0,
+        "created_at": now,
+        "updated_at": now,
+        "completed_at": None
+    })
+    return str(result.inserted_id)
+
+def add_job_item(job_id, filename, data, index, sha256=None):
+    """Queue one resume PDF for a job. Workers can lease it immediately."""
+    db = _get_db()
+    if db is None:
+        return None
+
+    now = datetime.utcnow()
+    result = db.job_items.insert_one({
+        "job_id": job_id,
+        "index": index,
+        "filename": filename,
+        "sha256": sha256 or hashlib.sha256(data).hexdigest(),
+        "data": Binary(data),
+        "status": "queued",
+        "attempts": 0,
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "result": None,
+        "error": None,
+        "seq": None,
+        "created_at": now,
+        "updated_at": now
+    })
+    return str(result.inserted_id)
+
+def seal_job(job_id, total):
+    """Mark a job as fully enqueued so it can complete once all items are processed."""
+    db = _get_db()
+    if db is None:
+        return False
+
+    db.jobs.update_one(
+        {"_id": ObjectId(job_id)},
+        {"$set": {"sealed": True, "total": total, "updated_at": datetime.utcnow()}}
+    )
+    _maybe_complete_job(db, job_id)
+    _update_queue_depth(db)
+    return True
+
+def fail_job(job_id, error):
+    db = _get_db()
+    if db is None:
+        return False
+
+    now = datetime.utcnow()
+    db.jobs.update_one(
+        {"_id": ObjectId(job_id)},
+        {"$set": {"status": "failed", "error": error, "updated_at": now, "completed_at": now}}
+    )
+    db.job_items.update_many(
+        {"job_id": job_id, "status": "queued"},
+        {"$set": {"status": "failed", "error": "Job aborted", "updated_at": now}, "$unset": {"data": ""}}
+    )
+    _update_queue_depth(db)
+    return True
+
+def enqueue_job(jd_id, jd_filename, job_title, files):
+    """Create and seal a job from a list of (filename, pdf_bytes) tuples."""
+    job_id = create_job(jd_id, jd_filename, job_title)
+    if job_id is None:
+        return None
+
+    for index, (filename, data) in enumerate(files):
+        add_job_item(job_id, filename, data, index)
+
+    seal_job(job_id, len(files))
+    return job_id
+
+def _maybe_complete_job(db, job_id):
+    now = datetime.utcnow()
+    db.jobs.update_one(
+        {
+            "_id": ObjectId(job_id),
+            "sealed": True,
+            "status": {"$in": ["queued", "running"]},
+            "$expr": {"$gte": ["$processed", "$total"]}
+        },
+        {"$set": {"status": "completed", "updated_at": now, "completed_at": now}}
+    )
+
+def lease_item(worker_id):
+    """
+    Atomically claim the oldest runnable item.
+
+    An item is runnable when it is queued, or when a previous worker's lease has
+    expired (the worker crashed or stalled). Returns None when the queue is empty.
+    """
+    db = _get_db()
+    if db is None:
+        return None
+
+    now = datetime.utcnow()
+    item = db.job_items.find_one_and_update(
+        {"$or": [
+            {"status": "queued"},
+            {"status": "running", "lease_expires_at": {"$lt": now}}
+        ]},
+        {
+            "$set": {
+                "status": "running",
+                "lease_owner": worker_id,
+                "lease_expires_at": now + timedelta(seconds=LEASE_SECONDS),
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("created_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER
+    )
+    if item is None:
+        # Nothing runnable means nothing queued, so the idle poll needs no count
+        JOB_QUEUE_DEPTH.set(0)
+    else:
+        _update_queue_depth(db)
+    return item
+
+def _finish_item(db, item, worker_id, status, result=None, error=None):
+    now = datetime.utcnow()
+    update = db.job_items.update_one(
+        {"_id": item["_id"], "status": "running", "lease_owner": worker_id},
+        {
+            "$set": {"status": status, "result": result, "error": error, "lease_expires_at": None, "updated_at": now},
+            "$unset": {"data": ""}
+        }
+    )
+    if update.modified_count == 0:
+        # Lease expired and another worker took the item over
+        return False
+    JOB_ITEMS.inc(status=status)
+
+    job_id = item["job_id"]
+    counters = {"processed": 1, "seq": 1, "succeeded" if status == "done" else "failed": 1}
+    job = db.jobs.find_one_and_update(
+        {"_id": ObjectId(job_id)},
+        {"$inc": counters, "$set": {"updated_at": now}},
+        return_document=ReturnDocument.AFTER
+    )
+    if job:
+        db.job_items.update_one({"_id": item["_id"]}, {"$set": {"seq": job["seq"]}})
+        _maybe_complete_job(db, job_id)
+    return True
+
+def process_item(item, worker_id, jd_cache=None):
+    """Parse and score one leased item, recording the outcome on the item and its job."""
+    from database import get_job_description_by_id, job_description_to_data
+    from screening import screen_resume
+
+    db = _get_db()
+    if db is None:
+        return False
+
+    job_id = item["job_id"]
+    job = db.jobs.find_one({"_id": ObjectId(job_id)}, {"jd_id": 1, "jd_filename": 1, "status": 1})
+    if not job or job.get("status") == "failed":
+        return _finish_item(db, item, worker_id, "failed", error="Job not found or aborted")
+
+    if job.get("status") == "queued":
+        db.jobs.update_one({"_id": job["_id"], "status": "queued"}, {"$set": {"status": "running"}})
+
+    if item.get("attempts", 0) > MAX_ATTEMPTS or "data" not in item:
+        return _finish_item(db, item, worker_id, "failed", error="Exceeded maximum attempts")
+
+    jd_id = job["jd_id"]
+    jd_data = jd_cache.get(jd_id) if jd_cache is not None else None
+    if jd_data is None:
+        jd_doc = get_job_description_by_id(jd_id)
+        if not jd_doc:
+            return _finish_item(db, item, worker_id, "failed", error="Job description not found")
+        jd_data = job_description_to_data(jd_doc)
+        if jd_cache is not None:
+            jd_cache[jd_id] = jd_data
+
+    try:
+        result = screen_resume(io.BytesIO(bytes(item["data"])), item["filename"], jd_id, jd_data, job.get("jd_filename", ""))
+    except Exception as e:
+        print(f"Job {job_id} item {item['index']} failed: {e}")
+        if item.get("attempts", 0) < MAX_ATTEMPTS:
+            # Release the lease so another attempt can pick it up
+            db.job_items.update_one(
+                {"_id": item["_id"], "lease_owner": worker_id},
+                {"$set": {"status": "queued", "lease_owner": None, "lease_expires_at": None, "error": str(e)}}
+            )
+            return False
+        return _finish_item(db, item, worker_id, "failed", error=str(e))
+
+    result["filename"] = item["filename"]
+    return _finish_item(db, item, worker_id, "done", result=result)
+
+def run_worker(worker_id=None, stop_event=None, poll_interval=None):
+    """Lease and process items until stop_event is set."""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    stop_event = stop_event or _stop_event
+    poll_interval = poll_interval if poll_interval is not None else POLL_INTERVAL
+    jd_cache = {}
+
+    print(f"Job worker {worker_id} started")
+    while not stop_event.is_set():
+        try:
+            item = lease_item(worker_id)
+        except Exception as e:
+            print(f"Job worker {worker_id} could not lease: {e}")
+            item = None
+
+        if item is None:
+            stop_event.wait(poll_interval)
+            continue
+
+        try:
+            process_item(item, worker_id, jd_cache)
+        except Exception as e:
+            print(f"Job worker {worker_id} error: {e}")
+    print(f"Job worker {worker_id} stopped")
+
+def start_workers(count):
+    """Start in-process worker threads sharing the Mongo-backed queue."""
+    _stop_event.clear()
+    for i in range(count):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:thread-{i}"
+        thread = threading.Thread(target=run_worker, args=(worker_id, _stop_event), daemon=True, name=f"job-worker-{i}")
+        thread.start()
+        _workers.append(thread)
+    return len(_workers)
+
+def stop_workers(timeout=5.0):
+    _stop_event.set()
+    for thread in _workers:
+        thread.join(timeout)
+    _workers.clear()
+
+def _serialize_job(job):
+    job["_id"] = str(job["_id"])
+    return job
+
+def get_job(job_id, include_items=True):
+    db = _get_db()
+    if db is None:
+        return None
+
+    try:
+        job = db.jobs.find_one({"_id": ObjectId(job_id)})
+    except Exception as e:
+        print(f"Error fetching job: {e}")
+        return None
+    if not job:
+        return None
+
+    job = _serialize_job(job)
+    if include_items:
+        items = list(db.job_items.find(
+            {"job_id": job_id},
+            {"data": 0, "lease_owner": 0}
+        ).sort("index", ASCENDING))
+        for item in items:
+            item["_id"] = str(item["_id"])
+        job["items"] = items
+    return job
+
+def get_completed_items(job_id, after_seq, limit=100):
+    """Return finished items of a job with seq greater than after_seq, in seq order."""
+    db = _get_db()
+    if db is None:
+        return []
+
+    items = list(db.job_items.find(
+        {"job_id": job_id, "seq": {"$gt": after_seq}},
+        {"index": 1, "filename": 1, "status": 1, "result": 1, "error": 1, "seq": 1}
+    ).sort("seq", ASCENDING).limit(limit))
+    for item in items:
+        item["_id"] = str(item["_id"])
+    return items
+
+def get_completed_scores(job_id, up_to_seq):
+    """Overall fit of successful items up to a seq, used to restore rankings on reconnect."""
+    db = _get_db()
+    if db is None:
+        return []
+
+    cursor = db.job_items.find(
+        {"job_id": job_id, "status": "done", "seq": {"$lte": up_to_seq}},
+        {"result.overall_fit": 1, "result.candidate_name": 1, "result.resume_id": 1, "seq": 1}
+    )
+    return [(item["result"], item["seq"]) for item in cursor if item.get("result")]
+
+def _format_sse(event, data, event_id=None):
+    message = ""
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    message += f"event: {event}\n"
+    message += f"data: {json.dumps(data, default=str)}\n\n"
+    return message
+
+def _job_progress(job):
+    return {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "sealed": job.get("sealed", False),
+        "total": job.get("total", 0),
+        "processed": job.get("processed", 0),
+        "succeeded": job.get("succeeded", 0),
+        "failed": job.get("failed", 0)
+    }
+
+async def stream_job_events(job_id, last_seq=0, is_disconnected=None):
+    """
+    Yield Server-Sent Events for a job as its items finish.
+
+    Each successful item is sent as a `result` event carrying its rank among the
+    results seen so far and the current top candidates. Only the sorted overall
+    scores and a short top list are kept, never the full result set. Event ids
+    are item sequence numbers, so clients can resume with Last-Event-ID.
+    """
+    ranked = []
+    top = []
+
+    def add_to_ranking(result, seq):
+        score = result.get("overall_fit", 0)
+        # ranked holds negated scores so bisect gives a descending rank
+        position = bisect.bisect_left(ranked, -score)
+        ranked.insert(position, -score)
+        top.append({"seq": seq, "candidate_name": result.get("candidate_name"),
+                    "resume_id": result.get("resume_id"), "overall_fit": score})
+        top.sort(key=lambda entry: -entry["overall_fit"])
+        del top[EVENTS_TOP_N:]
+        return position + 1
+
+    if last_seq > 0:
+        for result, seq in await asyncio.to_thread(get_completed_scores, job_id, last_seq):
+            add_to_ranking(result, seq)
+
+    last_progress = None
+    gap_since = None
+    keepalive_at = time.monotonic() + 15
+
+    while True:
+        if is_disconnected is not None and await is_disconnected():
+            return
+
+        job = await asyncio.to_thread(get_job, job_id, False)
+        if job is None:
+            yield _format_sse("error", {"detail": "Job not found"})
+            return
+
+        items = await asyncio.to_thread(get_completed_items, job_id, last_seq)
+        waiting_for_gap = False
+        for item in items:
+            if item["seq"] != last_seq + 1:
+                # A worker has claimed a sequence number but not yet written it.
+                # Wait for it unless it never shows up (the worker died in between).
+                if gap_since is None:
+                    gap_since = time.monotonic()
+                if time.monotonic() - gap_since < EVENTS_GAP_TIMEOUT:
+                    waiting_for_gap = True
+                    break
+            gap_since = None
+            last_seq = item["seq"]
+
+            if item["status"] == "done" and item.get("result"):
+                result = item["result"]
+                rank = add_to_ranking(result, item["seq"])
+                yield _format_sse("result", {
+                    "index": item["index"],
+                    "filename": item["filename"],
+                    "rank": rank,
+                    "completed": len(ranked),
+                    "result": result,
+                    "top": top
+                }, event_id=item["seq"])
+            else:
+                yield _format_sse("item_failed", {
+                    "index": item["index"],
+                    "filename": item["filename"],
+                    "error": item.get("error")
+                }, event_id=item["seq"])
+
+        progress = _job_progress(job)
+        if progress != last_progress:
+            yield _format_sse("progress", progress)
+            last_progress = progress
+
+        if job["status"] in ("completed", "failed") and last_seq >= job.get("seq", 0):
+            yield _format_sse("done", {**progress, "top": top})
+            return
+
+        # Gaps are normal (_finish_item claims the seq before writing it), so poll rather than spin
+        if not items or waiting_for_gap:
+            if time.monotonic() >= keepalive_at:
+                yield ": keep-alive\n\n"
+                keepalive_at = time.monotonic() + 15
+            await asyncio.sleep(EVENTS_POLL_INTERVAL)
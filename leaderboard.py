@@ -0,0 +1,132 @@
+import bisect
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+TTL_SECONDS = float(os.getenv("LEADERBOARD_TTL_SECONDS", "300"))
+
+class JDLeaderboard:
+    """
+    Scores for one job description kept sorted by overall fit.
+
+    Entries are (-overall_fit, score_id) tuples in ascending order, so position 0
+    is the best candidate and ties are broken by score id. Lookups and rank
+    queries are binary searches.
+    """
+
+    def __init__(self):
+        self.entries: List[Tuple[float, str]] = []
+        self.scores: Dict[str, Tuple[float, str]] = {}
+        self.resumes: Dict[str, set] = {}
+        self.loaded_at = time.monotonic()
+
+    def add(self, score_id: str, resume_id: str, overall_fit: float):
+        if score_id in self.scores:
+            self.remove(score_id)
+        key = (-float(overall_fit or 0), score_id)
+        bisect.insort(self.entries, key)
+        self.scores[score_id] = (key[0], resume_id)
+        self.resumes.setdefault(resume_id, set()).add(score_id)
+
+    def remove(self, score_id: str) -> bool:
+        entry = self.scores.pop(score_id, None)
+        if entry is None:
+            return False
+        neg_fit, resume_id = entry
+        position = bisect.bisect_left(self.entries, (neg_fit, score_id))
+        if position < len(self.entries) and self.entries[position] == (neg_fit, score_id):
+            del self.entries[position]
+        score_ids = self.resumes.get(resume_id)
+        if score_ids:
+            score_ids.discard(score_id)
+            if not score_ids:
+                del self.resumes[resume_id]
+        return True
+
+    def remove_resume(self, resume_id: str):
+        for score_id in list(self.resumes.get(resume_id, ())):
+            self.remove(score_id)
+
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        return [(score_id, -neg_fit) for neg_fit, score_id in self.entries[:k]]
+
+    def rank_of_score(self, score_id: str) -> Optional[int]:
+        entry = self.scores.get(score_id)
+        if entry is None:
+            return None
+        # Competition ranking: ties share the rank of the first equal score
+        return bisect.bisect_left(self.entries, (entry[0], "")) + 1
+
+    def rank_of_resume(self, resume_id: str) -> Optional[Tuple[int, str, float]]:
+        """Best rank of any score this resume has for the JD, as (rank, score_id, overall_fit)."""
+        best = None
+        for score_id in self.resumes.get(resume_id, ()):
+            rank = self.rank_of_score(score_id)
+            if best is None or rank < best[0]:
+                best = (rank, score_id, -self.scores[score_id][0])
+        return best
+
+    def __len__(self):
+        return len(self.entries)
+
+_boards: Dict[str, JDLeaderboard] = {}
+_lock = threading.Lock()
+
+def _load_board(db, jd_id: str) -> JDLeaderboard:
+    board = JDLeaderboard()
+    # Served by the {jd_id: 1, overall_fit: -1} index, so rows already arrive in rank order
+    cursor = db.scores.find(
+        {"jd_id": jd_id},
+        {"_id": 1, "resume_id": 1, "overall_fit": 1}
+    ).sort([("jd_id", 1), ("overall_fit", -1)])
+    for doc in cursor:
+        score_id = str(doc["_id"])
+        neg_fit = -float(doc.get("overall_fit") or 0)
+        board.entries.append((neg_fit, score_id))
+        board.scores[score_id] = (neg_fit, doc.get("resume_id"))
+        board.resumes.setdefault(doc.get("resume_id"), set()).add(score_id)
+    # Equal scores come back in index order, which need not match score id order
+    board.entries.sort()
+    return board
+
+def get_board(db, jd_id: str) -> JDLeaderboard:
+    """
+    Return the leaderboard for a JD, loading it from MongoDB on first use.
+
+    Boards are refreshed after LEADERBOARD_TTL_SECONDS so that scores written by
+    other API processes or workers become visible.
+    """
+    with _lock:
+        board = _boards.get(jd_id)
+        if board is not None and time.monotonic() - board.loaded_at < TTL_SECONDS:
+            return board
+
+    board = _load_board(db, jd_id)
+    with _lock:
+        _boards[jd_id] = board
+    return board
+
+def record_score(jd_id: str, score_id: str, resume_id: str, overall_fit: float):
+    with _lock:
+        board = _boards.get(jd_id)
+        if board is not None:
+            board.add(score_id, resume_id, overall_fit)
+
+def remove_score(jd_id: str, score_id: str):
+    with _lock:
+        board = _boards.get(jd_id)
+        if board is not None:
+            board.remove(score_id)
+
+def remove_resume(resume_id: str):
+    with _lock:
+        for board in _boards.values():
+            board.remove_resume(resume_id)
+
+def invalidate(jd_id: Optional[str] = None):
+    with _lock:
+        if jd_id is None:
+            _boards.clear()
+        else:
+            _boards.pop(jd_id, None)
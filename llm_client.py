@@ -0,0 +1,305 @@
+import hashlib
+import threading
+import time
+import os
+from collections import deque, OrderedDict
+from typing import Any, Dict, Optional
+from metrics import LLM_CALLS, LLM_CACHE, LLM_BREAKER_OPEN, stage_timer
+
+# google.generativeai takes most of the API's import time, so it is loaded on
+# first use; a module assigned here beforehand (e.g. a fake) is used as is
+genai = None
+
+def _genai():
+    global genai
+    if genai is None:
+        import google.generativeai
+        genai = google.generativeai
+    return genai
+
+# Short extraction prompts (marks, education) go to the fast model, the narrative analysis to the newer one
+EXTRACTION_MODEL = 'gemini-2.0-flash-exp'
+ANALYSIS_MODEL = 'gemini-2.5-flash'
+MODELS = (EXTRACTION_MODEL, ANALYSIS_MODEL)
+
+class LLMUnavailableError(Exception):
+    """Raised when an LLM call could not produce a response."""
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised when the circuit breaker rejects a call without attempting it."""
+
+class CircuitBreaker:
+    """
+    Circuit breaker for outbound LLM calls.
+
+    The breaker tracks the outcome and latency of the most recent calls. It opens
+    when the error rate or the slow-call rate over that window crosses its
+    threshold, rejects calls while open, and after a cool-down lets a limited
+    number of probe calls through (half-open). Successful probes close it again,
+    a failed probe re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_threshold: float = 10.0,
+        slow_call_rate_threshold: float = 0.5,
+        open_duration: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        self._rejected = 0
+        self._last_error = None
+
+    def _transition(self, state: str):
+        self._state = state
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        if state == self.CLOSED:
+            self._calls.clear()
+        print(f"LLM circuit '{self.name}' is now {state}")
+
+    def allow_request(self) -> bool:
+        """Reserve a slot for a call. Returns False when the call must be skipped."""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.open_duration:
+                    self._rejected += 1
+                    return False
+                self._transition(self.HALF_OPEN)
+
+            if self._state == self.HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    self._rejected += 1
+                    return False
+                self._half_open_in_flight += 1
+
+            return True
+
+    def record(self, success: bool, duration: float, error: Optional[str] = None):
+        """Record the outcome of a call previously admitted by allow_request."""
+        slow = duration >= self.slow_call_threshold
+        with self._lock:
+            if not success:
+                self._last_error = error
+
+            if self._state == self.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                if not success or slow:
+                    self._transition(self.OPEN)
+                    return
+                self._half_open_successes += 1
+                if self._half_open_successes >= self.half_open_max_calls:
+                    self._transition(self.CLOSED)
+                return
+
+            self._calls.append((success, slow))
+            if self._state == self.CLOSED and len(self._calls) >= self.min_calls:
+                failures = sum(1 for ok, _ in self._calls if not ok)
+                slow_calls = sum(1 for _, is_slow in self._calls if is_slow)
+                if (failures / len(self._calls) >= self.failure_rate_threshold or
+                        slow_calls / len(self._calls) >= self.slow_call_rate_threshold):
+                    self._transition(self.OPEN)
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run fn through the breaker.
+
+        Raises CircuitOpenError when the breaker is open and LLMUnavailableError
+        when fn itself fails.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"LLM circuit '{self.name}' is open")
+
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record(False, time.monotonic() - start, str(e))
+            raise LLMUnavailableError(str(e)) from e
+
+        self.record(True, time.monotonic() - start)
+        return result
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_duration:
+                return self.HALF_OPEN
+            return self._state
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable view of the breaker for status endpoints."""
+        state = self.state
+        with self._lock:
+            calls = list(self._calls)
+            retry_in = 0.0
+            if state == self.OPEN:
+                retry_in = max(0.0, self.open_duration - (time.monotonic() - self._opened_at))
+            return {
+                "name": self.name,
+                "state": state,
+                "degraded": state != self.CLOSED,
+                "window_calls": len(calls),
+                "window_failures": sum(1 for ok, _ in calls if not ok),
+                "window_slow_calls": sum(1 for _, slow in calls if slow),
+                "rejected_calls": self._rejected,
+                "retry_in_seconds": round(retry_in, 1),
+                "last_error": self._last_error,
+                "thresholds": {
+                    "failure_rate": self.failure_rate_threshold,
+                    "slow_call_seconds": self.slow_call_threshold,
+                    "slow_call_rate": self.slow_call_rate_threshold,
+                    "open_duration_seconds": self.open_duration
+                }
+            }
+
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    window_size=int(os.getenv("LLM_BREAKER_WINDOW", "20")),
+    min_calls=int(os.getenv("LLM_BREAKER_MIN_CALLS", "5")),
+    failure_rate_threshold=float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5")),
+    slow_call_threshold=float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", "10")),
+    slow_call_rate_threshold=float(os.getenv("LLM_BREAKER_SLOW_CALL_RATE", "0.5")),
+    open_duration=float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30")),
+    half_open_max_calls=int(os.getenv("LLM_BREAKER_HALF_OPEN_CALLS", "1"))
+)
+
+_configured_key = None
+_models: Dict[str, Any] = {}
+
+def is_llm_configured() -> bool:
+    return bool(os.getenv("GEMINI_API_KEY"))
+
+def configure_gemini():
+    global _configured_key
+    api_key = os.getenv("GEMINI_API_KEY")
+    if api_key and api_key != _configured_key:
+        _genai().configure(api_key=api_key)
+        _configured_key = api_key
+        # Models bind their client on first use, so they are rebuilt for a new key
+        _models.clear()
+    return bool(api_key)
+
+def get_model(model_name: str):
+    """The GenerativeModel for a name, built once per process and reused by every call."""
+    model = _models.get(model_name)
+    if model is None:
+        model = _models[model_name] = _genai().GenerativeModel(model_name)
+    return model
+
+def warm_up(model_names) -> bool:
+    """Import the SDK and build the models without calling the API; False when no key is configured."""
+    if not configure_gemini():
+        return False
+    for model_name in model_names:
+        get_model(model_name)
+    return True
+
+class ResponseCache:
+    """
+    LRU cache of Gemini responses keyed by model and prompt hash.
+
+    The same education text is sent for marks extraction every time a resume
+    is scored against another JD, so repeated prompts are answered locally.
+    Only successful responses are cached.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name: str, prompt: str) -> str:
+        return model_name + ":" + hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+# Off by default: a cached /analyze narrative or extraction is returned verbatim for a repeated prompt
+response_cache = ResponseCache(int(os.getenv("LLM_CACHE_SIZE", "0")))
+
+def generate_text(model_name: str, prompt: str, timeout: Optional[float] = None) -> str:
+    """
+    Call Gemini through the shared circuit breaker and return the response text.
+
+    Raises LLMUnavailableError (or CircuitOpenError) when no response is available,
+    so callers can fall back to regex-only processing and mark their result degraded.
+    Identical prompts are served from the response cache when LLM_CACHE_SIZE is set.
+    """
+    if not configure_gemini():
+        raise LLMUnavailableError("Gemini API key not configured")
+
+    cache_key = ResponseCache.key(model_name, prompt)
+    cached = response_cache.get(cache_key)
+    LLM_CACHE.inc(result="hit" if cached is not None else "miss")
+    if cached is not None:
+        return cached
+
+    if timeout is None:
+        timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+
+    def _call():
+        response = get_model(model_name).generate_content(prompt, request_options={"timeout": timeout})
+        return response.text.strip()
+
+    try:
+        with stage_timer("llm", model_name):
+            text = gemini_breaker.call(_call)
+    except CircuitOpenError:
+        LLM_CALLS.inc(model=model_name, outcome="rejected")
+        raise
+    except LLMUnavailableError:
+        LLM_CALLS.inc(model=model_name, outcome="error")
+        raise
+    LLM_CALLS.inc(model=model_name, outcome="success")
+    response_cache.put(cache_key, text)
+    return text
+
+LLM_BREAKER_OPEN.set_function(lambda: 0 if gemini_breaker.state == CircuitBreaker.CLOSED else 1)
+
+def get_llm_status() -> Dict[str, Any]:
+    status = gemini_breaker.snapshot()
+    status["configured"] = is_llm_configured()
+    status["cache_entries"] = len(response_cache)
+    return status
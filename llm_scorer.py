@@ -1,10 +1,12 @@
-import google.generativeai as genai
 import json
 import re
 import os
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
+from llm_client import generate_text, LLMUnavailableError, EXTRACTION_MODEL, ANALYSIS_MODEL
+from text_vectors import semantic_similarity
+from metrics import timed_stage
 
 def ensure_log_directory():
     log_dir = Path("logs")
@@ -109,6 +111,20 @@ def calculate_skill_match_score(resume_data: Dict[str, Any], jd_data: Dict[str,
     
     return score, details
 
+YEAR_PATTERN = re.compile(r'(\d+)[\s+-]*(?:to|-)?\s*(\d+)?\s*(?:year|yr)')
+
+def parse_resume_years(experience_text: str) -> int:
+    """Years of experience claimed in a resume's experience text (upper end of a range)."""
+    match = YEAR_PATTERN.search(experience_text.lower())
+    if not match:
+        return 0
+    return max(int(match.group(1)), int(match.group(2)) if match.group(2) else 0)
+
+def parse_required_years(required_exp: str) -> int:
+    """Minimum years of experience asked for in a job description."""
+    match = YEAR_PATTERN.search(required_exp.lower())
+    return int(match.group(1)) if match else 0
+
 def calculate_experience_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any], seniority: str) -> Tuple[float, Dict[str, Any]]:
     """
     Calculate experience relevance score based on seniority level.
@@ -119,19 +135,8 @@ def calculate_experience_score(resume_data: Dict[str, Any], jd_data: Dict[str, A
     experience_text = str(resume_data.get('experience', '')).lower()
     required_exp = str(jd_data.get('experience_required', '')).lower()
     
-    year_pattern = r'(\d+)[\s+-]*(?:to|-)?\s*(\d+)?\s*(?:year|yr)'
-    resume_years_match = re.findall(year_pattern, experience_text)
-    required_years_match = re.findall(year_pattern, required_exp)
-    
-    resume_years = 0
-    if resume_years_match:
-        years = resume_years_match[0]
-        resume_years = max(int(years[0]), int(years[1]) if years[1] else 0)
-    
-    required_years = 0
-    if required_years_match:
-        years = required_years_match[0]
-        required_years = int(years[0])
+    resume_years = parse_resume_years(experience_text)
+    required_years = parse_required_years(required_exp)
     
     if 'intern' in experience_text or 'internship' in experience_text:
         has_internship = True
@@ -172,14 +177,16 @@ def calculate_experience_score(resume_data: Dict[str, Any], jd_data: Dict[str, A
     return score, details
 
 def extract_marks_with_gemini(education_text: str) -> Tuple[float, str]:
-    """Use Gemini to extract academic marks if regex fails."""
-    try:
-        if not check_gemini_configured():
-            return None, None
-        
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        
-        prompt = f"""Extract the HIGHEST academic performance score from this education text.
+    """
+    Use Gemini to extract academic marks if regex fails.
+
+    Raises LLMUnavailableError when Gemini is configured but the call was skipped
+    by the circuit breaker or failed.
+    """
+    if not check_gemini_configured():
+        return None, None
+    
+    prompt = f"""Extract the HIGHEST academic performance score from this education text.
 
 Education text: {education_text}
 
@@ -192,27 +199,50 @@ Examples:
 - PERCENTAGE: 92.5
 
 If no score found, return: NONE"""
-        
-        response = model.generate_content(prompt)
-        result = response.text.strip()
-        
+    
+    try:
+        result = generate_text(EXTRACTION_MODEL, prompt)
+    except LLMUnavailableError as e:
+        log_api_call(f"Gemini marks extraction unavailable: {e}")
+        raise
+    
+    try:
         if 'CGPA:' in result:
             value = float(result.split('CGPA:')[1].strip())
             return value, 'CGPA'
         elif 'PERCENTAGE:' in result:
             value = float(result.split('PERCENTAGE:')[1].strip())
             return value, 'PERCENTAGE'
-        
-        return None, None
-        
-    except Exception as e:
-        log_api_call(f"Gemini marks extraction failed: {e}")
-        return None, None
+    except ValueError as e:
+        log_api_call(f"Gemini marks extraction returned unparseable value: {e}")
+    
+    return None, None
 
-def calculate_education_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+# CGPA or percentage with improved patterns, matched against lowercased education text
+_CGPA_PATTERNS = [re.compile(pattern) for pattern in (
+    r'cgpa[\s:=\-]*(\d+\.?\d*)\s*/?\s*(?:10|4)',
+    r'cgpa[\s:=\-]*(\d+\.?\d*)',
+    r'gpa[\s:=\-]*(\d+\.?\d*)\s*/?\s*(?:10|4)',
+    r'gpa[\s:=\-]*(\d+\.?\d*)',
+    r'aggregate[\s:=\-]*(\d+\.?\d*)\s*cgpa',
+    r'overall[\s:=\-]*(\d+\.?\d*)\s*cgpa',
+)]
+_PERCENTAGE_PATTERNS = [re.compile(pattern) for pattern in (
+    r'(\d{2,3}\.\d+)\s*%',
+    r'(\d{2,3})\.(\d+)\s*%',
+    r'(\d{2,3})\s*%',
+    r'percentage[\s:=\-]*(\d{2,3}\.?\d*)',
+    r'marks[\s:=\-]*(\d{2,3}\.?\d*)',
+    r'aggregate[\s:=\-]*(\d{2,3}\.?\d*)\s*%',
+    r'overall[\s:=\-]*(\d{2,3}\.?\d*)\s*%',
+)]
+
+def calculate_education_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any], use_llm: bool = True) -> Tuple[float, Dict[str, Any]]:
     """
     Calculate education fit score with fine-grained academic performance differentiation.
     
+    With use_llm=False the Gemini fallback for marks extraction is skipped.
+    
     Returns:
         Tuple of (score, details_dict)
     """
@@ -224,33 +254,14 @@ def calculate_education_score(resume_data: Dict[str, Any], jd_data: Dict[str, An
     
     education_lower = education.lower()
     
-    # Extract CGPA or percentage with improved patterns
-    cgpa_patterns = [
-        r'cgpa[\s:=\-]*(\d+\.?\d*)\s*/?\s*(?:10|4)',
-        r'cgpa[\s:=\-]*(\d+\.?\d*)',
-        r'gpa[\s:=\-]*(\d+\.?\d*)\s*/?\s*(?:10|4)',
-        r'gpa[\s:=\-]*(\d+\.?\d*)',
-        r'aggregate[\s:=\-]*(\d+\.?\d*)\s*cgpa',
-        r'overall[\s:=\-]*(\d+\.?\d*)\s*cgpa'
-    ]
-    
-    percentage_patterns = [
-        r'(\d{2,3}\.\d+)\s*%',
-        r'(\d{2,3})\.(\d+)\s*%',
-        r'(\d{2,3})\s*%',
-        r'percentage[\s:=\-]*(\d{2,3}\.?\d*)',
-        r'marks[\s:=\-]*(\d{2,3}\.?\d*)',
-        r'aggregate[\s:=\-]*(\d{2,3}\.?\d*)\s*%',
-        r'overall[\s:=\-]*(\d{2,3}\.?\d*)\s*%'
-    ]
-    
     academic_score = 5.0  # default
     academic_value = None
     academic_type = None
+    llm_degraded = False
     
     # Try to extract CGPA first
-    for pattern in cgpa_patterns:
-        cgpa_match = re.search(pattern, education_lower)
+    for pattern in _CGPA_PATTERNS:
+        cgpa_match = pattern.search(education_lower)
         if cgpa_match:
             cgpa = float(cgpa_match.group(1))
             # Normalize if CGPA is out of 4 or other scale
@@ -287,8 +298,8 @@ def calculate_education_score(resume_data: Dict[str, Any], jd_data: Dict[str, An
     
     # Try percentage if CGPA not found
     if not academic_value:
-        for pattern in percentage_patterns:
-            percentage_match = re.search(pattern, education_lower)
+        for pattern in _PERCENTAGE_PATTERNS:
+            percentage_match = pattern.search(education_lower)
             if percentage_match:
                 if len(percentage_match.groups()) > 1 and percentage_match.group(2):
                     percentage = float(f"{percentage_match.group(1)}.{percentage_match.group(2)}")
@@ -322,9 +333,13 @@ def calculate_education_score(resume_data: Dict[str, Any], jd_data: Dict[str, An
                 break
     
     # If still no academic value found, try Gemini as last resort
-    if not academic_value:
+    if not academic_value and use_llm:
         log_api_call(f"Regex failed to extract marks, trying Gemini for: {education[:100]}")
-        gemini_value, gemini_type = extract_marks_with_gemini(education)
+        try:
+            gemini_value, gemini_type = extract_marks_with_gemini(education)
+        except LLMUnavailableError:
+            gemini_value, gemini_type = None, None
+            llm_degraded = True
         
         if gemini_value and gemini_type:
             if gemini_type == 'CGPA':
@@ -417,7 +432,8 @@ def calculate_education_score(resume_data: Dict[str, Any], jd_data: Dict[str, An
         'academic_type': academic_type,
         'has_tech_degree': has_tech_degree,
         'degree_level': 'PhD' if has_phd else 'Masters' if has_masters else 'Bachelors' if has_bachelors else 'Other',
-        'education_text': education[:150]
+        'education_text': education[:150],
+        'llm_degraded': llm_degraded
     }
     
     return final_score, details
@@ -437,6 +453,32 @@ def compute_weighted_score(
         education_score * edu_weight
     )
 
+# Share of the overall score taken by resume/JD text similarity. 0 keeps scores
+# purely skill/experience/education based; the similarity is still reported.
+SEMANTIC_WEIGHT = min(1.0, max(0.0, float(os.getenv("SEMANTIC_WEIGHT", "0"))))
+
+def apply_semantic_weight(overall_score: float, semantic_score: float, weight: float = SEMANTIC_WEIGHT) -> float:
+    """Blend the semantic sub-score (0-10) into a weighted overall score."""
+    if semantic_score is None or weight <= 0:
+        return overall_score
+    return overall_score * (1 - weight) + semantic_score * weight
+
+SHORTLIST_THRESHOLD = 7.5
+CONDITIONAL_SHORTLIST_MARGIN = 0.5
+
+def decide_shortlist(overall_score: float, critical_missing: List[str], threshold: float = SHORTLIST_THRESHOLD) -> bool:
+    """Apply the shortlisting rule to a weighted overall score."""
+    # Stricter shortlisting criteria: 7.5+ to be shortlisted
+    # Most candidates will be rejected, very few waitlisted
+    if overall_score >= threshold:
+        # Only top performers get shortlisted
+        return True
+    elif overall_score >= threshold - CONDITIONAL_SHORTLIST_MARGIN:
+        # High scorers need no critical skill gaps to be shortlisted
+        return not critical_missing
+    # Everyone below the conditional band is NOT shortlisted (waitlist or reject based on score)
+    return False
+
 def generate_justification(
     resume_data: Dict[str, Any],
     jd_data: Dict[str, Any],
@@ -539,11 +581,13 @@ def generate_justification(
     
     return "\n\n".join(paragraphs)
 
-def get_detailed_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any]) -> Dict[str, Any]:
+@timed_stage("score")
+def get_detailed_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any], use_llm: bool = True) -> Dict[str, Any]:
     """
     Main function to score candidate with intelligent shortlisting logic.
     
     Returns comprehensive scoring with weighted calculations based on job seniority.
+    Pass use_llm=False for deterministic, regex-only scoring (bulk and prefilter paths).
     """
     try:
         has_gemini = check_gemini_configured()
@@ -554,24 +598,18 @@ def get_detailed_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any]) ->
         
         skill_score, skill_details = calculate_skill_match_score(resume_data, jd_data)
         experience_score, exp_details = calculate_experience_score(resume_data, jd_data, seniority)
-        education_score, edu_details = calculate_education_score(resume_data, jd_data)
+        education_score, edu_details = calculate_education_score(resume_data, jd_data, use_llm)
         
         overall_score = compute_weighted_score(
             skill_score, experience_score, education_score,
             skill_weight, exp_weight, edu_weight
         )
         
-        # Stricter shortlisting criteria: 7.5+ to be shortlisted
-        # Most candidates will be rejected, very few waitlisted
-        if overall_score >= 7.5:
-            # Only top performers get shortlisted
-            is_shortlisted = True  
-        elif overall_score >= 7.0:
-            # High scorers need no critical skill gaps to be shortlisted
-            is_shortlisted = not skill_details['critical_missing']
-        else:
-            # Everyone below 7.0 is NOT shortlisted (waitlist or reject based on score)
-            is_shortlisted = False  
+        similarity = semantic_similarity(resume_data.get('text_vector'), jd_data.get('text_vector'))
+        semantic_score = None if similarity is None else similarity * 10
+        overall_score = apply_semantic_weight(overall_score, semantic_score)
+        
+        is_shortlisted = decide_shortlist(overall_score, skill_details['critical_missing'])
 
         justification = generate_justification(
             resume_data, jd_data,
@@ -588,11 +626,14 @@ def get_detailed_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any]) ->
             is_shortlisted
         )
         
+        llm_degraded = bool(resume_data.get('llm_degraded')) or edu_details.get('llm_degraded', False)
+        
         result = {
             'skills_match': round(skill_score, 2),
             'experience_relevance': round(experience_score, 2),
             'education_fit': round(education_score, 2),
             'overall_fit': round(overall_score, 2),
+            'semantic_match': None if semantic_score is None else round(semantic_score, 2),
             'justification': justification,
             'is_shortlisted': is_shortlisted,
             'seniority_level': seniority,
@@ -604,8 +645,13 @@ def get_detailed_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any]) ->
             'details': {
                 'skills': skill_details,
                 'experience': exp_details,
-                'education': edu_details
-            }
+                'education': edu_details,
+                'semantic': {
+                    'similarity': None if similarity is None else round(similarity, 4),
+                    'weight': SEMANTIC_WEIGHT if semantic_score is not None else 0
+                }
+            },
+            'llm_degraded': llm_degraded
         }
         
         log_api_call(f"Score: {overall_score:.1f}/10, Shortlisted: {is_shortlisted}")
@@ -619,11 +665,13 @@ def get_detailed_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any]) ->
             'experience_relevance': 0,
             'education_fit': 0,
             'overall_fit': 0,
+            'semantic_match': None,
             'justification': f"Error: {str(e)}",
             'is_shortlisted': False,
             'seniority_level': 'unknown',
             'weights': {'skills': 0.5, 'experience': 0.3, 'education': 0.2},
-            'details': {}
+            'details': {},
+            'llm_degraded': False
         }
 
 def get_match_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -636,26 +684,31 @@ def get_match_score(resume_data: Dict[str, Any], jd_data: Dict[str, Any]) -> Dic
         'justification': detailed_score['justification']
     }
 
+# Stored/parsed fields that mean nothing to the model and only inflate the prompt
+ANALYSIS_EXCLUDED_FIELDS = ('_id', 'text_vector', 'timestamp', 'llm_degraded', 'full_text', 'minhash', 'lsh_bands')
+
+def _analysis_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in data.items() if key not in ANALYSIS_EXCLUDED_FIELDS}
+
 def get_detailed_analysis(resume_data: Dict[str, Any], jd_data: Dict[str, Any]) -> str:
     """
     Generate detailed analysis using Gemini for additional insights.
     """
     try:
         check_gemini_configured()
-        model = genai.GenerativeModel('gemini-2.5-flash')
         
         prompt = f"""Analyze this candidate's fit for the job role. Provide:
 1. Strengths (what matches well)
 2. Gaps (what's missing)
 3. Overall recommendation
 
-Resume: {json.dumps(resume_data, indent=2)}
-Job Description: {json.dumps(jd_data, indent=2)}"""
+Resume: {json.dumps(_analysis_fields(resume_data), indent=2, default=str)}
+Job Description: {json.dumps(_analysis_fields(jd_data), indent=2, default=str)}"""
 
         log_api_call(f"Calling Gemini API for detailed analysis - Candidate: {resume_data.get('name', 'Unknown')}")
-        response = model.generate_content(prompt)
+        analysis = generate_text(ANALYSIS_MODEL, prompt)
         log_api_call("Detailed analysis generated successfully")
-        return response.text.strip()
+        return analysis
     
     except Exception as e:
         log_api_call(f"ERROR in get_detailed_analysis: {str(e)}")
@@ -0,0 +1,54 @@
+"""
+The API wired to local stand-ins for load testing.
+
+    python -m loadtest.server --port 8000 --gemini-latency 1.2 --gemini-error-rate 0.02
+    python -m loadtest.server --workers 4 --mongo-uri mongodb://localhost:27017
+
+Gemini is replaced by benchmarks.fake_gemini. Without --mongo-uri (or
+MONGO_URI) the database is an in-memory mongomock client, which lives inside
+one worker process; use a local mongod to load test several workers. Search
+and vector index files go to a temporary directory so runs leave the working
+tree alone.
+
+The stand-ins are installed when this module is imported, so uvicorn's
+worker processes (which import "loadtest.app:app") pick them up as well.
+"""
+import os
+import tempfile
+
+_scratch = os.environ.get("LOADTEST_DIR") or tempfile.mkdtemp(prefix="resume-loadtest-")
+os.environ["LOADTEST_DIR"] = _scratch
+os.environ.setdefault("TEXT_SEARCH_PATH", os.path.join(_scratch, "text_index.sqlite3"))
+os.environ.setdefault("VECTOR_INDEX_DIR", os.path.join(_scratch, "vector_index"))
+os.environ.setdefault("PROFILE_DIR", os.path.join(_scratch, "profiles"))
+os.environ.setdefault("JOB_WORKERS", "0")
+
+from benchmarks import fake_gemini
+
+gemini = fake_gemini.install(
+    latency=float(os.getenv("LOADTEST_GEMINI_LATENCY", "0.8")),
+    jitter=float(os.getenv("LOADTEST_GEMINI_JITTER", "0.3")),
+    error_rate=float(os.getenv("LOADTEST_GEMINI_ERROR_RATE", "0.0"))
+)
+
+def use_in_memory_mongo():
+    """Point database.py at a mongomock client (pip install mongomock)."""
+    import mongomock
+    import mongomock.collection
+    import database
+
+    # pymongo >= 4.9 passes sort= to bulk updates, which mongomock 4.x does not accept
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    def _add_update(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+    mongomock.collection.BulkOperationBuilder.add_update = _add_update
+
+    client = mongomock.MongoClient()
+    database.db_client = client
+    database.db = client[os.getenv("DB_NAME", "smart_resume_screener")]
+    database.ensure_indexes(database.db)
+
+if not os.getenv("MONGO_URI"):
+    use_in_memory_mongo()
+
+from main import app
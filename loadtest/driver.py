@@ -0,0 +1,195 @@
+"""
+Replay a realistic request mix against a running API and report latency.
+
+    python -m loadtest.driver --url http://127.0.0.1:8000 --concurrency 16 --duration 60
+    python -m loadtest.driver --rate 5 --duration 120 --mix score_with_existing_jd=8,analytics=2
+
+By default `--concurrency` virtual users each send a request, wait for the
+response and send the next (closed loop). With `--rate` requests instead
+arrive as a Poisson process at that many per second whatever the server
+does (open loop), at most `--concurrency` in flight. Latency is then
+measured from the scheduled arrival, so queueing delay is included.
+
+Uploads are synthetic resumes from benchmarks.synthetic. `--duplicate-rate`
+of them resend an earlier resume to exercise near-duplicate detection.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from benchmarks.synthetic import jd_lines, make_pdf, resume_lines
+
+DEFAULT_MIX = "score_files=2,score_with_existing_jd=6,analytics=2"
+
+class Workload:
+    def __init__(self, jds: int, duplicate_rate: float, seed: int):
+        self.rng = random.Random(seed)
+        self.duplicate_rate = duplicate_rate
+        self.jd_pdfs = [make_pdf(jd_lines(i)) for i in range(jds)]
+        self.jd_ids: List[str] = []
+        self._next_resume = seed * 1_000_000
+        self._sent: List[int] = []
+
+    def resume_pdf(self) -> Tuple[str, bytes]:
+        if self._sent and self.rng.random() < self.duplicate_rate:
+            seed = self.rng.choice(self._sent)
+        else:
+            seed = self._next_resume
+            self._next_resume += 1
+            self._sent.append(seed)
+        # The API stores uploads under their filename while parsing, so names must be unique
+        return f"loadtest-{uuid.uuid4().hex}.pdf", make_pdf(resume_lines(seed))
+
+    async def score_files(self, client: httpx.AsyncClient) -> httpx.Response:
+        name, pdf = self.resume_pdf()
+        jd = self.rng.choice(self.jd_pdfs)
+        files = {"resume": (name, pdf, "application/pdf"), "jd": (f"loadtest-{uuid.uuid4().hex}.pdf", jd, "application/pdf")}
+        return await client.post("/api/score_files", files=files)
+
+    async def score_with_existing_jd(self, client: httpx.AsyncClient) -> httpx.Response:
+        name, pdf = self.resume_pdf()
+        return await client.post("/api/score_with_existing_jd", files={"resume": (name, pdf, "application/pdf")},
+                                 data={"jd_id": self.rng.choice(self.jd_ids)})
+
+    async def analytics(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get("/api/analytics")
+
+    async def setup(self, client: httpx.AsyncClient):
+        """Store the job descriptions once so score_with_existing_jd has ids to use."""
+        for pdf in self.jd_pdfs:
+            name, resume = self.resume_pdf()
+            response = await client.post("/api/score_files", files={
+                "resume": (name, resume, "application/pdf"),
+                "jd": (f"loadtest-jd-{uuid.uuid4().hex}.pdf", pdf, "application/pdf")
+            })
+            response.raise_for_status()
+            self.jd_ids.append(response.json()["jd_id"])
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("score_files", "score_with_existing_jd", "analytics"):
+            raise SystemExit(f"Unknown operation in --mix: {name}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+
+    def record(self, operation: str, seconds: float, status: str):
+        self.latencies.setdefault(operation, []).append(seconds)
+        counts = self.statuses.setdefault(operation, {})
+        counts[status] = counts.get(status, 0) + 1
+        if not status.startswith("2"):
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict]:
+        report = {}
+        everything = []
+        for operation, latencies in sorted(self.latencies.items()):
+            everything.extend(latencies)
+            report[operation] = self._stats(latencies, self.errors.get(operation, 0), elapsed)
+            report[operation]["statuses"] = self.statuses[operation]
+        if everything:
+            report["total"] = self._stats(everything, sum(self.errors.values()), elapsed)
+        return report
+
+    @staticmethod
+    def _stats(latencies: List[float], errors: int, elapsed: float) -> Dict:
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "p99_ms": round(float(p99), 1)
+        }
+
+async def _send(workload: Workload, client: httpx.AsyncClient, operation: str, recorder: Recorder, started: float):
+    try:
+        response = await getattr(workload, operation)(client)
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    recorder.record(operation, time.perf_counter() - started, status)
+
+async def run(url: str, mix: Dict[str, float], concurrency: int, duration: float, rate: Optional[float],
+              jds: int, duplicate_rate: float, timeout: float, seed: int) -> Dict[str, Dict]:
+    workload = Workload(jds, duplicate_rate, seed)
+    operations, weights = zip(*mix.items())
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        if "score_with_existing_jd" in mix:
+            await workload.setup(client)
+
+        start = time.perf_counter()
+        deadline = start + duration
+
+        if rate is None:
+            async def user():
+                while time.perf_counter() < deadline:
+                    operation = workload.rng.choices(operations, weights)[0]
+                    await _send(workload, client, operation, recorder, time.perf_counter())
+            await asyncio.gather(*(user() for _ in range(concurrency)))
+        else:
+            slots = asyncio.Semaphore(concurrency)
+            pending = set()
+
+            async def arrival(operation, scheduled):
+                async with slots:
+                    await _send(workload, client, operation, recorder, scheduled)
+
+            scheduled = start
+            while scheduled < deadline:
+                scheduled += workload.rng.expovariate(rate)
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                task = asyncio.create_task(arrival(workload.rng.choices(operations, weights)[0], scheduled))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            await asyncio.gather(*pending)
+
+        return recorder.summary(time.perf_counter() - start)
+
+def print_report(report: Dict[str, Dict]):
+    print(f"{'operation':<24} {'requests':>8} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for operation, stats in report.items():
+        print(f"{operation:<24} {stats['requests']:>8} {stats['errors']:>7} {stats['throughput_rps']:>8.2f} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest.driver")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation=weight pairs, comma separated")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--rate", type=float, help="open-loop arrivals per second")
+    parser.add_argument("--jds", type=int, default=5)
+    parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args.url, parse_mix(args.mix), args.concurrency, args.duration, args.rate,
+                             args.jds, args.duplicate_rate, args.timeout, args.seed))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
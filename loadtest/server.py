@@ -0,0 +1,32 @@
+"""
+Serve loadtest.app with uvicorn; see that module for what is stubbed.
+"""
+import argparse
+import os
+import uvicorn
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest.server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--mongo-uri", help="use a real MongoDB instead of the in-memory stand-in")
+    parser.add_argument("--gemini-latency", type=float, help="seconds per fake Gemini call (default 0.8)")
+    parser.add_argument("--gemini-jitter", type=float, help="+/- seconds of uniform jitter (default 0.3)")
+    parser.add_argument("--gemini-error-rate", type=float, help="share of fake Gemini calls that fail (default 0)")
+    args = parser.parse_args(argv)
+
+    # Settings travel to the worker processes through the environment
+    for name, value in (("MONGO_URI", args.mongo_uri),
+                        ("LOADTEST_GEMINI_LATENCY", args.gemini_latency),
+                        ("LOADTEST_GEMINI_JITTER", args.gemini_jitter),
+                        ("LOADTEST_GEMINI_ERROR_RATE", args.gemini_error_rate)):
+        if value is not None:
+            os.environ[name] = str(value)
+    if args.workers > 1 and not os.getenv("MONGO_URI"):
+        print("Warning: each worker gets its own in-memory database; pass --mongo-uri to share one")
+
+    uvicorn.run("loadtest.app:app", host=args.host, port=args.port, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,27 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Body
+from fastapi import FastAPI, UploadFile, File, HTTPException, Body, Form, Request, Header, Query
+from fastapi.responses import StreamingResponse, Response, JSONResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-import google.generativeai as genai
+import asyncio
 import os
 import shutil
+import time
+import metrics
+import timing
+import profiling
+import warmup
+from compression import CompressionMiddleware
+from fast_json import FastJSONResponse
 from pathlib import Path
 from parsers.resume_parser import extract_resume_data
 from parsers.jd_parser import extract_jd_data
-from llm_scorer import get_match_score, get_detailed_analysis, get_detailed_score
-from pydantic import BaseModel
-from typing import Dict, Any
+from llm_scorer import get_match_score, get_detailed_analysis, get_detailed_score, SHORTLIST_THRESHOLD
+from llm_client import get_llm_status
+from pipeline import DEFAULT_TOP_K, DEFAULT_CONCURRENCY
+from parse_pool import ParseRejectedError
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
 
 load_dotenv()
 
@@ -25,24 +36,58 @@ class ScoreRequest(BaseModel):
     resume_path: str
     jd_path: str
 
+class MatrixScoringRequest(BaseModel):
+    threshold: float = 7.0
+    memory_budget_mb: int = 256
+    jd_ids: Optional[List[str]] = None
+    persist: bool = True
+
+class ReweightRequest(BaseModel):
+    weights: Dict[str, float]
+    threshold: float = SHORTLIST_THRESHOLD
+    limit: Optional[int] = None
+
+class PipelineRequest(BaseModel):
+    resume_ids: Optional[List[str]] = None
+    top_k: int = Field(DEFAULT_TOP_K, ge=0)
+    concurrency: int = Field(DEFAULT_CONCURRENCY, ge=1)
+    limit: Optional[int] = None
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    from database import get_db_client, close_db_client
+    import database
+    from jobs import start_workers, stop_workers
+    
+    # Serve at once: Mongo connects in the background, then the indexes are loaded and the job workers start.
+    # Gemini is configured by the warm-up or the first LLM call, so google.generativeai is not imported here.
+    job_workers = int(os.getenv("JOB_WORKERS", "1"))
+    def on_connected(client):
+        warmup.database_connected()
+        if job_workers > 0:
+            start_workers(job_workers)
+    connect_thread = database.connect_in_background(on_connected=on_connected)
     
-    db_client = get_db_client()
+    from parse_pool import start_pool, stop_pool
+    start_pool(int(os.getenv("PARSE_WORKERS", "2")))
     
-    gemini_key = os.getenv("GEMINI_API_KEY")
-    if gemini_key:
-        genai.configure(api_key=gemini_key)
+    if warmup.WARMUP_MODE == "blocking":
+        await asyncio.to_thread(warmup.run)
+    else:
+        warmup.start()
     
     yield
     
-    close_db_client(db_client)
+    database.stop_connecting()
+    connect_thread.join(5)
+    stop_workers()
+    stop_pool()
+    database.close_db_client(database.db_client)
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Create API router with /api prefix
 from fastapi import APIRouter
+API_PREFIX = "/api"
 api_router = APIRouter()
 
 app.add_middleware(
@@ -53,6 +98,72 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    metrics.HTTP_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    timings = timing.start_request()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["Server-Timing"] = timings.server_timing()
+        return response
+    finally:
+        metrics.HTTP_IN_FLIGHT.dec()
+        # Label by the matched route template to keep cardinality bounded. Newer FastAPI versions match
+        # api_router's own routes, whose path lacks the prefix; older ones match prefixed copies.
+        matched = request.scope.get("route")
+        route = getattr(matched, "path", None) or "unmatched"
+        if matched is not None and matched in api_router.routes:
+            route = API_PREFIX + route
+        metrics.HTTP_SECONDS.observe(time.perf_counter() - start, method=request.method, route=route)
+        metrics.HTTP_REQUESTS.inc(method=request.method, route=route, status=status)
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    # Unprofiled requests stop at this lookup
+    mode = profiling.profile_mode(request.query_params.get("profile"))
+    if mode is None:
+        return await call_next(request)
+    if not profiling.is_admin(request.headers.get("x-admin-token")):
+        return JSONResponse(status_code=403, content={"detail": "Profiling requires a valid X-Admin-Token header"})
+    profile = profiling.RequestProfile(mode, f"{request.method} {request.url.path}")
+    try:
+        with profile:
+            response = await call_next(request)
+    except profiling.ProfilerBusyError as e:
+        return JSONResponse(status_code=409, content={"detail": str(e)})
+    response.headers["X-Profile-Id"] = profile.profile_id
+    return response
+
+def with_timings(payload: Dict[str, Any], include: bool) -> Dict[str, Any]:
+    """Add the per-stage breakdown of the current request when the client asked for it (?timings=true)."""
+    if include:
+        payload["timings"] = timing.snapshot()
+    return payload
+
+def without_blobs(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Parsed data without the stored-only fields (encoded vectors, MinHash signatures) that list endpoints also leave out."""
+    from database import LIST_PROJECTION
+    return {key: value for key, value in data.items() if key not in LIST_PROJECTION}
+
+@app.get("/metrics")
+def get_metrics():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# Probes are async and constant-time: parsing and scoring run in threads, so the event loop stays free to answer them
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    state = warmup.readiness()
+    return JSONResponse(status_code=200 if state["status"] == "ready" else 503, content=state)
+
 @app.get("/")
 def root():
     return {"message": "Smart Resume Screener API running"}
@@ -62,7 +173,7 @@ def api_root():
     return {"message": "Smart Resume Screener API running"}
 
 @app.post("/parse_resume")
-async def parse_resume(file: UploadFile = File(...)):
+async def parse_resume(file: UploadFile = File(...), timings: bool = Query(False)):
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
@@ -72,14 +183,16 @@ async def parse_resume(file: UploadFile = File(...)):
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
         
-        parsed_data = extract_resume_data(str(file_path))
+        parsed_data = await asyncio.to_thread(extract_resume_data, str(file_path))
         
-        return {
+        return with_timings({
             "status": "success",
             "filename": file.filename,
-            "data": parsed_data
-        }
+            "data": without_blobs(parsed_data)
+        }, timings)
     
+    except ParseRejectedError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error parsing resume: {str(e)}")
     
@@ -88,7 +201,7 @@ async def parse_resume(file: UploadFile = File(...)):
             file_path.unlink()
 
 @app.post("/parse_jd")
-async def parse_jd(file: UploadFile = File(...)):
+async def parse_jd(file: UploadFile = File(...), timings: bool = Query(False)):
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
@@ -98,14 +211,16 @@ async def parse_jd(file: UploadFile = File(...)):
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
         
-        parsed_data = extract_jd_data(str(file_path))
+        parsed_data = await asyncio.to_thread(extract_jd_data, str(file_path))
         
-        return {
+        return with_timings({
             "status": "success",
             "filename": file.filename,
-            "data": parsed_data
-        }
+            "data": without_blobs(parsed_data)
+        }, timings)
     
+    except ParseRejectedError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error parsing job description: {str(e)}")
     
@@ -147,7 +262,7 @@ async def analyze_candidate(request: MatchRequest):
         raise HTTPException(status_code=500, detail=f"Error analyzing candidate: {str(e)}")
 
 @app.post("/score")
-async def score_resume_jd(request: ScoreRequest):
+async def score_resume_jd(request: ScoreRequest, timings: bool = Query(False)):
     try:
         gemini_key = os.getenv("GEMINI_API_KEY")
         if not gemini_key:
@@ -168,12 +283,12 @@ async def score_resume_jd(request: ScoreRequest):
         if not jd_file.suffix.lower() == '.pdf':
             raise HTTPException(status_code=422, detail="Job description must be a PDF file")
         
-        resume_data = extract_resume_data(str(resume_file))
-        jd_data = extract_jd_data(str(jd_file))
+        resume_data = await asyncio.to_thread(extract_resume_data, str(resume_file))
+        jd_data = await asyncio.to_thread(extract_jd_data, str(jd_file))
         
-        detailed_score = get_detailed_score(resume_data, jd_data)
+        detailed_score = await asyncio.to_thread(get_detailed_score, resume_data, jd_data)
         
-        return {
+        return with_timings({
             "status": "success",
             "candidate_name": resume_data.get('name', 'Unknown'),
             "job_title": jd_data.get('job_title', 'Not specified'),
@@ -181,17 +296,21 @@ async def score_resume_jd(request: ScoreRequest):
             "experience_relevance": detailed_score["experience_relevance"],
             "education_fit": detailed_score["education_fit"],
             "overall_fit": detailed_score["overall_fit"],
-            "justification": detailed_score["justification"]
-        }
+            "justification": detailed_score["justification"],
+            "llm_degraded": detailed_score["llm_degraded"]
+        }, timings)
     
     except HTTPException:
         raise
+    except ParseRejectedError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error scoring resume: {str(e)}")
 
 @api_router.post("/score_files")
-async def score_uploaded_files(resume: UploadFile = File(...), jd: UploadFile = File(...)):
-    from database import save_resume, save_job_description, save_score
+async def score_uploaded_files(resume: UploadFile = File(...), jd: UploadFile = File(...), timings: bool = Query(False)):
+    from database import save_job_description
+    from screening import screen_resume
     
     try:
         gemini_key = os.getenv("GEMINI_API_KEY")
@@ -214,39 +333,16 @@ async def score_uploaded_files(resume: UploadFile = File(...), jd: UploadFile =
             with open(jd_path, "wb") as buffer:
                 shutil.copyfileobj(jd.file, buffer)
             
-            resume_data = extract_resume_data(str(resume_path))
-            jd_data = extract_jd_data(str(jd_path))
-            
-            detailed_score = get_detailed_score(resume_data, jd_data)
-            
-            resume_id = save_resume(resume_data, resume.filename)
+            jd_data = await asyncio.to_thread(extract_jd_data, str(jd_path))
             jd_id = save_job_description(jd_data, jd.filename)
             
-            score_data = {
-                "name": resume_data.get('name', 'Unknown'),
-                "job_title": jd_data.get('job_title', 'Not specified'),
-                "skills_match": detailed_score["skills_match"],
-                "experience_relevance": detailed_score["experience_relevance"],
-                "education_fit": detailed_score["education_fit"],
-                "overall_fit": detailed_score["overall_fit"],
-                "justification": detailed_score["justification"]
-            }
+            # Same path as the other upload endpoints, so a near-duplicate resume is flagged and reused here too
+            result = await asyncio.to_thread(screen_resume, str(resume_path), resume.filename, jd_id, jd_data, jd.filename)
             
-            score_id = save_score(resume_id, jd_id, score_data, resume.filename, jd.filename)
-            
-            return {
+            return with_timings({
                 "status": "success",
-                "score_id": score_id,
-                "resume_id": resume_id,
-                "jd_id": jd_id,
-                "candidate_name": resume_data.get('name', 'Unknown'),
-                "job_title": jd_data.get('job_title', 'Not specified'),
-                "skills_match": detailed_score["skills_match"],
-                "experience_relevance": detailed_score["experience_relevance"],
-                "education_fit": detailed_score["education_fit"],
-                "overall_fit": detailed_score["overall_fit"],
-                "justification": detailed_score["justification"]
-            }
+                **result
+            }, timings)
         
         finally:
             if resume_path.exists():
@@ -256,12 +352,15 @@ async def score_uploaded_files(resume: UploadFile = File(...), jd: UploadFile =
     
     except HTTPException:
         raise
+    except ParseRejectedError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error scoring files: {str(e)}")
 
 @api_router.post("/score_with_existing_jd")
-async def score_with_existing_jd(resume: UploadFile = File(...), jd_id: str = Body(...)):
-    from database import save_resume, save_score, get_job_description_by_id
+async def score_with_existing_jd(resume: UploadFile = File(...), jd_id: str = Body(...), timings: bool = Query(False)):
+    from database import get_job_description_by_id, job_description_to_data
+    from screening import screen_resume
     
     try:
         gemini_key = os.getenv("GEMINI_API_KEY")
@@ -282,48 +381,17 @@ async def score_with_existing_jd(resume: UploadFile = File(...), jd_id: str = Bo
             with open(resume_path, "wb") as buffer:
                 shutil.copyfileobj(resume.file, buffer)
             
-            resume_data = extract_resume_data(str(resume_path))
-            
             # Convert JD document to the format expected by scorer
-            jd_data = {
-                "job_title": jd_doc.get("job_title", "Unknown"),
-                "company": jd_doc.get("company", ""),
-                "location": jd_doc.get("location", ""),
-                "required_skills": jd_doc.get("required_skills", []),
-                "experience_required": jd_doc.get("experience_required", ""),
-                "qualifications": jd_doc.get("qualifications", []),
-                "responsibilities": jd_doc.get("responsibilities", [])
-            }
-            
-            detailed_score = get_detailed_score(resume_data, jd_data)
+            jd_data = job_description_to_data(jd_doc)
             
-            resume_id = save_resume(resume_data, resume.filename)
+            result = await asyncio.to_thread(
+                screen_resume, str(resume_path), resume.filename, jd_id, jd_data, jd_doc.get("filename", "")
+            )
             
-            score_data = {
-                "name": resume_data.get('name', 'Unknown'),
-                "job_title": jd_data.get('job_title', 'Not specified'),
-                "skills_match": detailed_score["skills_match"],
-                "experience_relevance": detailed_score["experience_relevance"],
-                "education_fit": detailed_score["education_fit"],
-                "overall_fit": detailed_score["overall_fit"],
-                "justification": detailed_score["justification"]
-            }
-            
-            score_id = save_score(resume_id, jd_id, score_data, resume.filename, jd_doc.get("filename", ""))
-            
-            return {
+            return with_timings({
                 "status": "success",
-                "score_id": score_id,
-                "resume_id": resume_id,
-                "jd_id": jd_id,
-                "candidate_name": resume_data.get('name', 'Unknown'),
-                "job_title": jd_data.get('job_title', 'Not specified'),
-                "skills_match": detailed_score["skills_match"],
-                "experience_relevance": detailed_score["experience_relevance"],
-                "education_fit": detailed_score["education_fit"],
-                "overall_fit": detailed_score["overall_fit"],
-                "justification": detailed_score["justification"]
-            }
+                **result
+            }, timings)
         
         finally:
             if resume_path.exists():
@@ -331,9 +399,184 @@ async def score_with_existing_jd(resume: UploadFile = File(...), jd_id: str = Bo
     
     except HTTPException:
         raise
+    except ParseRejectedError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error scoring with existing JD: {str(e)}")
 
+async def resolve_job_description(jd: Optional[UploadFile], jd_id: Optional[str]):
+    """Parse and save an uploaded JD, or look up a stored one. Returns (jd_id, jd_filename, job_title)."""
+    from database import save_job_description, get_job_description_by_id
+    
+    if jd is not None:
+        if not jd.filename.endswith('.pdf'):
+            raise HTTPException(status_code=422, detail="Job description must be a PDF file")
+        
+        jd_path = UPLOAD_DIR / jd.filename
+        try:
+            with open(jd_path, "wb") as buffer:
+                shutil.copyfileobj(jd.file, buffer)
+            jd_data = await asyncio.to_thread(extract_jd_data, str(jd_path))
+        finally:
+            if jd_path.exists():
+                jd_path.unlink()
+        
+        saved_id = save_job_description(jd_data, jd.filename)
+        if not saved_id:
+            raise HTTPException(status_code=500, detail="Unable to save job description")
+        return saved_id, jd.filename, jd_data.get("job_title", "Not specified")
+    
+    if jd_id:
+        jd_doc = get_job_description_by_id(jd_id)
+        if not jd_doc:
+            raise HTTPException(status_code=404, detail="Job description not found")
+        return jd_id, jd_doc.get("filename", ""), jd_doc.get("job_title", "Not specified")
+    
+    raise HTTPException(status_code=422, detail="Either a jd file or jd_id is required")
+
+@api_router.post("/jobs")
+async def create_screening_job(
+    resumes: List[UploadFile] = File(...),
+    jd: Optional[UploadFile] = File(None),
+    jd_id: Optional[str] = Form(None)
+):
+    from jobs import enqueue_job
+    
+    try:
+        gemini_key = os.getenv("GEMINI_API_KEY")
+        if not gemini_key:
+            raise HTTPException(status_code=401, detail="Gemini API key not configured")
+        
+        if not resumes:
+            raise HTTPException(status_code=422, detail="At least one resume is required")
+        
+        for resume in resumes:
+            if not resume.filename.endswith('.pdf'):
+                raise HTTPException(status_code=422, detail=f"Resume must be a PDF file: {resume.filename}")
+        
+        jd_id, jd_filename, job_title = await resolve_job_description(jd, jd_id)
+        
+        files = [(resume.filename, await resume.read()) for resume in resumes]
+        job_id = enqueue_job(jd_id, jd_filename, job_title, files)
+        if not job_id:
+            raise HTTPException(status_code=500, detail="Unable to enqueue job")
+        
+        return {
+            "status": "success",
+            "job_id": job_id,
+            "jd_id": jd_id,
+            "total": len(files)
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating job: {str(e)}")
+
+@api_router.post("/jobs/archive")
+async def create_archive_job(
+    archive: UploadFile = File(...),
+    jd: Optional[UploadFile] = File(None),
+    jd_id: Optional[str] = Form(None)
+):
+    from archive_ingest import enqueue_archive, archive_kind, ArchiveLimitError, UnsupportedArchiveError
+    
+    try:
+        gemini_key = os.getenv("GEMINI_API_KEY")
+        if not gemini_key:
+            raise HTTPException(status_code=401, detail="Gemini API key not configured")
+        
+        if archive_kind(archive.filename) is None:
+            raise HTTPException(status_code=422, detail="Archive must be a .zip, .tar or .tar.gz file")
+        
+        jd_id, jd_filename, job_title = await resolve_job_description(jd, jd_id)
+        
+        try:
+            job_id, stats = await asyncio.to_thread(
+                enqueue_archive, archive.file, archive.filename, jd_id, jd_filename, job_title
+            )
+        except ArchiveLimitError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except UnsupportedArchiveError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        if not job_id:
+            raise HTTPException(status_code=500, detail="Unable to enqueue job")
+        
+        return {
+            "status": "success",
+            "job_id": job_id,
+            "jd_id": jd_id,
+            "total": stats["pdfs"],
+            "archive": stats
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error ingesting archive: {str(e)}")
+
+@api_router.get("/jobs/{job_id}")
+async def get_screening_job(job_id: str, include_items: bool = True):
+    from jobs import get_job
+    
+    try:
+        job = get_job(job_id, include_items=include_items)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        return {
+            "status": "success",
+            "data": job
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching job: {str(e)}")
+
+@api_router.get("/jobs/{job_id}/events")
+async def stream_screening_job(job_id: str, request: Request, last_event_id: Optional[str] = Header(None)):
+    from jobs import get_job, stream_job_events
+    
+    job = get_job(job_id, include_items=False)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        last_seq = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        last_seq = 0
+    
+    return StreamingResponse(
+        stream_job_events(job_id, last_seq, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.post("/matrix_scoring")
+async def matrix_scoring(request: MatrixScoringRequest):
+    from matrix_scoring import run_matrix_scoring
+    
+    try:
+        if request.memory_budget_mb <= 0:
+            raise HTTPException(status_code=422, detail="memory_budget_mb must be positive")
+        
+        result = await asyncio.to_thread(
+            run_matrix_scoring, request.threshold, request.memory_budget_mb, request.jd_ids, request.persist
+        )
+        if result is None:
+            raise HTTPException(status_code=500, detail="Database not configured")
+        
+        return {
+            "status": "success",
+            "data": result
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running matrix scoring: {str(e)}")
+
 @api_router.get("/analytics")
 async def get_analytics():
     from database import get_analytics_data
@@ -361,6 +604,7 @@ async def check_db_status():
     try:
         cleanup_orphaned_scores()
         status = get_db_status()
+        status["llm"] = get_llm_status()
         return {
             "status": "success",
             "data": status
@@ -369,61 +613,256 @@ async def check_db_status():
         raise HTTPException(status_code=500, detail=f"Error checking database status: {str(e)}")
 
 @api_router.get("/resumes")
-async def get_resumes():
+async def get_resumes(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=10000)):
     from database import get_all_resumes
     
     try:
-        resumes = get_all_resumes()
-        return {
+        resumes = get_all_resumes(skip, limit)
+        return FastJSONResponse({
             "status": "success",
             "count": len(resumes),
             "data": resumes
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching resumes: {str(e)}")
 
+@api_router.get("/resumes/search")
+async def search_resumes(
+    skills: Optional[str] = Query(None, description="comma-separated skills"),
+    q: Optional[str] = Query(None, description="free-text query, ranked by BM25"),
+    mode: str = Query("all", pattern="^(all|any)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    from database import search_resumes_by_skills, search_resumes_by_text
+    
+    try:
+        skill_list = [skill.strip() for skill in (skills or "").split(",") if skill.strip()]
+        query = (q or "").strip()
+        if not skill_list and not query:
+            raise HTTPException(status_code=422, detail="A skill list or a text query is required")
+        
+        if query:
+            result = await asyncio.to_thread(search_resumes_by_text, query, skill_list, mode, skip, limit)
+        else:
+            result = await asyncio.to_thread(search_resumes_by_skills, skill_list, mode, skip, limit)
+        if result is None:
+            raise HTTPException(status_code=500, detail="Unable to search resumes")
+        
+        return {
+            "status": "success",
+            "total": result["total"],
+            "count": len(result["resumes"]),
+            "data": result["resumes"]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching resumes: {str(e)}")
+
 @api_router.get("/scores")
-async def get_scores():
+async def get_scores(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=10000)):
     from database import get_all_scores
     
     try:
-        scores = get_all_scores()
-        return {
+        scores = get_all_scores(skip, limit)
+        # Returned as a response so FastAPI does not re-encode every document
+        return FastJSONResponse({
             "status": "success",
             "count": len(scores),
             "data": scores
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching scores: {str(e)}")
 
 @api_router.get("/job_descriptions")
-async def get_job_descriptions():
+async def get_job_descriptions(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=10000)):
     from database import get_all_job_descriptions
     
     try:
-        jds = get_all_job_descriptions()
-        return {
+        jds = get_all_job_descriptions(skip, limit)
+        return FastJSONResponse({
             "status": "success",
             "count": len(jds),
             "data": jds
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching job descriptions: {str(e)}")
 
+@api_router.get("/job_descriptions/{jd_id}/top")
+async def get_job_description_top(jd_id: str, k: int = Query(10, ge=1, le=500)):
+    from database import get_top_scores
+    
+    try:
+        result = get_top_scores(jd_id, k)
+        if result is None:
+            raise HTTPException(status_code=500, detail="Unable to fetch leaderboard")
+        
+        return {
+            "status": "success",
+            "jd_id": jd_id,
+            "total": result["total"],
+            "count": len(result["scores"]),
+            "data": result["scores"]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching top candidates: {str(e)}")
+
+@api_router.get("/job_descriptions/{jd_id}/similar_candidates")
+async def get_similar_candidates(
+    jd_id: str,
+    k: int = Query(10, ge=1, le=500),
+    nprobe: Optional[int] = Query(None, ge=1)
+):
+    from database import find_similar_candidates
+    
+    try:
+        # May rebuild the vector index, so it runs in a thread to keep the event loop free
+        result = await asyncio.to_thread(find_similar_candidates, jd_id, k, nprobe)
+        if result is None:
+            raise HTTPException(status_code=500, detail="Unable to search candidates")
+        if result["job_description"] is None:
+            raise HTTPException(status_code=404, detail="Job description not found")
+        if not result["vector"]:
+            raise HTTPException(status_code=400, detail="Job description has no text vector; upload it again to compute one")
+        
+        return {
+            "status": "success",
+            "jd_id": jd_id,
+            "indexed": result["indexed"],
+            "count": len(result["candidates"]),
+            "data": result["candidates"]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding similar candidates: {str(e)}")
+
+@api_router.post("/job_descriptions/{jd_id}/screen")
+async def screen_job_description(jd_id: str, request: PipelineRequest = Body(PipelineRequest())):
+    from pipeline import run_pipeline
+    
+    try:
+        result = await run_pipeline(jd_id, request.resume_ids, request.top_k, request.concurrency)
+        if result is None:
+            raise HTTPException(status_code=500, detail="Database not configured")
+        if result["job_description"] is None:
+            raise HTTPException(status_code=404, detail="Job description not found")
+        
+        results = result["results"]
+        if request.limit is not None:
+            results = results[:request.limit]
+        
+        return {
+            "status": "success",
+            "jd_id": jd_id,
+            "job_title": result["job_title"],
+            "screened": result["screened"],
+            "analyzed": result["analyzed"],
+            "count": len(results),
+            "data": results
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error screening resumes: {str(e)}")
+
+@api_router.get("/job_descriptions/{jd_id}/rank")
+async def get_job_description_rank(jd_id: str, resume_id: str):
+    from database import get_candidate_rank
+    
+    try:
+        rank = get_candidate_rank(jd_id, resume_id)
+        if rank is None:
+            raise HTTPException(status_code=404, detail="No score found for this resume and job description")
+        
+        return {
+            "status": "success",
+            "data": rank
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching candidate rank: {str(e)}")
+
+@api_router.post("/job_descriptions/{jd_id}/reweight")
+async def reweight_job_description(jd_id: str, request: ReweightRequest):
+    from database import get_score_components, get_job_description_by_id
+    from reweight import reweight_scores
+    
+    try:
+        if not get_job_description_by_id(jd_id):
+            raise HTTPException(status_code=404, detail="Job description not found")
+        
+        score_docs = get_score_components(jd_id)
+        
+        try:
+            result = reweight_scores(score_docs, request.weights, request.threshold)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        scores = result["scores"][:request.limit] if request.limit else result["scores"]
+        
+        return {
+            "status": "success",
+            "jd_id": jd_id,
+            "weights": result["weights"],
+            "threshold": result["threshold"],
+            "total": len(result["scores"]),
+            "shortlisted": result["shortlisted"],
+            "previously_shortlisted": result["previously_shortlisted"],
+            "count": len(scores),
+            "data": scores
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error re-weighting scores: {str(e)}")
+
 @api_router.get("/resumes/{resume_id}/scores")
 async def get_resume_scores(resume_id: str):
     from database import get_resume_scores
     
     try:
         scores = get_resume_scores(resume_id)
-        return {
+        return FastJSONResponse({
             "status": "success",
             "count": len(scores),
             "data": scores
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching resume scores: {str(e)}")
 
+@api_router.get("/resumes/{resume_id}/matching_jds")
+async def get_matching_job_descriptions(
+    resume_id: str,
+    min_shared: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    exclude_scored: bool = True
+):
+    from reverse_matching import find_matching_jds
+    
+    try:
+        result = await asyncio.to_thread(find_matching_jds, resume_id, min_shared, limit, exclude_scored)
+        if result is None:
+            raise HTTPException(status_code=500, detail="Database not configured")
+        if result["resume"] is None:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        
+        return {
+            "status": "success",
+            "resume": result["resume"],
+            "candidates_scored": result["candidates"],
+            "count": len(result["matches"]),
+            "data": result["matches"]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding matching job descriptions: {str(e)}")
+
 @api_router.delete("/resumes/{resume_id}")
 async def delete_resume(resume_id: str):
     from database import delete_resume
@@ -460,6 +899,24 @@ async def delete_score(score_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting score: {str(e)}")
 
+@api_router.get("/profiles")
+async def get_profiles(x_admin_token: Optional[str] = Header(None)):
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    return {
+        "status": "success",
+        "profiles": profiling.list_profiles()
+    }
+
+@api_router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=path.name)
+
 @api_router.post("/clear_database")
 async def clear_database():
     from database import clear_all_data
@@ -479,4 +936,4 @@ async def clear_database():
         raise HTTPException(status_code=500, detail=f"Error clearing database: {str(e)}")
 
 # Include the API router with /api prefix at the end after all routes are defined
-app.include_router(api_router, prefix="/api")
+app.include_router(api_router, prefix=API_PREFIX)
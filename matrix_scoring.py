@@ -0,0 +1,237 @@
+import numpy as np
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from llm_scorer import (
+    infer_seniority_level,
+    extract_critical_skills,
+    calculate_education_score,
+    parse_resume_years,
+    parse_required_years,
+    get_detailed_score,
+    SEMANTIC_WEIGHT
+)
+from text_vectors import VECTOR_DIM, decode_vector, similarity_matrix
+
+# float64 cells held per resume x JD pair while a chunk is being scored
+BYTES_PER_PAIR = 8 * 8
+
+def _skill_key(skill):
+    return str(skill).lower().strip()
+
+def build_incidence(resumes: List[Dict[str, Any]], jds: List[Dict[str, Any]]):
+    """
+    Build skill incidence matrices over a shared vocabulary.
+
+    Returns (resume_matrix, required_matrix, critical_matrix): an M x V 0/1 matrix
+    of resume skills, and N x V count matrices of each JD's required and critical
+    skills (counts, so duplicated requirements weigh as in calculate_skill_match_score).
+    """
+    vocab = {}
+    for jd in jds:
+        for skill in jd.get('required_skills', []):
+            vocab.setdefault(_skill_key(skill), len(vocab))
+        for skill in extract_critical_skills(jd):
+            vocab.setdefault(_skill_key(skill), len(vocab))
+
+    resume_matrix = np.zeros((len(resumes), max(1, len(vocab))), dtype=np.float32)
+    for i, resume in enumerate(resumes):
+        for skill in resume.get('skills', []):
+            column = vocab.get(_skill_key(skill))
+            if column is not None:
+                resume_matrix[i, column] = 1.0
+
+    required_matrix = np.zeros((len(jds), max(1, len(vocab))), dtype=np.float32)
+    critical_matrix = np.zeros((len(jds), max(1, len(vocab))), dtype=np.float32)
+    for j, jd in enumerate(jds):
+        for skill in jd.get('required_skills', []):
+            required_matrix[j, vocab[_skill_key(skill)]] += 1.0
+        for skill in extract_critical_skills(jd):
+            critical_matrix[j, vocab[_skill_key(skill)]] += 1.0
+
+    return resume_matrix, required_matrix, critical_matrix
+
+def _resume_features(resumes):
+    years = np.array([parse_resume_years(str(r.get('experience', ''))) for r in resumes], dtype=np.float64)
+    education = np.array([calculate_education_score(r, {}, use_llm=False)[0] for r in resumes], dtype=np.float64)
+    return years, education
+
+def _jd_features(jds):
+    levels = []
+    weights = np.zeros((len(jds), 3), dtype=np.float64)
+    for j, jd in enumerate(jds):
+        level, skill_weight, exp_weight, edu_weight = infer_seniority_level(jd)
+        levels.append(level)
+        weights[j] = (skill_weight, exp_weight, edu_weight)
+    levels = np.array(levels)
+    required_years = np.array([parse_required_years(str(jd.get('experience_required', ''))) for jd in jds], dtype=np.float64)
+    return levels, required_years, weights
+
+def _vector_matrix(docs):
+    """Stack stored text vectors; rows without a usable vector are zero and flagged False."""
+    matrix = np.zeros((len(docs), VECTOR_DIM), dtype=np.float32)
+    present = np.zeros(len(docs), dtype=bool)
+    for i, doc in enumerate(docs):
+        vector = decode_vector(doc.get('text_vector'))
+        if vector is not None:
+            matrix[i] = vector
+            present[i] = True
+    return matrix, present
+
+def _experience_matrix(years, required_years, levels):
+    """Vectorised calculate_experience_score for every resume x JD pair."""
+    y = years[:, None]
+    req = required_years[None, :]
+    safe_req = np.where(req > 0, req, 1.0)
+
+    entry = np.broadcast_to(np.minimum(10.0, 7 + y * 1.5), (len(years), len(required_years)))
+
+    senior_with_req = np.where(y >= req, 10.0,
+                      np.where(y >= req * 0.7, 8.0,
+                      np.where(y >= req * 0.5, 6.0, np.maximum(3.0, y * 1.5))))
+    senior = np.where(req > 0, senior_with_req, np.minimum(10.0, y * 1.5))
+
+    mid = np.where(req > 0, np.minimum(10.0, y / safe_req * 8), np.minimum(10.0, 5 + y))
+
+    return np.where(levels[None, :] == 'entry', entry,
+           np.where(levels[None, :] == 'senior', senior, mid))
+
+def score_matrix(resumes, jds, threshold, memory_budget_mb=256):
+    """
+    Score every resume against every JD and yield (i, j, overall_fit) for pairs at or above threshold.
+
+    Scores follow get_detailed_score with use_llm=False. Resumes are processed in
+    row chunks sized so the per-chunk working set stays within memory_budget_mb.
+    """
+    if not resumes or not jds:
+        return
+
+    resume_matrix, required_matrix, critical_matrix = build_incidence(resumes, jds)
+    required_count = required_matrix.sum(axis=1).astype(np.float64)
+    critical_count = critical_matrix.sum(axis=1).astype(np.float64)
+    safe_required = np.where(required_count > 0, required_count, 1.0)
+
+    years, education = _resume_features(resumes)
+    levels, required_years, weights = _jd_features(jds)
+
+    use_semantic = SEMANTIC_WEIGHT > 0
+    if use_semantic:
+        resume_vectors, resume_has_vector = _vector_matrix(resumes)
+        jd_vectors, jd_has_vector = _vector_matrix(jds)
+
+    chunk_rows = max(1, int(memory_budget_mb * 1024 * 1024) // (len(jds) * BYTES_PER_PAIR))
+
+    for start in range(0, len(resumes), chunk_rows):
+        stop = min(start + chunk_rows, len(resumes))
+        block = resume_matrix[start:stop]
+
+        matched = (block @ required_matrix.T).astype(np.float64)
+        critical_missing = critical_count[None, :] - (block @ critical_matrix.T)
+
+        skill = np.clip(matched / safe_required[None, :] * 10 - 0.2 * critical_missing, 0, 10)
+        skill = np.where(required_count[None, :] > 0, skill, 5.0)
+
+        experience = _experience_matrix(years[start:stop], required_years, levels)
+
+        overall = (skill * weights[None, :, 0] +
+                   experience * weights[None, :, 1] +
+                   education[start:stop, None] * weights[None, :, 2])
+
+        if use_semantic:
+            semantic = np.maximum(similarity_matrix(resume_vectors[start:stop], jd_vectors), 0) * 10
+            has_pair = resume_has_vector[start:stop, None] & jd_has_vector[None, :]
+            overall = np.where(has_pair, overall * (1 - SEMANTIC_WEIGHT) + semantic * SEMANTIC_WEIGHT, overall)
+
+        rows, cols = np.nonzero(overall >= threshold)
+        for i, j in zip(rows, cols):
+            yield start + int(i), int(j), float(overall[i, j])
+
+def run_matrix_scoring(threshold: float = 7.0, memory_budget_mb: int = 256, jd_ids: Optional[List[str]] = None, persist: bool = True, batch_size: int = 500) -> Dict[str, Any]:
+    """
+    Match the whole talent pool against stored JDs and persist pairs above threshold.
+
+    Persisted pairs get a full get_detailed_score (regex-only) document and are
+    written with bulk upserts that never overwrite a score that already exists
+    for the same resume and JD.
+    """
+    from database import get_database, job_description_to_data
+    from pymongo import UpdateOne
+    from bson import ObjectId
+    import leaderboard
+
+    db = get_database()
+    if db is None:
+        return None
+
+    resume_docs = list(db.resumes.find({}, {"name": 1, "filename": 1, "skills": 1, "experience": 1, "education": 1, "llm_degraded": 1, "text_vector": 1}))
+    jd_filter = {"_id": {"$in": [ObjectId(jd_id) for jd_id in jd_ids]}} if jd_ids else {}
+    jd_docs = list(db.job_descriptions.find(jd_filter))
+    jds = [job_description_to_data(doc) for doc in jd_docs]
+
+    started = datetime.utcnow()
+    operations = []
+    pending = []
+    persisted = 0
+    matched = 0
+    touched_jds = set()
+
+    def flush():
+        nonlocal persisted
+        if not operations:
+            return
+        result = db.scores.bulk_write(operations, ordered=False)
+        persisted += result.upserted_count
+        for index, score_id in result.upserted_ids.items():
+            op = pending[index]
+            leaderboard.record_score(op["jd_id"], str(score_id), op["resume_id"], op["overall_fit"])
+        operations.clear()
+        pending.clear()
+
+    for i, j, _ in score_matrix(resume_docs, jds, threshold, memory_budget_mb):
+        matched += 1
+        if not persist:
+            continue
+
+        resume = resume_docs[i]
+        jd_doc = jd_docs[j]
+        resume_id = str(resume["_id"])
+        jd_id = str(jd_doc["_id"])
+        detailed = get_detailed_score(resume, jds[j], use_llm=False)
+
+        score_doc = {
+            "resume_id": resume_id,
+            "jd_id": jd_id,
+            "resume_filename": resume.get("filename", ""),
+            "jd_filename": jd_doc.get("filename", ""),
+            "candidate_name": resume.get("name", "Unknown"),
+            "job_title": jds[j].get("job_title", "Unknown"),
+            "skills_match": detailed["skills_match"],
+            "experience_relevance": detailed["experience_relevance"],
+            "education_fit": detailed["education_fit"],
+            "overall_fit": detailed["overall_fit"],
+            "semantic_match": detailed["semantic_match"],
+            "justification": detailed["justification"],
+            "is_shortlisted": detailed["is_shortlisted"],
+            "seniority_level": detailed["seniority_level"],
+            "weights": detailed["weights"],
+            "details": detailed["details"],
+            "llm_degraded": detailed["llm_degraded"],
+            "source": "matrix",
+            "timestamp": started
+        }
+        operations.append(UpdateOne({"resume_id": resume_id, "jd_id": jd_id}, {"$setOnInsert": score_doc}, upsert=True))
+        pending.append(score_doc)
+        touched_jds.add(jd_id)
+        if len(operations) >= batch_size:
+            flush()
+
+    flush()
+
+    return {
+        "resumes": len(resume_docs),
+        "job_descriptions": len(jd_docs),
+        "pairs_evaluated": len(resume_docs) * len(jd_docs),
+        "pairs_above_threshold": matched,
+        "pairs_persisted": persisted,
+        "job_descriptions_updated": len(touched_jds),
+        "threshold": threshold
+    }
@@ -0,0 +1,209 @@
+"""
+Minimal Prometheus metrics, rendered in the text exposition format at /metrics.
+
+Counters, gauges and histograms are kept in process memory behind one lock
+each; recording a value is a dict lookup and an addition. Gauges can also be
+backed by a callback that is evaluated only when /metrics is scraped.
+"""
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import timing
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "resume_screener_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function = function
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the (unlabelled) value at scrape time instead of storing it."""
+        self._function = function
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(self._function())}"]
+            except Exception:
+                # A failing callback (e.g. the database is down) drops the sample, not the scrape
+                return []
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# -- application metrics ----------------------------------------------------
+
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Time spent per processing stage (parse, llm, score, db) and operation.",
+    ("stage", "operation")
+)
+LLM_CALLS = Counter("llm_calls_total", "Gemini calls by model and outcome (success, error, rejected).", ("model", "outcome"))
+LLM_CACHE = Counter("llm_cache_requests_total", "Gemini response cache lookups by result (hit, miss).", ("result",))
+LLM_BREAKER_OPEN = Gauge("llm_circuit_open", "1 while the Gemini circuit breaker is open or half-open.")
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by method, route and status.", ("method", "route", "status"))
+HTTP_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+JOB_QUEUE_DEPTH = Gauge("job_queue_depth", "Screening job items waiting for a worker.")
+JOB_ITEMS = Counter("job_items_total", "Screening job items finished by status.", ("status",))
+PARSE_REJECTED = Counter("parse_rejected_total", "PDFs refused by the parse limits, by reason (size, pages, memory, timeout, crash).", ("reason",))
+PARSE_WORKERS_RECYCLED = Counter("parse_workers_recycled_total", "Parse worker processes replaced, by reason (max_tasks, memory, timeout, crash).", ("reason",))
+PARSE_POOL_WAITING = Gauge("parse_pool_waiting", "Documents waiting for a free parse worker process.")
+PDF_FALLBACKS = Counter("pdf_backend_fallbacks_total", "PDFs re-extracted with pdfminer after the fast backend failed, by backend and reason.", ("backend", "reason"))
+
+@contextmanager
+def stage_timer(stage: str, operation: str):
+    """Record the duration of a block in the stage histogram and in the current request's timings."""
+    with STAGE_SECONDS.time(stage=stage, operation=operation), timing.timed(timing.STAGE_NAMES.get(stage, stage)):
+        yield
+
+def timed_stage(stage: str, operation: Optional[str] = None):
+    """Decorator recording every call of a function in the stage histogram."""
+    def decorator(fn):
+        name = operation or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def render() -> str:
+    return registry.render()
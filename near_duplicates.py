@@ -0,0 +1,151 @@
+import base64
+import os
+import re
+import threading
+import time
+import zlib
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Union
+
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 5
+# Estimated Jaccard similarity of word shingles above which two resumes are the same document
+DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.85"))
+TTL_SECONDS = float(os.getenv("NEAR_DUPLICATE_TTL_SECONDS", "300"))
+
+# Universal hashing h(x) = (a * x + b) mod p with a Mersenne prime small enough
+# that a * x never overflows uint64 for 32-bit shingle hashes
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, int(_PRIME), NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), NUM_PERMUTATIONS, dtype=np.uint64)
+_WORD = re.compile(r"[a-z0-9]+")
+
+SignatureLike = Union[np.ndarray, bytes, str]
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """crc32 hashes of the overlapping word n-grams of the normalised text."""
+    words = _WORD.findall((text or "").lower())
+    if len(words) < size:
+        grams = {" ".join(words)} if words else set()
+    else:
+        grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    hashes = shingles(text)
+    if not len(hashes):
+        return None
+    hashes %= _PRIME
+    # (permutations x shingles) in one broadcast, then the minimum per permutation
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+def encode_signature(signature: Optional[np.ndarray]) -> Optional[str]:
+    if signature is None:
+        return None
+    return base64.b64encode(signature.astype("<u4").tobytes()).decode("ascii")
+
+def decode_signature(value: Optional[SignatureLike]) -> Optional[np.ndarray]:
+    """Accept a signature as an array, raw uint32 bytes (MongoDB) or base64 (parser output)."""
+    if value is None:
+        return None
+    if isinstance(value, np.ndarray):
+        signature = value.astype(np.uint32, copy=False)
+    else:
+        raw = base64.b64decode(value) if isinstance(value, str) else bytes(value)
+        signature = np.frombuffer(raw, dtype="<u4")
+    return signature if signature.shape == (NUM_PERMUTATIONS,) else None
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+def lsh_bands(signature: np.ndarray) -> List[str]:
+    """One bucket key per band; near-duplicates very likely share at least one."""
+    rows = signature.astype("<u4").reshape(BANDS, ROWS_PER_BAND)
+    return [f"{band}:{zlib.crc32(rows[band].tobytes()):08x}" for band in range(BANDS)]
+
+def similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Estimated Jaccard similarity: the share of permutations where the minimums agree."""
+    return float(np.mean(left == right))
+
+class MinHashLSH:
+    """
+    In-memory LSH buckets over the MinHash signatures stored on resumes.
+
+    The signatures and band keys are persisted on each resume document (the
+    band keys are indexed), and this cache is rebuilt from MongoDB after
+    NEAR_DUPLICATE_TTL_SECONDS so resumes saved by other processes show up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._buckets: Dict[str, set] = {}
+        self._signatures: Dict[str, np.ndarray] = {}
+        self.loaded_at = None
+
+    def _add(self, doc_id: str, signature: np.ndarray):
+        self._signatures[doc_id] = signature
+        for key in lsh_bands(signature):
+            self._buckets.setdefault(key, set()).add(doc_id)
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < TTL_SECONDS
+
+    def load(self, db):
+        cursor = db.resumes.find({"minhash": {"$exists": True}}, {"minhash": 1})
+        with self._lock:
+            self._reset()
+            for doc in cursor:
+                signature = decode_signature(doc.get("minhash"))
+                if signature is not None:
+                    self._add(str(doc["_id"]), signature)
+            self.loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db):
+        if not self.loaded:
+            self.load(db)
+
+    def add(self, doc_id: str, signature: Optional[np.ndarray]):
+        with self._lock:
+            if self.loaded_at is not None and signature is not None:
+                self._add(doc_id, signature)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            signature = self._signatures.pop(doc_id, None)
+            if signature is None:
+                return
+            for key in lsh_bands(signature):
+                bucket = self._buckets.get(key)
+                if bucket:
+                    bucket.discard(doc_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def invalidate(self):
+        with self._lock:
+            self._reset()
+
+    def query(self, signature: np.ndarray, threshold: float = DUPLICATE_THRESHOLD) -> Optional[Tuple[str, float]]:
+        """Most similar stored resume at or above threshold, as (resume_id, similarity), or None."""
+        with self._lock:
+            candidates = set()
+            for key in lsh_bands(signature):
+                candidates |= self._buckets.get(key, set())
+            best = None
+            for doc_id in sorted(candidates):
+                score = similarity(signature, self._signatures[doc_id])
+                if score >= threshold and (best is None or score > best[1]):
+                    best = (doc_id, score)
+            return best
+
+    def __len__(self):
+        return len(self._signatures)
+
+resume_lsh = MinHashLSH()
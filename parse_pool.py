@@ -0,0 +1,282 @@
+"""
+PDF text extraction in recycled child processes.
+
+pdfminer can allocate hundreds of megabytes on a malformed or image-heavy
+PDF, and CPython rarely hands that memory back, so one bad upload would
+leave the API worker bloated for good. When the pool is started (the API
+does so for PARSE_WORKERS > 0), extraction runs in child processes instead:
+
+- a child is replaced after PARSE_MAX_TASKS_PER_CHILD documents;
+- the parent polls each busy child's RSS and kills it above PARSE_MAX_RSS_MB.
+  The document is retried once, normally on the replacement child, and
+  rejected if a fresh child blows the limit too;
+- a document taking longer than PARSE_TIMEOUT_SECONDS is killed and rejected;
+- files over PARSE_MAX_FILE_MB or PARSE_MAX_PAGES are rejected before any
+  text is extracted.
+
+Without a started pool (CLI tools, the offline screener, tests) extraction
+runs in-process with the same size and page limits. So does every extraction
+while a request profile is recorded, since the profilers only see this process.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+import profiling
+from metrics import PARSE_POOL_WAITING, PARSE_REJECTED, PARSE_WORKERS_RECYCLED
+
+MAX_FILE_BYTES = int(float(os.getenv("PARSE_MAX_FILE_MB", "20")) * 1024 * 1024)
+MAX_PAGES = int(os.getenv("PARSE_MAX_PAGES", "50"))
+MAX_TASKS_PER_CHILD = int(os.getenv("PARSE_MAX_TASKS_PER_CHILD", "100"))
+MAX_RSS_BYTES = int(float(os.getenv("PARSE_MAX_RSS_MB", "512")) * 1024 * 1024)
+TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", "60"))
+START_METHOD = os.getenv("PARSE_START_METHOD", "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+POLL_SECONDS = 0.05
+
+class ParseRejectedError(Exception):
+    """Raised for a PDF that is too large, has too many pages or exhausted a parse worker."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+def _reject(reason: str, message: str):
+    PARSE_REJECTED.inc(reason=reason)
+    return ParseRejectedError(reason, message)
+
+def extract_limited(source: Union[str, bytes]) -> str:
+    """Check the page limit, then extract the text (runs in the child, or in-process without a pool)."""
+    from parsers.pdf_text import count_pages, extract_pdf_text
+    try:
+        pages = count_pages(source)
+    except Exception:
+        # Unreadable page tree: let the extractor (and its pdfminer fallback) decide
+        pages = 0
+    if MAX_PAGES > 0 and pages > MAX_PAGES:
+        raise ParseRejectedError("pages", f"PDF has {pages} pages, the limit is {MAX_PAGES}")
+    return extract_pdf_text(source)
+
+def _payload(source) -> Union[str, bytes]:
+    """A path or the document bytes, after the size limit; streams are read once here."""
+    if hasattr(source, "read"):
+        data = source.read(MAX_FILE_BYTES + 1) if MAX_FILE_BYTES > 0 else source.read()
+        size, payload = len(data), data
+    elif isinstance(source, bytes):
+        size, payload = len(source), source
+    else:
+        payload = str(source)
+        size = Path(payload).stat().st_size
+    if MAX_FILE_BYTES > 0 and size > MAX_FILE_BYTES:
+        raise _reject("size", f"PDF is larger than {MAX_FILE_BYTES // (1024 * 1024)} MB")
+    return payload
+
+def _child_main(conn):
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        try:
+            conn.send(("ok", extract_limited(task)))
+        except ParseRejectedError as e:
+            conn.send(("rejected", e.reason, str(e)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, or None where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_child_main, args=(child_conn,), daemon=True, name="parse-worker")
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        self.dead = False
+
+    def run(self, payload, timeout: float, max_rss: int):
+        """Send one document and wait for the reply, killing the child on timeout or RSS overrun."""
+        try:
+            self.conn.send(payload)
+        except OSError:
+            return self._kill("crash")
+        deadline = time.monotonic() + timeout if timeout > 0 else None
+        while True:
+            try:
+                if self.conn.poll(POLL_SECONDS):
+                    self.tasks += 1
+                    return self.conn.recv()
+            except (EOFError, OSError):
+                return self._kill("crash")
+            if not self.process.is_alive():
+                return self._kill("crash")
+            if deadline is not None and time.monotonic() > deadline:
+                return self._kill("timeout")
+            if max_rss > 0:
+                rss = rss_bytes(self.process.pid)
+                if rss is not None and rss > max_rss:
+                    return self._kill("memory")
+
+    def _kill(self, reason: str):
+        self.process.kill()
+        self.process.join(5)
+        self.dead = True
+        return ("killed", reason)
+
+    def stop(self):
+        if not self.dead:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(2)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join(2)
+        self.conn.close()
+
+class ParsePool:
+    def __init__(self, workers: int, max_tasks_per_child: int = MAX_TASKS_PER_CHILD, max_rss: int = MAX_RSS_BYTES,
+                 timeout: float = TIMEOUT_SECONDS, start_method: str = START_METHOD):
+        self.max_tasks_per_child = max_tasks_per_child
+        self.max_rss = max_rss
+        self.timeout = timeout
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            # Children (and every replacement) fork from a server that has already imported the extractor
+            from parsers.pdf_text import preload_modules
+            self._context.set_forkserver_preload(["parse_pool"] + preload_modules())
+        # Last in, first out: a replacement child is the next one used, so retries land on it
+        self._idle: "queue.LifoQueue[_Worker]" = queue.LifoQueue()
+        self._workers = [_Worker(self._context) for _ in range(workers)]
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self.closed = False
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            self._waiting += 1
+        try:
+            return self._idle.get()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def _release(self, worker: _Worker, killed_reason: Optional[str] = None):
+        if killed_reason or (self.max_tasks_per_child > 0 and worker.tasks >= self.max_tasks_per_child):
+            PARSE_WORKERS_RECYCLED.inc(reason=killed_reason or "max_tasks")
+            worker.stop()
+            with self._lock:
+                self._workers.remove(worker)
+                if self.closed:
+                    return
+            worker = _Worker(self._context)
+            with self._lock:
+                self._workers.append(worker)
+        self._idle.put(worker)
+
+    def extract(self, payload: Union[str, bytes]) -> str:
+        """Extract text in a child process; retried once on a fresh child after a memory kill or crash."""
+        for attempt in (1, 2):
+            worker = self._acquire()
+            fresh = worker.tasks == 0
+            reply = worker.run(payload, self.timeout, self.max_rss)
+            killed_reason = reply[1] if reply[0] == "killed" else None
+            self._release(worker, killed_reason)
+
+            if reply[0] == "ok":
+                return reply[1]
+            if reply[0] == "rejected":
+                raise _reject(reply[1], reply[2])
+            if reply[0] == "error":
+                raise RuntimeError(reply[1])
+            if killed_reason == "timeout":
+                raise _reject("timeout", f"PDF extraction took longer than {self.timeout:g}s")
+            # Memory already grown by earlier documents is not this file's fault; a fresh child decides
+            if killed_reason == "memory" and fresh:
+                raise _reject("memory", f"PDF extraction exceeded {self.max_rss // (1024 * 1024)} MB")
+            if attempt == 2:
+                raise _reject(killed_reason, f"PDF extraction failed twice ({killed_reason})")
+
+    def warm_up(self, payload: Union[str, bytes]) -> str:
+        """Extract a document once in every child, so none of them serves its first upload cold."""
+        with self._lock:
+            count = len(self._workers)
+        workers = [self._acquire() for _ in range(count)]
+        replies = {}
+        try:
+            for worker in workers:
+                replies[worker] = worker.run(payload, self.timeout, self.max_rss)
+        finally:
+            for worker in workers:
+                reply = replies.get(worker, ("",))
+                self._release(worker, reply[1] if reply[0] == "killed" else None)
+        failed = [reply for reply in replies.values() if reply[0] != "ok"]
+        if failed:
+            raise RuntimeError(f"Parse worker warm-up failed: {failed[0]}")
+        return replies[workers[-1]][1] if workers else ""
+
+    def shutdown(self):
+        with self._lock:
+            self.closed = True
+            workers = list(self._workers)
+        for worker in workers:
+            worker.stop()
+
+_pool: Optional[ParsePool] = None
+
+def start_pool(workers: int) -> Optional[ParsePool]:
+    global _pool
+    if _pool is None and workers > 0:
+        _pool = ParsePool(workers)
+    return _pool
+
+def stop_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+def extract_text(source) -> str:
+    """
+    Extract the text of a PDF (path, bytes or binary file-like) within the configured limits.
+
+    Raises ParseRejectedError when the file is over the size or page limit,
+    or when extraction runs out of time or memory.
+    """
+    payload = _payload(source)
+    if _pool is not None and not profiling.is_active():
+        return _pool.extract(payload)
+    try:
+        return extract_limited(payload)
+    except ParseRejectedError as e:
+        PARSE_REJECTED.inc(reason=e.reason)
+        raise
+
+def warm_up(source) -> str:
+    """Extract a PDF in every pool child, or in-process without a pool, and return its text."""
+    payload = _payload(source)
+    if _pool is not None:
+        return _pool.warm_up(payload)
+    return extract_limited(payload)
+
+PARSE_POOL_WAITING.set_function(lambda: _pool.waiting if _pool is not None else 0)
@@ -1,9 +1,24 @@
-from pdfminer.high_level import extract_text
+import parse_pool
 import re
+from parsers.skill_taxonomy import SKILL_KEYWORDS
+from metrics import stage_timer
+from text_vectors import text_to_vector, encode_vector
+
+# Compiled once at import, so a preloaded master shares them with its forked workers
+_WHITESPACE = re.compile(r'\s+')
+_NON_ASCII = re.compile(r'[^\x00-\x7F]+')
+_TITLE_WORD = re.compile(r'\b(Intern|Engineer|Developer|Manager|Analyst|Specialist|Officer|Coordinator|Associate|Executive|Consultant)\b', re.IGNORECASE)
+_TITLE_FIELD = re.compile(r'(?:Position|Role|Title|Job)\s*:\s*(.+)', re.IGNORECASE)
+_YEARS_RANGE = re.compile(r'(\d+)\+?\s*(?:to|\-)\s*(\d+)\s*(?:years?|yrs?)')
+_YEARS = re.compile(r'(\d+)\+?\s*(?:years?|yrs?)')
+_BULLET = re.compile(r'^[-•]\s*')
+_COMPANY_FIELD = re.compile(r'(?:Company|Organization|Employer)\s*:\s*(.+)', re.IGNORECASE)
+_COMPANY_SUFFIX = re.compile(r'\b(?:Inc|Ltd|LLC|Corp|Corporation|Company|Technologies|Solutions|Systems|Services|Group|Pvt|Private Limited)\b')
+_LOCATION = re.compile(r'\b(?:Remote|Hybrid|On-site|[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*,\s*[A-Z]{2})\b')
 
 def clean_text(text):
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[^\x00-\x7F]+', '', text)
+    text = _WHITESPACE.sub(' ', text)
+    text = _NON_ASCII.sub('', text)
     return text.strip()
 
 def extract_job_title(text):
@@ -28,11 +43,11 @@ def extract_job_title(text):
     for line in lines[:15]:
         line = line.strip()
         if line and 10 < len(line) < 100:
-            if re.search(r'\b(Intern|Engineer|Developer|Manager|Analyst|Specialist|Officer|Coordinator|Associate|Executive|Consultant)\b', line, re.IGNORECASE):
+            if _TITLE_WORD.search(line):
                 return line
     
     for line in lines[:20]:
-        match = re.search(r'(?:Position|Role|Title|Job)\s*:\s*(.+)', line, re.IGNORECASE)
+        match = _TITLE_FIELD.search(line)
         if match:
             title = match.group(1).strip()
             if 5 < len(title) < 100:
@@ -41,35 +56,22 @@ def extract_job_title(text):
     return "Not specified"
 
 def extract_required_skills(text):
-    skill_keywords = [
-        'python', 'java', 'javascript', 'react', 'node.js', 'nodejs', 'angular', 'vue',
-        'mongodb', 'sql', 'postgresql', 'mysql', 'redis', 'docker', 'kubernetes',
-        'aws', 'azure', 'gcp', 'git', 'html', 'css', 'typescript', 'c++', 'c#',
-        'django', 'flask', 'fastapi', 'spring', 'express', 'rest', 'api', 'graphql',
-        'machine learning', 'deep learning', 'ai', 'nlp', 'tensorflow', 'pytorch',
-        'pandas', 'numpy', 'scikit-learn', 'data analysis', 'excel', 'powerbi',
-        'agile', 'scrum', 'jira', 'ci/cd', 'jenkins', 'linux', 'bash', 'shell',
-        'elasticsearch', 'kafka', 'rabbitmq', 'microservices', 'oauth', 'jwt'
-    ]
-    
     text_lower = text.lower()
     found_skills = []
     
-    for skill in skill_keywords:
+    for skill in SKILL_KEYWORDS:
         if skill in text_lower:
             found_skills.append(skill.title())
     
     return list(set(found_skills))
 
 def extract_experience_required(text):
-    exp_pattern = r'(\d+)\+?\s*(?:to|\-)\s*(\d+)\s*(?:years?|yrs?)'
-    match = re.search(exp_pattern, text.lower())
+    match = _YEARS_RANGE.search(text.lower())
     
     if match:
         return f"{match.group(1)}-{match.group(2)} years"
     
-    single_exp_pattern = r'(\d+)\+?\s*(?:years?|yrs?)'
-    match = re.search(single_exp_pattern, text.lower())
+    match = _YEARS.search(text.lower())
     
     if match:
         return f"{match.group(1)}+ years"
@@ -104,7 +106,7 @@ def extract_responsibilities(text):
         
         if in_responsibilities and line.strip():
             if line.strip().startswith('-') or line.strip().startswith('•'):
-                resp = re.sub(r'^[-•]\s*', '', line.strip())
+                resp = _BULLET.sub('', line.strip())
                 responsibilities.append(resp[:100])
             elif len(line.strip()) > 20:
                 responsibilities.append(line.strip()[:100])
@@ -118,7 +120,7 @@ def extract_company_name(text):
     lines = text.split('\n')
     
     for line in lines[:20]:
-        match = re.search(r'(?:Company|Organization|Employer)\s*:\s*(.+)', line, re.IGNORECASE)
+        match = _COMPANY_FIELD.search(line)
         if match:
             company = match.group(1).strip()
             if 2 < len(company) < 80:
@@ -126,7 +128,7 @@ def extract_company_name(text):
     
     for line in lines[:15]:
         line_stripped = line.strip()
-        if re.search(r'\b(?:Inc|Ltd|LLC|Corp|Corporation|Company|Technologies|Solutions|Systems|Services|Group|Pvt|Private Limited)\b', line_stripped):
+        if _COMPANY_SUFFIX.search(line_stripped):
             if 5 < len(line_stripped) < 80:
                 return line_stripped[:50]
     
@@ -139,12 +141,12 @@ def extract_company_name(text):
     return "Not specified"
 
 def extract_location(text):
-    location_pattern = r'\b(?:Remote|Hybrid|On-site|[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*,\s*[A-Z]{2})\b'
-    match = re.search(location_pattern, text)
+    match = _LOCATION.search(text)
     return match.group(0) if match else "Not specified"
 
 def extract_jd_data(file_path):
-    text = extract_text(file_path)
+    with stage_timer("parse", "jd_pdf"):
+        text = parse_pool.extract_text(file_path)
     
     return {
         "job_title": extract_job_title(text),
@@ -154,5 +156,6 @@ def extract_jd_data(file_path):
         "experience_required": extract_experience_required(text),
         "qualifications": extract_qualifications(text),
         "responsibilities": extract_responsibilities(text),
-        "raw_text": text[:500]
+        "raw_text": text[:500],
+        "text_vector": encode_vector(text_to_vector(text))
     }
@@ -0,0 +1,176 @@
+"""
+PDF text extraction with interchangeable backends.
+
+pdfminer.six is accurate but runs its layout analysis in pure Python.
+pypdfium2 (PDFium) and PyMuPDF (MuPDF) extract text natively and are many
+times faster. PDF_BACKEND picks one of them: "pypdfium2", "pymupdf",
+"pdfminer", or "auto" (the default), which uses the first fast backend that
+is installed. When a fast backend fails or its output looks empty or garbled
+(some PDFs have fonts without a usable Unicode map), the document is
+extracted again with pdfminer.
+"""
+import importlib.util
+import io
+import os
+import re
+from typing import Callable, Dict, List, Optional
+from metrics import PDF_FALLBACKS
+
+PDF_BACKEND = os.getenv("PDF_BACKEND", "auto").lower()
+FAST_BACKENDS = ("pypdfium2", "pymupdf")
+# Text with fewer visible characters than this is treated as an extraction failure
+MIN_TEXT_CHARS = int(os.getenv("PDF_MIN_TEXT_CHARS", "20"))
+# Share of characters that must be ordinary (letters, digits, punctuation, whitespace)
+MIN_CLEAN_RATIO = 0.85
+
+_CID = re.compile(r"\(cid:\d+\)")
+_CLEAN = re.compile(r"[\w\s.,;:!?'\"()\[\]{}<>/\\|@#$%&*+=~^`-]", re.UNICODE)
+
+def _pdfminer(source) -> str:
+    from pdfminer.high_level import extract_text
+    return extract_text(source)
+
+def _pdfium_page_text(textpage) -> str:
+    """
+    Page text line by line, with a blank line where the vertical gap marks a new paragraph.
+
+    The parsers find sections and context by blank lines, as pdfminer lays
+    them out; PDFium's plain text has none, so lines are rebuilt from its text
+    rectangles and a gap over 1.5x the typical line pitch becomes a blank line.
+    """
+    lines = []  # [bottom, top, segments]
+    for index in range(textpage.count_rects()):
+        left, bottom, right, top = textpage.get_rect(index)
+        text = textpage.get_text_bounded(left, bottom, right, top).strip()
+        if lines and abs((bottom + top) - (lines[-1][0] + lines[-1][1])) < top - bottom:
+            lines[-1][2].append(text)
+        else:
+            lines.append([bottom, top, [text]])
+    pitches = sorted(previous[0] - line[0] for previous, line in zip(lines, lines[1:]) if previous[0] > line[0])
+    pitch = pitches[len(pitches) // 2] if pitches else 0
+    out = []
+    for index, (bottom, top, segments) in enumerate(lines):
+        if index and pitch and lines[index - 1][0] - bottom > 1.5 * pitch:
+            out.append("")
+        out.append(" ".join(segments))
+    return "\n".join(out) + "\n"
+
+def _pypdfium2(source) -> str:
+    import pypdfium2
+    document = pypdfium2.PdfDocument(source)
+    try:
+        pages = []
+        for page in document:
+            textpage = page.get_textpage()
+            pages.append(_pdfium_page_text(textpage))
+            textpage.close()
+            page.close()
+        return "\n".join(pages)
+    finally:
+        document.close()
+
+def _pymupdf(source) -> str:
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    if isinstance(source, bytes):
+        document = pymupdf.open(stream=source, filetype="pdf")
+    else:
+        document = pymupdf.open(str(source))
+    try:
+        # Text blocks separated by a blank line, like pdfminer's text boxes; block type 1 is an image
+        return "\n".join("".join(block[4] + "\n" for block in page.get_text("blocks") if block[6] == 0) for page in document)
+    finally:
+        document.close()
+
+BACKENDS: Dict[str, Callable] = {"pypdfium2": _pypdfium2, "pymupdf": _pymupdf, "pdfminer": _pdfminer}
+_MODULES = {"pypdfium2": ("pypdfium2",), "pymupdf": ("pymupdf", "fitz"), "pdfminer": ("pdfminer",)}
+_installed: Dict[str, bool] = {}
+
+def is_installed(backend: str) -> bool:
+    if backend not in _installed:
+        _installed[backend] = any(importlib.util.find_spec(module) is not None for module in _MODULES[backend])
+    return _installed[backend]
+
+def available_backends() -> List[str]:
+    return [backend for backend in BACKENDS if is_installed(backend)]
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """The backend to try first for a configured name, falling back to pdfminer if it is not installed."""
+    name = (name or PDF_BACKEND).lower()
+    if name == "auto":
+        return next((backend for backend in FAST_BACKENDS if is_installed(backend)), "pdfminer")
+    if name not in BACKENDS:
+        print(f"Unknown PDF_BACKEND '{name}', using pdfminer")
+        return "pdfminer"
+    if not is_installed(name):
+        print(f"PDF backend '{name}' is not installed, using pdfminer")
+        return "pdfminer"
+    return name
+
+def preload_modules(name: Optional[str] = None) -> List[str]:
+    """Modules the configured backend and the pdfminer fallback import on first use, for preloading."""
+    modules = {
+        "pypdfium2": ["pypdfium2"],
+        "pymupdf": ["pymupdf" if importlib.util.find_spec("pymupdf") is not None else "fitz"],
+        "pdfminer": []
+    }[resolve_backend(name)]
+    return modules + ["pdfminer.high_level", "pdfminer.pdfdocument"]
+
+def count_pages(source) -> int:
+    """Page count from the document's page tree, without extracting any text."""
+    if is_installed("pypdfium2"):
+        import pypdfium2
+        document = pypdfium2.PdfDocument(source)
+        try:
+            return len(document)
+        finally:
+            document.close()
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import resolve1
+    if isinstance(source, bytes):
+        return int(resolve1(PDFDocument(PDFParser(io.BytesIO(source))).catalog["Pages"])["Count"])
+    with open(source, "rb") as f:
+        return int(resolve1(PDFDocument(PDFParser(f)).catalog["Pages"])["Count"])
+
+def looks_garbled(text: str) -> bool:
+    """True for empty output or text dominated by unmapped glyphs and control characters."""
+    visible = "".join(text.split())
+    if len(visible) < MIN_TEXT_CHARS:
+        return True
+    # Replacement characters and pdfminer-style "(cid:123)" placeholders stand for glyphs with no Unicode
+    unmapped = text.count("\ufffd") + sum(len(match) for match in _CID.findall(text))
+    if unmapped > len(visible) * 0.05:
+        return True
+    clean = len(_CLEAN.findall(text))
+    return clean < len(text) * MIN_CLEAN_RATIO
+
+def _normalize(text: str) -> str:
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+def extract_pdf_text(source, backend: Optional[str] = None) -> str:
+    """
+    Extract the text of a PDF given as a path, bytes or a binary file-like object.
+
+    Uses the configured backend and falls back to pdfminer when a fast
+    backend raises or returns empty or garbled text.
+    """
+    name = resolve_backend(backend)
+    if name == "pdfminer":
+        return _normalize(_pdfminer(io.BytesIO(source) if isinstance(source, bytes) else source))
+
+    # A stream can only be read once, and a fallback may need to read it again
+    if hasattr(source, "read"):
+        source = source.read()
+    try:
+        text = _normalize(BACKENDS[name](source))
+        if not looks_garbled(text):
+            return text
+        reason = "garbled"
+    except Exception as e:
+        print(f"PDF backend '{name}' failed, falling back to pdfminer: {e}")
+        reason = "error"
+    PDF_FALLBACKS.inc(backend=name, reason=reason)
+    return _normalize(_pdfminer(io.BytesIO(source) if isinstance(source, bytes) else source))
@@ -1,11 +1,38 @@
-from pdfminer.high_level import extract_text
+import parse_pool
 import re
-import os
-import google.generativeai as genai
+from parsers.skill_taxonomy import SKILL_KEYWORDS
+from text_vectors import text_to_vector, encode_vector
+from near_duplicates import minhash_signature, encode_signature
+from llm_client import generate_text, is_llm_configured, LLMUnavailableError, EXTRACTION_MODEL
+from metrics import stage_timer
+
+# Compiled once at import, so a preloaded master shares them with its forked workers
+_WHITESPACE = re.compile(r'\s+')
+_NON_ASCII = re.compile(r'[^\x00-\x7F]+')
+_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE = re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+_YEARS = re.compile(r'(\d+)\+?\s*(years?|yrs?)')
+_BULLET = re.compile(r'^[-•]\s*')
+# Enhanced grade patterns to catch more formats
+_GRADE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'CGPA\s*[\-:=]?\s*(\d+\.?\d*)\s*[/oO]?\s*10',
+    r'CGPA\s*[\-:=]?\s*(\d+\.?\d*)',
+    r'GPA\s*[\-:=]?\s*(\d+\.?\d*)\s*[/oO]?\s*[14]',
+    r'GPA\s*[\-:=]?\s*(\d+\.?\d*)',
+    r'(\d{2,3}\.\d+)\s*%',
+    r'(\d{2,3})\s*%',
+    r'Percentage\s*[\-:=]?\s*(\d{2,3}\.?\d*)',
+    r'Marks\s*[\-:=]?\s*(\d{2,3}\.?\d*)',
+    r'10th.*?[\-:=]?\s*(\d{2,3}\.?\d*)%?',
+    r'12th.*?[\-:=]?\s*(\d{2,3}\.?\d*)%?',
+    r'X\s*[\-:=]?\s*(\d{2,3}\.?\d*)%?',
+    r'XII\s*[\-:=]?\s*(\d{2,3}\.?\d*)%?',
+    r'Aggregate\s*[\-:=]?\s*(\d{2,3}\.?\d*)',
+)]
 
 def clean_text(text):
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[^\x00-\x7F]+', '', text)
+    text = _WHITESPACE.sub(' ', text)
+    text = _NON_ASCII.sub('', text)
     return text.strip()
 
 def extract_name(text):
@@ -37,31 +64,18 @@ def extract_name(text):
     return "Unknown"
 
 def extract_email(text):
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    match = re.search(email_pattern, text)
+    match = _EMAIL.search(text)
     return match.group(0) if match else None
 
 def extract_phone(text):
-    phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    match = re.search(phone_pattern, text)
+    match = _PHONE.search(text)
     return match.group(0) if match else None
 
 def extract_skills(text):
-    skill_keywords = [
-        'python', 'java', 'javascript', 'react', 'node.js', 'nodejs', 'angular', 'vue',
-        'mongodb', 'sql', 'postgresql', 'mysql', 'redis', 'docker', 'kubernetes',
-        'aws', 'azure', 'gcp', 'git', 'html', 'css', 'typescript', 'c++', 'c#',
-        'django', 'flask', 'fastapi', 'spring', 'express', 'rest', 'api', 'graphql',
-        'machine learning', 'deep learning', 'ai', 'nlp', 'tensorflow', 'pytorch',
-        'pandas', 'numpy', 'scikit-learn', 'data analysis', 'excel', 'powerbi',
-        'agile', 'scrum', 'jira', 'ci/cd', 'jenkins', 'linux', 'bash', 'shell',
-        'elasticsearch', 'kafka', 'rabbitmq', 'microservices', 'oauth', 'jwt'
-    ]
-    
     text_lower = text.lower()
     found_skills = []
     
-    for skill in skill_keywords:
+    for skill in SKILL_KEYWORDS:
         if skill in text_lower:
             found_skills.append(skill.title())
     
@@ -78,27 +92,9 @@ def extract_education(text):
     lines = text.split('\n')
     education_blocks = []
     
-    # Enhanced grade patterns to catch more formats
-    grade_patterns = [
-        r'CGPA\s*[\-:=]?\s*(\d+\.?\d*)\s*[/oO]?\s*10',
-        r'CGPA\s*[\-:=]?\s*(\d+\.?\d*)',
-        r'GPA\s*[\-:=]?\s*(\d+\.?\d*)\s*[/oO]?\s*[14]',
-        r'GPA\s*[\-:=]?\s*(\d+\.?\d*)',
-        r'(\d{2,3}\.\d+)\s*%',
-        r'(\d{2,3})\s*%',
-        r'Percentage\s*[\-:=]?\s*(\d{2,3}\.?\d*)',
-        r'Marks\s*[\-:=]?\s*(\d{2,3}\.?\d*)',
-        r'10th.*?[\-:=]?\s*(\d{2,3}\.?\d*)%?',
-        r'12th.*?[\-:=]?\s*(\d{2,3}\.?\d*)%?',
-        r'X\s*[\-:=]?\s*(\d{2,3}\.?\d*)%?',
-        r'XII\s*[\-:=]?\s*(\d{2,3}\.?\d*)%?',
-        r'Aggregate\s*[\-:=]?\s*(\d{2,3}\.?\d*)',
-    ]
-    
     grades_found = []
-    for pattern in grade_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
+    for pattern in _GRADE_PATTERNS:
+        for match in pattern.finditer(text):
             grades_found.append(match.group(0))
     
     in_education_section = False
@@ -147,8 +143,7 @@ def extract_education(text):
     return "Not specified"
 
 def extract_experience(text):
-    exp_pattern = r'(\d+)\+?\s*(years?|yrs?)'
-    match = re.search(exp_pattern, text.lower())
+    match = _YEARS.search(text.lower())
     
     if match:
         return f"{match.group(1)} years"
@@ -177,7 +172,7 @@ def extract_projects(text):
         
         if in_project_section and line.strip():
             if line.strip().startswith('-') or line.strip().startswith('•'):
-                project_name = re.sub(r'^[-•]\s*', '', line.strip())
+                project_name = _BULLET.sub('', line.strip())
                 projects.append(project_name[:50])
             elif len(line.strip()) < 50 and not any(char.isdigit() for char in line[:3]):
                 projects.append(line.strip())
@@ -188,16 +183,17 @@ def extract_projects(text):
     return projects[:5]
 
 def enhance_education_with_gemini(education_text, full_text):
-    """Use Gemini to extract additional education details if available."""
-    try:
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            return education_text
-        
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        
-        prompt = f"""Extract education details from this resume text. Focus on:
+    """
+    Use Gemini to extract additional education details if available.
+
+    Returns a tuple of (education_text, llm_degraded). llm_degraded is True when
+    Gemini was configured but unavailable, so the regex-only result can be
+    backfilled later.
+    """
+    if not is_llm_configured():
+        return education_text, False
+    
+    prompt = f"""Extract education details from this resume text. Focus on:
 1. Degree names (B.Tech, M.Tech, Bachelor's, Master's, etc.)
 2. Field of study (Computer Science, IT, Engineering, etc.)
 3. CGPA or Percentage scores (be very precise with numbers)
@@ -212,27 +208,32 @@ Resume excerpt:
 Current extracted education: {education_text}
 
 Enhanced education details:"""
-        
-        response = model.generate_content(prompt)
-        enhanced = response.text.strip()
-        
-        # Combine original and enhanced, keeping both
-        if enhanced and len(enhanced) > 20 and enhanced.lower() != 'not specified':
-            return f"{education_text} || Gemini Enhanced: {enhanced}"
-        
-        return education_text
-        
-    except Exception as e:
-        print(f"Gemini enhancement failed: {e}")
-        return education_text
-
-def extract_resume_data(file_path):
-    text = extract_text(file_path)
     
+    try:
+        enhanced = generate_text(EXTRACTION_MODEL, prompt)
+    except LLMUnavailableError as e:
+        print(f"Gemini enhancement skipped, using regex-only education: {e}")
+        return education_text, True
+    
+    # Combine original and enhanced, keeping both
+    if enhanced and len(enhanced) > 20 and enhanced.lower() != 'not specified':
+        return f"{education_text} || Gemini Enhanced: {enhanced}", False
+    
+    return education_text, False
+
+def extract_resume_text(source):
+    """Extract the raw text of a resume PDF, given a path or a binary file-like object."""
+    with stage_timer("parse", "resume_pdf"):
+        return parse_pool.extract_text(source)
+
+def resume_data_from_text(text, use_llm=True):
     education_basic = extract_education(text)
     
     # Try to enhance with Gemini if available
-    education_enhanced = enhance_education_with_gemini(education_basic, text)
+    if use_llm:
+        education_enhanced, llm_degraded = enhance_education_with_gemini(education_basic, text)
+    else:
+        education_enhanced, llm_degraded = education_basic, False
     
     return {
         "name": extract_name(text),
@@ -242,5 +243,11 @@ def extract_resume_data(file_path):
         "education": education_enhanced,
         "experience": extract_experience(text),
         "projects": extract_projects(text),
-        "raw_text": text[:500]
+        "raw_text": text[:500],
+        "llm_degraded": llm_degraded,
+        "text_vector": encode_vector(text_to_vector(text)),
+        "minhash": encode_signature(minhash_signature(text))
     }
+
+def extract_resume_data(file_path):
+    return resume_data_from_text(extract_resume_text(file_path))
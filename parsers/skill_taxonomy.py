@@ -0,0 +1,29 @@
+SKILL_KEYWORDS = [
+    'python', 'java', 'javascript', 'react', 'node.js', 'nodejs', 'angular', 'vue',
+    'mongodb', 'sql', 'postgresql', 'mysql', 'redis', 'docker', 'kubernetes',
+    'aws', 'azure', 'gcp', 'git', 'html', 'css', 'typescript', 'c++', 'c#',
+    'django', 'flask', 'fastapi', 'spring', 'express', 'rest', 'api', 'graphql',
+    'machine learning', 'deep learning', 'ai', 'nlp', 'tensorflow', 'pytorch',
+    'pandas', 'numpy', 'scikit-learn', 'data analysis', 'excel', 'powerbi',
+    'agile', 'scrum', 'jira', 'ci/cd', 'jenkins', 'linux', 'bash', 'shell',
+    'elasticsearch', 'kafka', 'rabbitmq', 'microservices', 'oauth', 'jwt'
+]
+
+# Spellings that name the same skill
+SKILL_ALIASES = {
+    'nodejs': 'node.js',
+    'node': 'node.js',
+    'k8s': 'kubernetes',
+    'postgres': 'postgresql',
+    'golang': 'go',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'power bi': 'powerbi',
+    'sklearn': 'scikit-learn',
+    'ml': 'machine learning'
+}
+
+def canonical_skill(skill):
+    """Normalise a skill name for indexing and lookups, e.g. 'Nodejs' -> 'node.js'."""
+    key = ' '.join(str(skill).lower().split())
+    return SKILL_ALIASES.get(key, key)
@@ -0,0 +1,86 @@
+import asyncio
+import os
+from bson import ObjectId
+from typing import Any, Dict, List, Optional
+from llm_scorer import get_detailed_score, get_detailed_analysis
+from llm_client import is_llm_configured
+
+DEFAULT_TOP_K = int(os.getenv("PIPELINE_TOP_K", "10"))
+DEFAULT_CONCURRENCY = int(os.getenv("PIPELINE_LLM_CONCURRENCY", "4"))
+
+def rank_resumes(resumes: List[Dict[str, Any]], jd_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Stage one: score every resume with the deterministic (regex-only) scorer, best first."""
+    ranked = []
+    for resume in resumes:
+        detailed = get_detailed_score(resume, jd_data, use_llm=False)
+        ranked.append({
+            "resume_id": str(resume.get("_id")),
+            "candidate_name": resume.get("name", "Unknown"),
+            "skills_match": detailed["skills_match"],
+            "experience_relevance": detailed["experience_relevance"],
+            "education_fit": detailed["education_fit"],
+            "overall_fit": detailed["overall_fit"],
+            "semantic_match": detailed["semantic_match"],
+            "is_shortlisted": detailed["is_shortlisted"],
+            "justification": detailed["justification"],
+            "analysis": None
+        })
+    ranked.sort(key=lambda entry: -entry["overall_fit"])
+    for rank, entry in enumerate(ranked, 1):
+        entry["rank"] = rank
+    return ranked
+
+async def analyze_top(ranked: List[Dict[str, Any]], resumes_by_id: Dict[str, Dict[str, Any]], jd_data: Dict[str, Any], top_k: int, concurrency: int) -> int:
+    """
+    Stage two: run the Gemini narrative analysis for the top_k entries only.
+
+    Calls run in worker threads with at most `concurrency` in flight. Returns
+    the number of analyses requested.
+    """
+    if top_k <= 0 or not is_llm_configured():
+        return 0
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def analyze(entry):
+        async with semaphore:
+            entry["analysis"] = await asyncio.to_thread(get_detailed_analysis, resumes_by_id[entry["resume_id"]], jd_data)
+
+    shortlist = ranked[:top_k]
+    await asyncio.gather(*(analyze(entry) for entry in shortlist))
+    return len(shortlist)
+
+async def run_pipeline(jd_id: str, resume_ids: Optional[List[str]] = None, top_k: int = DEFAULT_TOP_K, concurrency: int = DEFAULT_CONCURRENCY) -> Optional[Dict[str, Any]]:
+    """
+    Rank stored resumes against a stored JD, then analyse only the best top_k with the LLM.
+
+    Screens every stored resume unless resume_ids is given. A batch of N
+    resumes costs top_k LLM calls instead of N.
+    """
+    from database import get_database, job_description_to_data, LIST_PROJECTION
+
+    db = get_database()
+    if db is None:
+        return None
+
+    jd_doc = db.job_descriptions.find_one({"_id": ObjectId(jd_id)})
+    if jd_doc is None:
+        return {"job_description": None}
+    jd_data = job_description_to_data(jd_doc)
+
+    query = {"_id": {"$in": [ObjectId(resume_id) for resume_id in resume_ids]}} if resume_ids else {}
+    # The scorer needs text_vector for semantic_match; full_text and the MinHash fields would only bloat the prompts
+    projection = {field: 0 for field in LIST_PROJECTION if field != "text_vector"}
+    resumes = list(db.resumes.find(query, projection))
+    resumes_by_id = {str(resume["_id"]): resume for resume in resumes}
+
+    ranked = await asyncio.to_thread(rank_resumes, resumes, jd_data)
+    analyzed = await analyze_top(ranked, resumes_by_id, jd_data, top_k, concurrency)
+
+    return {
+        "job_description": jd_id,
+        "job_title": jd_data.get("job_title", "Unknown"),
+        "screened": len(ranked),
+        "analyzed": analyzed,
+        "results": ranked
+    }
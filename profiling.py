@@ -0,0 +1,230 @@
+"""
+On-demand profiling of individual requests.
+
+An admin adds `?profile=cpu` (or `?profile=1`) or `?profile=memory` to a
+request and sends the ADMIN_TOKEN in the X-Admin-Token header. CPU profiles
+come from a sampling profiler that walks the stacks of every busy thread at a
+fixed interval. The result is written in the speedscope file format
+(https://www.speedscope.app), one profile per thread. Memory profiles diff
+two tracemalloc snapshots taken around the request.
+
+Unprofiled requests pay only a query-string lookup. One profile runs at a
+time. Both modes observe the whole process, so a request profiled under
+concurrent load also shows the other requests' work. Neither can see into
+other processes, so while a profile is active the parse pool is bypassed
+and PDFs are extracted in-process (without the pool's memory and time
+limits); job workers' extraction is not profiled.
+"""
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "2")) / 1000
+MAX_PROFILES = int(os.getenv("PROFILE_KEEP", "50"))
+MEMORY_TOP = 50
+MODES = {"1": "cpu", "cpu": "cpu", "memory": "memory"}
+
+# Leaf frames of threads that are parked waiting for work; samples ending in them are idle time
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+_busy = threading.Lock()
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+def is_active() -> bool:
+    """Whether a profile is being recorded in this process."""
+    return _busy.locked()
+
+def is_admin(token: Optional[str]) -> bool:
+    """Profiling is disabled unless ADMIN_TOKEN is set."""
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+def profile_mode(value: Optional[str]) -> Optional[str]:
+    return MODES.get(value.lower()) if value else None
+
+class SamplingProfiler:
+    """Samples the Python stacks of all threads from a background thread."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.frames: List[Dict[str, Any]] = []
+        self._frame_ids: Dict[Tuple[str, str, int], int] = {}
+        # thread id -> list of stacks (frame indexes, root first)
+        self.samples: Dict[int, List[List[int]]] = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.duration = 0.0
+
+    def _frame_id(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self._frame_ids.get(key)
+        if index is None:
+            index = self._frame_ids[key] = len(self.frames)
+            self.frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+        return index
+
+    def _sample(self):
+        own = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            leaf = frame.f_code
+            if (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.setdefault(thread_id, []).append(stack)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def to_speedscope(self, name: str) -> Dict[str, Any]:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        profiles = []
+        for thread_id, stacks in sorted(self.samples.items(), key=lambda item: -len(item[1])):
+            profiles.append({
+                "type": "sampled",
+                "name": f"{name} [{names.get(thread_id, thread_id)}]",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(len(stacks) * self.interval, 6),
+                "samples": stacks,
+                "weights": [self.interval] * len(stacks)
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "smart-resume-screener",
+            "activeProfileIndex": 0,
+            "shared": {"frames": self.frames},
+            "profiles": profiles
+        }
+
+class MemoryProfiler:
+    """Diffs tracemalloc snapshots taken before and after the request."""
+
+    def start(self):
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(25)
+        tracemalloc.reset_peak()
+        self._before = tracemalloc.take_snapshot()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        self.duration = time.perf_counter() - self._started
+        self._after = tracemalloc.take_snapshot()
+        self.current, self.peak = tracemalloc.get_traced_memory()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+    def to_report(self, name: str) -> Dict[str, Any]:
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = self._after.filter_traces(ignore).compare_to(self._before.filter_traces(ignore), "traceback")
+        top = []
+        for stat in stats[:MEMORY_TOP]:
+            top.append({
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "count_diff": stat.count_diff,
+                "size_kb": round(stat.size / 1024, 1),
+                "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+            })
+        return {
+            "name": name,
+            "type": "memory",
+            "duration_ms": round(self.duration * 1000, 2),
+            "traced_current_kb": round(self.current / 1024, 1),
+            "traced_peak_kb": round(self.peak / 1024, 1),
+            "top": top
+        }
+
+class RequestProfile:
+    """Context manager profiling one request in the given mode and saving the result."""
+
+    def __init__(self, mode: str, name: str):
+        self.mode = mode
+        self.name = name
+        self.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}-{mode}"
+        self._profiler = SamplingProfiler() if mode == "cpu" else MemoryProfiler()
+
+    def __enter__(self):
+        if not _busy.acquire(blocking=False):
+            raise ProfilerBusyError("Another profile is already running")
+        try:
+            self._profiler.start()
+        except Exception:
+            _busy.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._profiler.stop()
+        finally:
+            _busy.release()
+        self.save()
+        return False
+
+    def save(self) -> Path:
+        if self.mode == "cpu":
+            document = self._profiler.to_speedscope(self.name)
+        else:
+            document = self._profiler.to_report(self.name)
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"{self.profile_id}.json"
+        path.write_text(json.dumps(document))
+        _prune()
+        return path
+
+def _prune():
+    paths = sorted(PROFILE_DIR.glob("*.json"), key=lambda path: path.stat().st_mtime)
+    for path in paths[:-MAX_PROFILES] if MAX_PROFILES > 0 else []:
+        path.unlink(missing_ok=True)
+
+def list_profiles() -> List[Dict[str, Any]]:
+    if not PROFILE_DIR.exists():
+        return []
+    profiles = []
+    for path in sorted(PROFILE_DIR.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True):
+        profiles.append({
+            "profile_id": path.stem,
+            "mode": path.stem.rsplit("-", 1)[-1],
+            "size_bytes": path.stat().st_size
+        })
+    return profiles
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """Path of a stored profile; ids are matched against the directory so no path is ever built from input."""
+    for path in PROFILE_DIR.glob("*.json") if PROFILE_DIR.exists() else []:
+        if path.stem == profile_id:
+            return path
+    return None
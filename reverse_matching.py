@@ -0,0 +1,58 @@
+from bson import ObjectId
+from typing import Any, Dict, Optional
+from llm_scorer import get_detailed_score
+
+def find_matching_jds(resume_id: str, min_shared: int = 1, limit: int = 10, exclude_scored: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Rank stored job descriptions for one resume.
+
+    The JD skill index narrows the pool to JDs sharing at least min_shared
+    required skills with the resume. Only that shortlist is run through the
+    full (regex-only) scorer. JDs the resume already has a score for are
+    skipped unless exclude_scored is False.
+    """
+    from database import get_database, get_resume_by_id, job_description_to_data
+    from skill_index import jd_skill_index
+
+    db = get_database()
+    if db is None:
+        return None
+
+    resume = get_resume_by_id(resume_id)
+    if resume is None:
+        return {"resume": None, "candidates": 0, "matches": []}
+
+    jd_skill_index.ensure_loaded(db)
+    shared = jd_skill_index.skill_counts(resume.get("skills", []))
+    candidate_ids = [jd_id for jd_id, count in shared.items() if count >= min_shared]
+
+    if exclude_scored and candidate_ids:
+        scored = {doc["jd_id"] for doc in db.scores.find({"resume_id": resume_id}, {"jd_id": 1})}
+        candidate_ids = [jd_id for jd_id in candidate_ids if jd_id not in scored]
+
+    matches = []
+    for jd_doc in db.job_descriptions.find({"_id": {"$in": [ObjectId(jd_id) for jd_id in candidate_ids]}}):
+        jd_id = str(jd_doc["_id"])
+        detailed = get_detailed_score(resume, job_description_to_data(jd_doc), use_llm=False)
+        matches.append({
+            "jd_id": jd_id,
+            "job_title": jd_doc.get("job_title", "Unknown"),
+            "company": jd_doc.get("company", ""),
+            "shared_skills": shared[jd_id],
+            "skills_match": detailed["skills_match"],
+            "experience_relevance": detailed["experience_relevance"],
+            "education_fit": detailed["education_fit"],
+            "overall_fit": detailed["overall_fit"],
+            "semantic_match": detailed["semantic_match"],
+            "is_shortlisted": detailed["is_shortlisted"],
+            "seniority_level": detailed["seniority_level"],
+            "matched_skills": detailed["details"].get("skills", {}).get("matched", []),
+            "missing_skills": detailed["details"].get("skills", {}).get("missing", [])
+        })
+
+    matches.sort(key=lambda match: -match["overall_fit"])
+    return {
+        "resume": {"_id": resume["_id"], "name": resume.get("name", "Unknown")},
+        "candidates": len(candidate_ids),
+        "matches": matches[:limit]
+    }
@@ -0,0 +1,81 @@
+import numpy as np
+from typing import Any, Dict, List
+from llm_scorer import SHORTLIST_THRESHOLD, CONDITIONAL_SHORTLIST_MARGIN
+
+WEIGHT_KEYS = ('skills', 'experience', 'education')
+SCORE_COLUMNS = ('skills_match', 'experience_relevance', 'education_fit')
+
+def normalize_weights(weights: Dict[str, float]) -> Dict[str, float]:
+    """Validate custom weights and scale them to sum to 1 so scores stay on the 0-10 scale."""
+    unknown = set(weights) - set(WEIGHT_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown weight keys: {', '.join(sorted(unknown))}")
+    values = [float(weights.get(key, 0)) for key in WEIGHT_KEYS]
+    if any(value < 0 for value in values):
+        raise ValueError("Weights must be non-negative")
+    total = sum(values)
+    if total <= 0:
+        raise ValueError("At least one weight must be positive")
+    return {key: value / total for key, value in zip(WEIGHT_KEYS, values)}
+
+def reweight_scores(score_docs: List[Dict[str, Any]], weights: Dict[str, float], threshold: float = SHORTLIST_THRESHOLD) -> Dict[str, Any]:
+    """
+    Recompute overall_fit and is_shortlisted for stored scores under new weights.
+
+    The stored sub-scores are stacked into one matrix, so the whole JD is
+    re-scored with a single matrix-vector product and re-ranked with one sort.
+    The shortlisting rule matches decide_shortlist in llm_scorer. Nothing is
+    written back.
+    """
+    weights = normalize_weights(weights)
+    if not score_docs:
+        return {"weights": weights, "threshold": threshold, "shortlisted": 0, "previously_shortlisted": 0, "scores": []}
+
+    components = np.array([[doc.get(column) or 0 for column in SCORE_COLUMNS] for doc in score_docs], dtype=np.float64)
+    critical_missing = np.array([
+        bool(((doc.get('details') or {}).get('skills') or {}).get('critical_missing'))
+        for doc in score_docs
+    ])
+    previous_fit = np.array([doc.get('overall_fit') or 0 for doc in score_docs], dtype=np.float64)
+
+    overall = components @ np.array([weights[key] for key in WEIGHT_KEYS])
+
+    # Keep the text-similarity share each score was computed with
+    semantic = np.array([doc.get('semantic_match') or 0 for doc in score_docs], dtype=np.float64)
+    semantic_weight = np.array([
+        ((doc.get('details') or {}).get('semantic') or {}).get('weight') or 0
+        for doc in score_docs
+    ], dtype=np.float64)
+    overall = overall * (1 - semantic_weight) + semantic * semantic_weight
+    shortlisted = (overall >= threshold) | ((overall >= threshold - CONDITIONAL_SHORTLIST_MARGIN) & ~critical_missing)
+
+    order = np.argsort(-overall, kind='stable')
+    previous_order = np.argsort(-previous_fit, kind='stable')
+    previous_rank = np.empty(len(score_docs), dtype=np.int64)
+    previous_rank[previous_order] = np.arange(1, len(score_docs) + 1)
+
+    results = []
+    for rank, i in enumerate(order, 1):
+        doc = score_docs[i]
+        results.append({
+            "score_id": str(doc.get('_id')),
+            "resume_id": doc.get('resume_id'),
+            "candidate_name": doc.get('candidate_name'),
+            "skills_match": float(components[i, 0]),
+            "experience_relevance": float(components[i, 1]),
+            "education_fit": float(components[i, 2]),
+            "overall_fit": round(float(overall[i]), 2),
+            "is_shortlisted": bool(shortlisted[i]),
+            "rank": rank,
+            "previous_overall_fit": float(previous_fit[i]),
+            "previous_is_shortlisted": bool(doc.get('is_shortlisted', False)),
+            "previous_rank": int(previous_rank[i])
+        })
+
+    return {
+        "weights": weights,
+        "threshold": threshold,
+        "shortlisted": int(shortlisted.sum()),
+        "previously_shortlisted": sum(1 for doc in score_docs if doc.get('is_shortlisted')),
+        "scores": results
+    }
@@ -0,0 +1,199 @@
+"""
+Offline batch screener.
+
+Screens a directory of resume PDFs against one job description without the API
+server or MongoDB, using every core:
+
+    python -m screener jd.pdf resumes/ -o ranked.csv --jobs 8
+    python -m screener jd.json resumes/ -o ranked.jsonl --no-llm
+
+Each successfully screened resume is appended to a checkpoint file, so an
+interrupted run picks up where it stopped when started again with the same
+arguments. Checkpoint entries are keyed by the job description and scoring
+mode as well as the file, so a run with another JD or with/without the LLM
+rescreens everything; failed resumes are retried on the next run.
+"""
+from dotenv import load_dotenv
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+
+CSV_FIELDS = [
+    "rank", "file", "candidate_name", "email", "phone", "overall_fit", "skills_match",
+    "experience_relevance", "education_fit", "is_shortlisted", "seniority_level",
+    "llm_degraded", "parse_ms", "score_ms", "error", "justification"
+]
+
+_jd_data = None
+
+def _init_worker(jd_data):
+    global _jd_data
+    from llm_client import configure_gemini
+    _jd_data = jd_data
+    configure_gemini()
+
+def _run_key(jd_path, use_llm):
+    """Fingerprint of what the scores depend on besides the file: the job description and the mode."""
+    # The JD file rather than its parsed data, whose skill list comes out in set order
+    digest = hashlib.sha256(b"llm:" if use_llm else b"regex:")
+    digest.update(Path(jd_path).read_bytes())
+    return digest.hexdigest()[:16]
+
+def _file_key(path, root, run_key):
+    stat = path.stat()
+    return f"{run_key}:{path.relative_to(root).as_posix()}:{stat.st_size}:{int(stat.st_mtime)}"
+
+def screen_file(path):
+    """Parse and score one resume against the worker's job description."""
+    from parsers.resume_parser import extract_resume_data
+    from llm_scorer import get_detailed_score
+
+    record = {"file": path, "error": None}
+    try:
+        start = time.perf_counter()
+        resume_data = extract_resume_data(path)
+        parsed = time.perf_counter()
+        detailed_score = get_detailed_score(resume_data, _jd_data)
+        scored = time.perf_counter()
+    except Exception as e:
+        record["error"] = str(e)
+        record["overall_fit"] = 0
+        return record
+
+    record.update({
+        "candidate_name": resume_data.get("name", "Unknown"),
+        "email": resume_data.get("email"),
+        "phone": resume_data.get("phone"),
+        "skills_match": detailed_score["skills_match"],
+        "experience_relevance": detailed_score["experience_relevance"],
+        "education_fit": detailed_score["education_fit"],
+        "overall_fit": detailed_score["overall_fit"],
+        "is_shortlisted": detailed_score["is_shortlisted"],
+        "seniority_level": detailed_score["seniority_level"],
+        "llm_degraded": detailed_score["llm_degraded"],
+        "justification": detailed_score["justification"],
+        "parse_ms": round((parsed - start) * 1000, 1),
+        "score_ms": round((scored - parsed) * 1000, 1)
+    })
+    return record
+
+def load_jd(jd_path):
+    path = Path(jd_path)
+    if path.suffix.lower() == '.json':
+        with open(path) as f:
+            return json.load(f)
+    if path.suffix.lower() == '.pdf':
+        from parsers.jd_parser import extract_jd_data
+        return extract_jd_data(str(path))
+    raise SystemExit("Job description must be a .pdf or .json file")
+
+def load_checkpoint(checkpoint_path):
+    done = {}
+    if not checkpoint_path.exists():
+        return done
+    with open(checkpoint_path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line
+                continue
+            done[record["key"]] = record
+    return done
+
+def write_output(records, output_path):
+    ranked = sorted(records, key=lambda r: (r.get("error") is not None, -(r.get("overall_fit") or 0)))
+    for rank, record in enumerate(ranked, 1):
+        record["rank"] = rank
+
+    if output_path.suffix.lower() == '.jsonl':
+        with open(output_path, "w") as f:
+            for record in ranked:
+                f.write(json.dumps({k: v for k, v in record.items() if k != "key"}) + "\n")
+    else:
+        with open(output_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(ranked)
+    return ranked
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m screener", description="Screen a directory of resumes against a job description")
+    parser.add_argument("jd", help="job description PDF or JSON")
+    parser.add_argument("resumes", help="directory of resume PDFs")
+    parser.add_argument("-o", "--output", default="ranked.csv", help="output file, .csv or .jsonl (default: ranked.csv)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--no-llm", action="store_true", help="skip Gemini and use regex-only parsing and scoring")
+    parser.add_argument("--recursive", action="store_true", help="search the resume directory recursively")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if args.no_llm:
+        os.environ.pop("GEMINI_API_KEY", None)
+
+    root = Path(args.resumes)
+    if not root.is_dir():
+        raise SystemExit(f"Resume directory not found: {root}")
+
+    pattern = "**/*" if args.recursive else "*"
+    files = sorted(p for p in root.glob(pattern) if p.is_file() and p.suffix.lower() == '.pdf')
+    if not files:
+        raise SystemExit(f"No PDF files found in {root}")
+
+    output_path = Path(args.output)
+    checkpoint_path = Path(args.checkpoint or f"{output_path}.checkpoint.jsonl")
+    if args.fresh and checkpoint_path.exists():
+        checkpoint_path.unlink()
+
+    jd_data = load_jd(args.jd)
+    done = load_checkpoint(checkpoint_path)
+
+    # Without a key both modes run regex-only, so they share checkpoint entries
+    run_key = _run_key(args.jd, bool(os.getenv("GEMINI_API_KEY")))
+    keyed = {_file_key(p, root, run_key): p for p in files}
+    records = [done[key] for key in keyed if key in done]
+    pending = {key: path for key, path in keyed.items() if key not in done}
+
+    print(f"Screening {len(pending)} resumes ({len(records)} from checkpoint) for "
+          f"{jd_data.get('job_title', 'Unknown')} with {args.jobs} workers", file=sys.stderr)
+
+    start = time.perf_counter()
+    if pending:
+        with open(checkpoint_path, "a") as checkpoint, \
+                ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker, initargs=(jd_data,)) as pool:
+            futures = {pool.submit(screen_file, str(path)): key for key, path in pending.items()}
+            for count, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                record["key"] = futures[future]
+                record["file"] = str(Path(record["file"]).relative_to(root))
+                # Failures may be transient (Gemini, a locked file), so only successes are kept
+                if record["error"] is None:
+                    checkpoint.write(json.dumps(record) + "\n")
+                    checkpoint.flush()
+                records.append(record)
+                status = record["error"] or f"{record['overall_fit']:.2f}"
+                print(f"[{count}/{len(pending)}] {record['file']}: {status}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    ranked = write_output(records, output_path)
+
+    shortlisted = sum(1 for r in ranked if r.get("is_shortlisted"))
+    errors = sum(1 for r in ranked if r.get("error"))
+    rate = len(pending) / elapsed if elapsed > 0 and pending else 0
+    print(f"Wrote {len(ranked)} results to {output_path} ({shortlisted} shortlisted, {errors} errors, "
+          f"{rate:.1f} resumes/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+from parsers.resume_parser import extract_resume_text, resume_data_from_text
+from near_duplicates import minhash_signature
+from llm_scorer import get_detailed_score
+from typing import Dict, Any
+
+def _response(score_id, resume_id, jd_id, candidate_name, jd_data, score, near_duplicate=None):
+    return {
+        "score_id": score_id,
+        "resume_id": resume_id,
+        "jd_id": jd_id,
+        "candidate_name": candidate_name,
+        "job_title": jd_data.get('job_title', 'Not specified'),
+        "skills_match": score["skills_match"],
+        "experience_relevance": score["experience_relevance"],
+        "education_fit": score["education_fit"],
+        "overall_fit": score["overall_fit"],
+        "semantic_match": score.get("semantic_match"),
+        "is_shortlisted": score["is_shortlisted"],
+        "justification": score["justification"],
+        "llm_degraded": score.get("llm_degraded", False),
+        "near_duplicate_of": near_duplicate[0]["_id"] if near_duplicate else None,
+        "duplicate_similarity": round(near_duplicate[1], 3) if near_duplicate else None
+    }
+
+def screen_resume(resume_source, resume_filename: str, jd_id: str, jd_data: Dict[str, Any], jd_filename: str) -> Dict[str, Any]:
+    """
+    Parse one resume, score it against a stored job description and persist both.
+
+    resume_source may be a file path or a binary file-like object. Returns the
+    same fields the scoring endpoints send back to the client.
+
+    The MinHash signature of the extracted text is checked against stored
+    resumes before any Gemini call. A near-duplicate reuses the stored resume
+    and, if it was already scored for this JD, the stored score;
+    near_duplicate_of is then set in the response.
+    """
+    from database import save_resume, save_score, find_near_duplicate_resume, get_score_for_pair
+
+    text = extract_resume_text(resume_source)
+    duplicate = find_near_duplicate_resume(minhash_signature(text))
+
+    if duplicate is not None:
+        resume_data = duplicate[0]
+        resume_id = resume_data["_id"]
+        existing = get_score_for_pair(resume_id, jd_id)
+        if existing is not None:
+            return _response(existing["_id"], resume_id, jd_id, existing.get("candidate_name", "Unknown"), jd_data, existing, duplicate)
+    else:
+        resume_data = resume_data_from_text(text)
+        resume_id = save_resume(resume_data, resume_filename, full_text=text)
+
+    detailed_score = get_detailed_score(resume_data, jd_data)
+
+    score_data = dict(detailed_score)
+    score_data["name"] = resume_data.get('name', 'Unknown')
+    score_data["job_title"] = jd_data.get('job_title', 'Not specified')
+
+    score_id = save_score(resume_id, jd_id, score_data, resume_filename, jd_filename)
+
+    return _response(score_id, resume_id, jd_id, resume_data.get('name', 'Unknown'), jd_data, detailed_score, duplicate)
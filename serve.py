@@ -0,0 +1,130 @@
+"""
+Preforking API server: load everything once, then fork the workers.
+
+    python serve.py --workers 4 --host 0.0.0.0 --port 8000
+
+`uvicorn main:app --workers N` starts every worker from scratch, so each one
+imports FastAPI, numpy, pymongo and the parsers by itself. Here the master
+imports the app and every module the endpoints load lazily, freezes the
+result out of the garbage collector and forks the workers, which share
+those pages copy-on-write and start serving almost at once.
+
+Anything that opens connections, threads or processes (MongoDB, the job
+workers, the parse pool) is left to each worker's lifespan, after the fork.
+Metrics are per worker, as with uvicorn's own --workers.
+"""
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Imported inside endpoint functions, so uvicorn workers would each load them on their first request
+PRELOAD_MODULES = [
+    "database", "jobs", "matrix_scoring", "pipeline", "reverse_matching",
+    "reweight", "screening", "archive_ingest", "parse_pool"
+]
+
+def preload():
+    """Import the app with everything it loads lazily; nothing here may start a thread or open a socket."""
+    import main
+    for module in PRELOAD_MODULES:
+        importlib.import_module(module)
+    from parsers.pdf_text import preload_modules
+    for module in preload_modules():
+        importlib.import_module(module)
+    if os.getenv("GEMINI_API_KEY"):
+        import llm_client
+        llm_client._genai()
+    return main.app
+
+def bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock: socket.socket, log_level: str):
+    import uvicorn
+    gc.enable()
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level))
+    server.run(sockets=[sock])
+
+def fork_worker(app, sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app, sock, log_level)
+        except BaseException as e:
+            print(f"Worker {os.getpid()} failed: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python serve.py")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        raise SystemExit("serve.py needs os.fork; use `uvicorn main:app --workers N` on this platform")
+
+    # The workers share one socket, so each warms up before it accepts connections (see warmup.py)
+    os.environ.setdefault("WARMUP_MODE", "blocking")
+    start = time.perf_counter()
+    # Objects allocated while preloading stay out of the collector: a collection would touch
+    # (and so copy) every shared page in each worker
+    gc.disable()
+    app = preload()
+    gc.collect()
+    gc.freeze()
+    print(f"Preloaded in {time.perf_counter() - start:.2f}s, forking {args.workers} workers")
+
+    sock = bind(args.host, args.port)
+    workers = {fork_worker(app, sock, args.log_level) for _ in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+            workers.add(fork_worker(app, sock, args.log_level))
+            time.sleep(0.1)
+    sock.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
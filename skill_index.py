@@ -0,0 +1,134 @@
+import numpy as np
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from parsers.skill_taxonomy import canonical_skill
+
+TTL_SECONDS = float(os.getenv("SKILL_INDEX_TTL_SECONDS", "300"))
+
+def _bits_to_slots(bitmap: int) -> np.ndarray:
+    """Positions of the set bits of a Python int bitmap, in ascending order."""
+    if not bitmap:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little'))
+
+class SkillIndex:
+    """
+    Inverted index from canonical skill to document ids.
+
+    Each document gets a dense slot number and each skill a bitmap (a Python int
+    with bit `slot` set for every document that has the skill), so AND/OR
+    queries over several skills are single big-integer operations. Slots of
+    removed documents are cleared from every bitmap and not reused until the
+    index is rebuilt.
+    """
+
+    def __init__(self, collection: str, field: str):
+        self.collection = collection
+        self.field = field
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._slots: Dict[str, int] = {}
+        self._doc_ids: List[Optional[str]] = []
+        self._doc_skills: Dict[str, set] = {}
+        self._bitmaps: Dict[str, int] = {}
+        self._live = 0
+        self.loaded_at = None
+
+    def _add(self, doc_id: str, skills: Iterable[str]):
+        if doc_id in self._slots:
+            self._remove(doc_id)
+        slot = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._slots[doc_id] = slot
+        keys = {canonical_skill(skill) for skill in skills if skill}
+        self._doc_skills[doc_id] = keys
+        bit = 1 << slot
+        for key in keys:
+            self._bitmaps[key] = self._bitmaps.get(key, 0) | bit
+        self._live += 1
+
+    def _remove(self, doc_id: str) -> bool:
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return False
+        self._doc_ids[slot] = None
+        mask = ~(1 << slot)
+        for key in self._doc_skills.pop(doc_id, ()):
+            bitmap = self._bitmaps[key] & mask
+            if bitmap:
+                self._bitmaps[key] = bitmap
+            else:
+                del self._bitmaps[key]
+        self._live -= 1
+        return True
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < TTL_SECONDS
+
+    def load(self, db):
+        """Rebuild the index from MongoDB."""
+        # Slots follow insertion order (ObjectIds grow with time), which search() relies on for newest first
+        cursor = db[self.collection].find({}, {self.field: 1}).sort("_id", 1)
+        with self._lock:
+            self._reset()
+            for doc in cursor:
+                self._add(str(doc["_id"]), doc.get(self.field) or [])
+            self.loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db):
+        if not self.loaded:
+            self.load(db)
+
+    def add(self, doc_id: str, skills: Iterable[str]):
+        """Index a new or updated document. A no-op until the index has been loaded."""
+        with self._lock:
+            if self.loaded_at is not None:
+                self._add(doc_id, skills)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            if self.loaded_at is not None:
+                self._remove(doc_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._reset()
+
+    def bitmap(self, skills: Iterable[str], mode: str = 'all') -> int:
+        keys = [canonical_skill(skill) for skill in skills if str(skill).strip()]
+        if not keys:
+            return 0
+        with self._lock:
+            bitmaps = [self._bitmaps.get(key, 0) for key in keys]
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result = result & bitmap if mode == 'all' else result | bitmap
+        return result
+
+    def search(self, skills: Iterable[str], mode: str = 'all') -> List[str]:
+        """Document ids having all (AND) or any (OR) of the skills, newest first."""
+        with self._lock:
+            slots = _bits_to_slots(self.bitmap(skills, mode))
+            return [self._doc_ids[slot] for slot in slots[::-1] if self._doc_ids[slot] is not None]
+
+    def skill_counts(self, skills: Iterable[str]) -> Dict[str, int]:
+        """For each document sharing at least one of the skills, how many of them it has."""
+        keys = {canonical_skill(skill) for skill in skills if str(skill).strip()}
+        with self._lock:
+            counts = np.zeros(len(self._doc_ids), dtype=np.int32)
+            for key in keys:
+                counts[_bits_to_slots(self._bitmaps.get(key, 0))] += 1
+            return {self._doc_ids[slot]: int(counts[slot]) for slot in np.flatnonzero(counts)
+                    if self._doc_ids[slot] is not None}
+
+    def __len__(self):
+        return self._live
+
+resume_skill_index = SkillIndex("resumes", "skills")
+jd_skill_index = SkillIndex("job_descriptions", "required_skills")
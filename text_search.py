@@ -0,0 +1,186 @@
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from bson import ObjectId
+from text_vectors import STOP_WORDS
+
+INDEX_PATH = os.getenv("TEXT_SEARCH_PATH", "text_index.sqlite3")
+# Parsed fields a resume stored without full_text is indexed from
+PARSED_TEXT_FIELDS = ("name", "skills", "education", "experience", "projects")
+BACKFILL_BATCH = 500
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so stored and indexed text does not carry PDF layout."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(normalize_text(text).encode("utf-8"), 6)
+
+def decompress_text(data: Optional[bytes]) -> str:
+    return zlib.decompress(bytes(data)).decode("utf-8") if data else ""
+
+def _strings(value) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+def stored_text(doc: Dict[str, Any]) -> str:
+    """The indexable text of a stored resume: its full text, or the parsed fields for resumes stored without it."""
+    if doc.get("full_text"):
+        return decompress_text(doc["full_text"])
+    return " ".join(_strings([doc.get(field) for field in PARSED_TEXT_FIELDS]))
+
+def build_match_query(q: str, mode: str = "all") -> Optional[str]:
+    """
+    Turn free text into an FTS5 query.
+
+    Every term is quoted, so user input can never be read as FTS5 syntax
+    (column filters, NEAR, etc.). Terms are combined with AND or OR.
+    Repeated terms and stop words are dropped: stop words occur in nearly
+    every resume, get no BM25 weight, and would make FTS5 score almost the
+    whole corpus. A query of only stop words matches nothing.
+    """
+    terms = list(dict.fromkeys(term for term in _TERM.findall(q.lower()) if term not in STOP_WORDS))
+    if not terms:
+        return None
+    joiner = " AND " if mode == "all" else " OR "
+    return joiner.join(f'"{term}"' for term in terms)
+
+class TextSearchIndex:
+    """
+    On-disk BM25 full-text index over resume text, backed by SQLite FTS5.
+
+    FTS5 keeps the inverted index in the SQLite file and ranks with BM25, so
+    a query reads only the posting lists of its terms. Documents are added and
+    removed one at a time as resumes are saved and deleted. WAL mode lets
+    several API and worker processes share the file.
+    """
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS docs (rowid INTEGER PRIMARY KEY, resume_id TEXT UNIQUE NOT NULL)")
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS resume_text USING fts5(body, tokenize='porter unicode61')")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _add(self, conn, resume_id: str, text: str):
+        self._remove(conn, resume_id)
+        cursor = conn.execute("INSERT INTO docs (resume_id) VALUES (?)", (resume_id,))
+        conn.execute("INSERT INTO resume_text (rowid, body) VALUES (?, ?)", (cursor.lastrowid, normalize_text(text)))
+
+    def _remove(self, conn, resume_id: str):
+        row = conn.execute("SELECT rowid FROM docs WHERE resume_id = ?", (resume_id,)).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM resume_text WHERE rowid = ?", row)
+            conn.execute("DELETE FROM docs WHERE rowid = ?", row)
+
+    def add(self, resume_id: str, text: str):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._add(conn, resume_id, text)
+
+    def add_many(self, documents: Iterable[Tuple[str, str]]):
+        """Index (resume_id, text) pairs in a single transaction."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for resume_id, text in documents:
+                    self._add(conn, resume_id, text)
+
+    def remove(self, resume_id: str):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._remove(conn, resume_id)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM resume_text")
+                conn.execute("DELETE FROM docs")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def ensure_built(self, db):
+        """
+        Bring the index in line with MongoDB when their counts differ: index
+        every stored resume it is missing (the file is new or was lost, or the
+        resume was stored before the index existed) and drop deleted ones.
+        Every resume gets a row, even with no text, so the counts then match.
+        The newest resume is checked as well, so a deletion and a missed
+        insert cannot cancel out.
+        """
+        with self._lock:
+            conn = self._connect()
+            count = conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            newest = db.resumes.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+            if count == db.resumes.estimated_document_count() and (
+                newest is None or conn.execute("SELECT 1 FROM docs WHERE resume_id = ?", (str(newest["_id"]),)).fetchone()
+            ):
+                return
+            indexed = {row[0] for row in conn.execute("SELECT resume_id FROM docs")}
+        stored = {str(doc["_id"]) for doc in db.resumes.find({}, {"_id": 1})}
+
+        missing = [ObjectId(resume_id) for resume_id in stored - indexed]
+        projection = {field: 1 for field in ("full_text",) + PARSED_TEXT_FIELDS}
+        for start in range(0, len(missing), BACKFILL_BATCH):
+            cursor = db.resumes.find({"_id": {"$in": missing[start:start + BACKFILL_BATCH]}}, projection)
+            self.add_many((str(doc["_id"]), stored_text(doc)) for doc in cursor)
+        for resume_id in indexed - stored:
+            self.remove(resume_id)
+
+    def search(self, q: str, mode: str = "all", skip: int = 0, limit: Optional[int] = 20) -> Tuple[int, List[Tuple[str, float, str]]]:
+        """
+        Rank resumes for a free-text query with BM25.
+
+        Returns (total_matches, page) where page holds (resume_id, score,
+        snippet) tuples, best first. Higher scores are better. limit=None
+        returns every match.
+        """
+        match = build_match_query(q, mode)
+        if match is None:
+            return 0, []
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute("SELECT COUNT(*) FROM resume_text WHERE resume_text MATCH ?", (match,)).fetchone()[0]
+            rows = conn.execute(
+                """
+                SELECT docs.resume_id, -bm25(resume_text), snippet(resume_text, 0, '[', ']', '...', 12)
+                FROM resume_text JOIN docs ON docs.rowid = resume_text.rowid
+                WHERE resume_text MATCH ?
+                ORDER BY rank
+                LIMIT ? OFFSET ?
+                """,
+                (match, -1 if limit is None else limit, skip)
+            ).fetchall()
+        return total, [(resume_id, round(score, 4), snippet) for resume_id, score, snippet in rows]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+resume_text_index = TextSearchIndex(INDEX_PATH)
@@ -0,0 +1,142 @@
+import base64
+import os
+import re
+import threading
+import zlib
+import numpy as np
+from typing import Iterable, Optional, Union
+
+VECTOR_DIM = int(os.getenv("TEXT_VECTOR_DIM", "512"))
+SIMILARITY_BATCH_SIZE = int(os.getenv("TEXT_VECTOR_BATCH_SIZE", "4096"))
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the this to was were will with
+we you your they their he she his her i me my us who which what when where how all any can also into
+not no but if than then there these those such so up out about over per via etc using used use
+""".split())
+
+VectorLike = Union[np.ndarray, bytes, str]
+
+def tokenize(text: str):
+    words = [word for word in TOKEN_PATTERN.findall(text.lower()) if len(word) > 1 and word not in STOP_WORDS]
+    # Adjacent word pairs keep a little phrase information ("machine learning" vs "machine", "learning")
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+def _bucket(term: str, dim: int):
+    # crc32 rather than hash() so vectors are stable across processes and restarts
+    h = zlib.crc32(term.encode("utf-8"))
+    return h % dim, 1.0 if h & 0x80000000 else -1.0
+
+def text_to_vector(text: str, dim: int = VECTOR_DIM) -> np.ndarray:
+    """
+    Hashed term-frequency vector for a document.
+
+    Terms are hashed into dim buckets with a sign bit (so collisions tend to
+    cancel rather than add up) and weighted by sublinear tf, 1 + log(tf). IDF
+    is applied at comparison time because it changes as the corpus grows.
+    """
+    counts = {}
+    for term in tokenize(text or ""):
+        counts[term] = counts.get(term, 0) + 1
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for term, count in counts.items():
+        bucket, sign = _bucket(term, dim)
+        vector[bucket] += sign * (1.0 + np.log(count))
+    return vector
+
+def vector_to_bytes(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+def encode_vector(vector: np.ndarray) -> str:
+    """JSON-safe form used in parser output."""
+    return base64.b64encode(vector_to_bytes(vector)).decode("ascii")
+
+def decode_vector(value: Optional[VectorLike]) -> Optional[np.ndarray]:
+    """Accept a vector as an array, raw float32 bytes (MongoDB) or base64 (parser output)."""
+    if value is None:
+        return None
+    if isinstance(value, np.ndarray):
+        vector = value.astype(np.float32, copy=False)
+    else:
+        raw = base64.b64decode(value) if isinstance(value, str) else bytes(value)
+        vector = np.frombuffer(raw, dtype="<f4")
+    if vector.shape != (VECTOR_DIM,):
+        # Stored with a different TEXT_VECTOR_DIM; not comparable
+        return None
+    return vector
+
+class CorpusStats:
+    """
+    Document frequency per hash bucket over every stored resume and JD.
+
+    Loaded from MongoDB when the database connects and updated in place on
+    every save and delete in this process. With no statistics (offline use)
+    every bucket gets the same weight and similarity is plain tf cosine.
+    """
+
+    def __init__(self, dim: int = VECTOR_DIM):
+        self._lock = threading.Lock()
+        self.dim = dim
+        self.documents = 0
+        self.df = np.zeros(dim, dtype=np.int64)
+        self._idf = None
+
+    def load(self, documents: int, df: dict):
+        with self._lock:
+            self.documents = int(documents)
+            self.df = np.zeros(self.dim, dtype=np.int64)
+            for bucket, count in (df or {}).items():
+                if int(bucket) < self.dim:
+                    self.df[int(bucket)] = count
+            self._idf = None
+
+    def add(self, vector: np.ndarray, sign: int = 1):
+        with self._lock:
+            self.documents += sign
+            self.df[np.flatnonzero(vector)] += sign
+            self._idf = None
+
+    def reset(self):
+        self.load(0, {})
+
+    def idf(self) -> np.ndarray:
+        with self._lock:
+            if self._idf is None:
+                if self.documents <= 0:
+                    self._idf = np.ones(self.dim, dtype=np.float32)
+                else:
+                    self._idf = (np.log((1.0 + self.documents) / (1.0 + self.df)) + 1.0).astype(np.float32)
+            return self._idf
+
+corpus_stats = CorpusStats()
+
+def _weighted_unit_rows(matrix: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    weighted = matrix * idf
+    norms = np.linalg.norm(weighted, axis=-1, keepdims=True)
+    return np.divide(weighted, norms, out=np.zeros_like(weighted), where=norms > 0)
+
+def cosine_similarities(query: np.ndarray, vectors: Iterable[np.ndarray], batch_size: int = SIMILARITY_BATCH_SIZE) -> np.ndarray:
+    """TF-IDF cosine similarity of one vector against many, computed in batches of rows."""
+    idf = corpus_stats.idf()
+    query_unit = _weighted_unit_rows(query[None, :], idf)[0]
+    vectors = list(vectors)
+    result = np.zeros(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), batch_size):
+        block = np.stack(vectors[start:start + batch_size])
+        result[start:start + len(block)] = _weighted_unit_rows(block, idf) @ query_unit
+    return result
+
+def similarity_matrix(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """TF-IDF cosine similarity for every row of left against every row of right."""
+    idf = corpus_stats.idf()
+    return _weighted_unit_rows(left, idf) @ _weighted_unit_rows(right, idf).T
+
+def semantic_similarity(resume_vector: Optional[VectorLike], jd_vector: Optional[VectorLike]) -> Optional[float]:
+    """Cosine similarity in [0, 1] between a resume and a JD, or None if either has no vector."""
+    resume_vector = decode_vector(resume_vector)
+    jd_vector = decode_vector(jd_vector)
+    if resume_vector is None or jd_vector is None:
+        return None
+    return max(0.0, float(cosine_similarities(jd_vector, [resume_vector])[0]))
@@ -0,0 +1,79 @@
+"""
+Per-request stage timings.
+
+A RequestTimings collector is bound to the current request through a context
+variable; code anywhere below the endpoint records into it with `timed(name)`
+without passing anything around. Outside a request (workers, CLI) recording
+is a no-op. Timings are exclusive: time spent in a nested timer (a Gemini
+call inside scoring, say) is charged to the inner stage only, so the stages
+add up to the time actually spent.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Stage names of the metrics histogram mapped to the names sent to the browser
+STAGE_NAMES = {"parse": "pdf_extract", "llm": "llm_enhance", "score": "score", "db": "db_write"}
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.totals: Dict[str, float] = {}
+        self._stacks: Dict[int, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[float]:
+        # Work handed to threads (asyncio.to_thread) shares the collector but not the nesting
+        return self._stacks.setdefault(threading.get_ident(), [])
+
+    def enter(self):
+        with self._lock:
+            self._stack().append(0.0)
+
+    def exit(self, name: str, elapsed: float):
+        with self._lock:
+            stack = self._stack()
+            nested = stack.pop() if stack else 0.0
+            self.totals[name] = self.totals.get(name, 0.0) + max(0.0, elapsed - nested)
+            if stack:
+                stack[-1] += elapsed
+
+    def snapshot(self) -> Dict[str, float]:
+        """Milliseconds per stage plus the request total so far."""
+        with self._lock:
+            result = {name: round(seconds * 1000, 2) for name, seconds in self.totals.items()}
+        result["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return result
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.snapshot().items())
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+def current() -> Optional[RequestTimings]:
+    return _current.get()
+
+def snapshot() -> Dict[str, float]:
+    timings = _current.get()
+    return timings.snapshot() if timings is not None else {}
+
+@contextmanager
+def timed(name: str):
+    """Charge the duration of the block to `name` in the current request's timings."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    timings.enter()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.exit(name, time.perf_counter() - start)
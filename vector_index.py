@@ -0,0 +1,373 @@
+import numpy as np
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+from bson import ObjectId
+from text_vectors import VECTOR_DIM, corpus_stats, decode_vector
+
+INDEX_DIR = Path(os.getenv("VECTOR_INDEX_DIR", "vector_index"))
+DEFAULT_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))
+# Rebuild once the unclustered delta grows past this share of the clustered base
+REBUILD_DELTA_RATIO = float(os.getenv("VECTOR_INDEX_REBUILD_RATIO", "0.2"))
+REBUILD_MIN_DELTA = int(os.getenv("VECTOR_INDEX_REBUILD_MIN", "1000"))
+# Superseded versions stay on disk this long, for processes that have not switched yet
+VERSION_GRACE_SECONDS = float(os.getenv("VECTOR_INDEX_GRACE_SECONDS", "600"))
+# Documents whose ObjectId is at most this much older than a build's scan are re-checked after it
+SNAPSHOT_MARGIN_SECONDS = 60
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50000
+ID_BYTES = 24
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+def kmeans(vectors: np.ndarray, n_lists: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on unit vectors; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample = vectors
+    if len(vectors) > KMEANS_SAMPLE:
+        sample = vectors[rng.choice(len(vectors), KMEANS_SAMPLE, replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = assign_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.linalg.norm(sums, axis=1) == 0
+        # Re-seed empty lists with random points so every list stays in use
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _unit_rows(sums)
+    return centroids
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), batch_size):
+        assignment[start:start + batch_size] = np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+    return assignment
+
+class VectorIndex:
+    """
+    Inverted-file (IVF) approximate nearest-neighbour index over text vectors.
+
+    Vectors are IDF-weighted with the corpus statistics of build time and
+    L2-normalised, so inner product is cosine similarity. At build time they
+    are clustered with k-means and stored grouped by cluster; a query scores
+    the centroids and then only the rows of the nprobe closest clusters.
+
+    Each build is written to its own version directory and CURRENT is switched
+    atomically, so readers never see a half-written index. The arrays are
+    memory-mapped on load. Vectors added after the build are appended to a
+    delta file and searched exhaustively; removals are appended to a tombstone
+    file. Both are shared by every process using the same directory, and
+    updates always go to the version CURRENT names. A superseded version is
+    kept for VERSION_GRACE_SECONDS so other processes can finish with it; the
+    build carries its tombstones over and re-checks MongoDB for resumes stored
+    while it was scanning, so no update made during a rebuild is lost.
+    """
+
+    def __init__(self, path: Path = INDEX_DIR):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.version = None
+        self.centroids = None
+        self.vectors = None
+        self.offsets = None
+        self.ids = None
+        self.id_list: List[str] = []
+        self.idf = None
+        self.delta_ids: List[str] = []
+        self.delta_vectors = np.zeros((0, VECTOR_DIM), dtype=np.float32)
+        self.tombstones = set()
+        self._delta_size = 0
+        self._tombstone_size = 0
+
+    # -- on-disk layout -------------------------------------------------
+
+    @property
+    def _current_file(self) -> Path:
+        return self.path / "CURRENT"
+
+    def _version_dir(self, version: str) -> Path:
+        return self.path / version
+
+    def _read_current(self) -> Optional[str]:
+        try:
+            return self._current_file.read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    @property
+    def _record_bytes(self) -> int:
+        return ID_BYTES + 4 * VECTOR_DIM
+
+    # -- build ----------------------------------------------------------
+
+    def build_from(self, ids: List[str], tf_vectors: np.ndarray, idf: Optional[np.ndarray] = None, n_lists: Optional[int] = None) -> str:
+        """Cluster and persist raw TF vectors under a new version, then load it."""
+        idf = corpus_stats.idf() if idf is None else idf
+        vectors = _unit_rows(np.asarray(tf_vectors, dtype=np.float32) * idf)
+        n_lists = n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, max(1, len(vectors)))
+
+        if len(vectors):
+            centroids = kmeans(vectors, n_lists)
+            assignment = assign_lists(vectors, centroids)
+        else:
+            centroids = np.zeros((1, VECTOR_DIM), dtype=np.float32)
+            assignment = np.zeros(0, dtype=np.int64)
+
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=len(centroids)), out=offsets[1:])
+
+        version = f"v{time.time_ns()}"
+        target = self._version_dir(version)
+        target.mkdir(parents=True, exist_ok=True)
+        np.save(target / "centroids.npy", centroids.astype(np.float32))
+        np.save(target / "vectors.npy", vectors[order])
+        np.save(target / "offsets.npy", offsets)
+        np.save(target / "ids.npy", np.array([ids[i] for i in order], dtype=f"S{ID_BYTES}"))
+        np.save(target / "idf.npy", idf.astype(np.float32))
+        (target / "delta.bin").touch()
+        (target / "tombstones.txt").touch()
+
+        previous = self._read_current()
+        tmp = self.path / f"CURRENT.{os.getpid()}.tmp"
+        tmp.write_text(version)
+        os.replace(tmp, self._current_file)
+        if previous is not None:
+            self._carry_tombstones(previous, version, set(ids))
+
+        with self._lock:
+            self._load(version)
+        self._prune_versions(keep=version)
+        return version
+
+    def build(self, db) -> str:
+        """Build from every resume in MongoDB that has a text vector."""
+        snapshot = datetime.now(timezone.utc) - timedelta(seconds=SNAPSHOT_MARGIN_SECONDS)
+        ids, rows = [], []
+        for doc in db.resumes.find({"text_vector": {"$exists": True}}, {"text_vector": 1}):
+            vector = decode_vector(doc.get("text_vector"))
+            if vector is not None:
+                ids.append(str(doc["_id"]))
+                rows.append(vector)
+        matrix = np.stack(rows) if rows else np.zeros((0, VECTOR_DIM), dtype=np.float32)
+        version = self.build_from(ids, matrix)
+
+        # A resume stored while the scan ran may have been added to the old version's delta; CURRENT now
+        # names the new one, so anything stored later goes there directly
+        indexed = set(ids)
+        recent = {"_id": {"$gte": ObjectId.from_datetime(snapshot)}, "text_vector": {"$exists": True}}
+        for doc in db.resumes.find(recent, {"text_vector": 1}):
+            if str(doc["_id"]) not in indexed:
+                self.add(str(doc["_id"]), decode_vector(doc.get("text_vector")))
+        return version
+
+    def _carry_tombstones(self, previous: str, version: str, ids: set):
+        """Copy removals recorded against the superseded version of documents the new base still contains."""
+        try:
+            removed = [doc_id for doc_id in (self._version_dir(previous) / "tombstones.txt").read_text().split() if doc_id in ids]
+        except OSError:
+            return
+        if removed:
+            with open(self._version_dir(version) / "tombstones.txt", "a") as f:
+                f.write("".join(doc_id + "\n" for doc_id in removed))
+
+    def _prune_versions(self, keep: str):
+        """Delete versions superseded more than VERSION_GRACE_SECONDS ago; a version's successor dates its retirement."""
+        current = self._read_current()
+        versions = sorted((child for child in self.path.glob("v*") if child.is_dir()), key=lambda child: int(child.name[1:]))
+        now = time.time_ns()
+        for child, successor in zip(versions, versions[1:]):
+            if child.name in (keep, current) or now - int(successor.name[1:]) < VERSION_GRACE_SECONDS * 1e9:
+                continue
+            for file in child.iterdir():
+                try:
+                    file.unlink()
+                except OSError:
+                    pass
+            try:
+                child.rmdir()
+            except OSError:
+                pass
+
+    # -- load -----------------------------------------------------------
+
+    def _load(self, version: str):
+        directory = self._version_dir(version)
+        self._reset()
+        self.centroids = np.load(directory / "centroids.npy")
+        self.vectors = np.load(directory / "vectors.npy", mmap_mode='r')
+        self.offsets = np.load(directory / "offsets.npy")
+        self.ids = np.load(directory / "ids.npy", mmap_mode='r')
+        self.id_list = [doc_id.decode("ascii") for doc_id in self.ids]
+        self.idf = np.load(directory / "idf.npy")
+        self.version = version
+        self._read_delta()
+
+    def _read_delta(self):
+        """Pick up delta records and tombstones appended since the last read (by any process)."""
+        directory = self._version_dir(self.version)
+        record = self._record_bytes
+        with open(directory / "delta.bin", "rb") as f:
+            f.seek(self._delta_size)
+            data = f.read()
+        complete = len(data) // record * record
+        if complete:
+            raw = np.frombuffer(data[:complete], dtype=np.uint8).reshape(-1, record)
+            self.delta_ids.extend(row[:ID_BYTES].tobytes().decode("ascii") for row in raw)
+            vectors = raw[:, ID_BYTES:].copy().view("<f4")
+            self.delta_vectors = np.concatenate([self.delta_vectors, vectors])
+            self._delta_size += complete
+
+        with open(directory / "tombstones.txt", "rb") as f:
+            f.seek(self._tombstone_size)
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete:
+            self.tombstones.update(line for line in data[:complete].decode("ascii").split())
+            self._tombstone_size += complete
+
+    def load(self) -> bool:
+        version = self._read_current()
+        if version is None:
+            return False
+        with self._lock:
+            try:
+                if version != self.version:
+                    self._load(version)
+                else:
+                    self._read_delta()
+            except FileNotFoundError:
+                # CURRENT named a version that has since been pruned or invalidated
+                self._reset()
+                return False
+        return True
+
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None
+
+    @property
+    def needs_rebuild(self) -> bool:
+        base = 0 if self.vectors is None else len(self.vectors)
+        stale = len(self.delta_ids) + len(self.tombstones)
+        return stale >= REBUILD_MIN_DELTA and stale > base * REBUILD_DELTA_RATIO
+
+    def ensure_loaded(self, db):
+        """Load the persisted index, building it first if there is none or it has drifted too far."""
+        if not self.load() or self.needs_rebuild:
+            self.build(db)
+
+    # -- incremental updates --------------------------------------------
+
+    def _append_current(self, append) -> bool:
+        """
+        Run append(version) against the version CURRENT names, which may be newer
+        than the loaded one; re-read CURRENT and retry once if its directory is gone.
+        A rebuild that switched CURRENT meanwhile gets the record too (search
+        ignores the duplicate).
+        """
+        for attempt in (1, 2):
+            version = self._read_current()
+            if version is None:
+                return False
+            try:
+                append(version)
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+                continue
+            latest = self._read_current()
+            if latest is not None and latest != version:
+                append(latest)
+            return True
+        return False
+
+    def add(self, doc_id: str, tf_vector: Optional[np.ndarray]):
+        """Append a vector to the delta of the persisted index. A no-op before the first build."""
+        if tf_vector is None:
+            return
+
+        def append(version):
+            idf = self.idf if self.version == version else np.load(self._version_dir(version) / "idf.npy")
+            vector = _unit_rows((np.asarray(tf_vector, dtype=np.float32) * idf)[None, :])[0]
+            record = doc_id.encode("ascii").ljust(ID_BYTES)[:ID_BYTES] + vector.astype("<f4").tobytes()
+            # Append mode with an existing file only: a pruned version must not be recreated
+            with open(self._version_dir(version) / "delta.bin", "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                f.write(record)
+
+        with self._lock:
+            self._append_current(append)
+
+    def remove(self, doc_id: str):
+        def append(version):
+            with open(self._version_dir(version) / "tombstones.txt", "r+") as f:
+                f.seek(0, os.SEEK_END)
+                f.write(doc_id + "\n")
+
+        with self._lock:
+            self._append_current(append)
+
+    def invalidate(self):
+        """Forget the persisted index; the next search rebuilds it."""
+        with self._lock:
+            try:
+                self._current_file.unlink()
+            except FileNotFoundError:
+                pass
+            self._reset()
+
+    # -- search ---------------------------------------------------------
+
+    def _query_unit(self, tf_vector: np.ndarray) -> np.ndarray:
+        return _unit_rows((np.asarray(tf_vector, dtype=np.float32) * self.idf)[None, :])[0]
+
+    def _top_k(self, ids: Iterable[str], scores: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        results = []
+        # A resume stored during a rebuild can be in the delta twice (or in the base and the delta)
+        seen = set()
+        for i in np.argsort(-scores, kind='stable'):
+            doc_id = ids[i]
+            if doc_id in self.tombstones or doc_id in seen:
+                continue
+            seen.add(doc_id)
+            results.append((doc_id, float(scores[i])))
+            if len(results) == k:
+                break
+        return results
+
+    def search(self, tf_vector: np.ndarray, k: int = 10, nprobe: int = DEFAULT_NPROBE) -> List[Tuple[str, float]]:
+        """Approximate top-k (doc_id, cosine) for a raw TF query vector."""
+        with self._lock:
+            query = self._query_unit(tf_vector)
+            lists = np.argsort(-(self.centroids @ query))[:max(1, nprobe)]
+            rows = np.concatenate([np.arange(self.offsets[l], self.offsets[l + 1]) for l in lists])
+            scores = np.asarray(self.vectors[rows]) @ query if len(rows) else np.zeros(0, dtype=np.float32)
+            ids = [self.id_list[row] for row in rows]
+            if len(self.delta_ids):
+                ids += self.delta_ids
+                scores = np.concatenate([scores, self.delta_vectors @ query])
+            return self._top_k(ids, scores, k)
+
+    def exact_search(self, tf_vector: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        """Brute-force top-k over every indexed vector, for recall measurements."""
+        with self._lock:
+            query = self._query_unit(tf_vector)
+            scores = np.concatenate([np.asarray(self.vectors) @ query, self.delta_vectors @ query])
+            ids = self.id_list + self.delta_ids
+            return self._top_k(ids, scores, k)
+
+    def __len__(self):
+        base = 0 if self.vectors is None else len(self.vectors)
+        return base + len(self.delta_ids) - len(self.tombstones)
+
+resume_vector_index = VectorIndex(INDEX_DIR)
@@ -0,0 +1,142 @@
+"""
+Worker warm-up and the state behind the /healthz and /readyz probes.
+
+A fresh worker pays for several things on its first requests: the parse
+pool's children importing and running the PDF extractor, the parsers and
+scorer touching their code paths for the first time, Gemini's SDK import
+and model construction, and loading the in-memory search indexes from
+MongoDB. run() does all of that once at startup, with bundled sample PDFs and
+without calling Gemini. /readyz reports ready only once it has finished and,
+when a database is in use, MongoDB is connected and the indexes have been
+loaded, so a load balancer keeps traffic on warm workers. Gemini and the
+indexes are optional: their failures are reported but do not block readiness.
+
+WARMUP_MODE=background (the default) warms up on a thread while the worker
+already answers requests. With "blocking" the worker only starts accepting
+connections once warm. Use that when several workers share one port (serve.py,
+`uvicorn --workers`), since the load balancer cannot probe a particular worker.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+WARMUP_MODE = os.getenv("WARMUP_MODE", "background").lower()
+# How long a blocking warm-up waits for MongoDB before letting the worker serve anyway
+DB_WAIT_SECONDS = float(os.getenv("WARMUP_DB_WAIT_SECONDS", "10"))
+ASSETS_DIR = Path(__file__).with_name("assets")
+SAMPLE_RESUME = ASSETS_DIR / "warmup_resume.pdf"
+SAMPLE_JD = ASSETS_DIR / "warmup_jd.pdf"
+# The API works without these (regex-only parsing, indexes loaded on demand)
+OPTIONAL_STEPS = ("gemini", "indexes")
+
+_steps: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+_finished = threading.Event()
+_database_warm = threading.Event()
+_started_at = time.monotonic()
+
+def _step(name: str, action: Callable[[], Optional[bool]]):
+    """Run one warm-up step and record its outcome; an action returning False was skipped."""
+    start = time.perf_counter()
+    try:
+        result = action()
+        step = {"status": "skipped" if result is False else "ok"}
+    except Exception as e:
+        print(f"Warm-up step '{name}' failed: {e}")
+        step = {"status": "failed", "error": str(e)}
+    step["seconds"] = round(time.perf_counter() - start, 4)
+    with _lock:
+        _steps[name] = step
+
+def _database_expected() -> bool:
+    import database
+    return bool(os.getenv("MONGO_URI")) or database.db_client is not None
+
+def database_connected():
+    """
+    Load the in-memory resume indexes; called once MongoDB is connected.
+
+    The worker counts as connected afterwards even if loading failed, since
+    the indexes are also loaded on demand.
+    """
+    import database
+    from skill_index import resume_skill_index
+    from vector_index import resume_vector_index
+    from near_duplicates import resume_lsh
+    from text_search import resume_text_index
+
+    def _load():
+        db = database.get_database()
+        if db is None:
+            return False
+        resume_skill_index.ensure_loaded(db)
+        resume_lsh.ensure_loaded(db)
+        resume_vector_index.ensure_loaded(db)
+        resume_text_index.ensure_built(db)
+
+    _step("indexes", _load)
+    _database_warm.set()
+
+def run():
+    """Warm this worker up; every step is recorded, and a failed required step keeps the worker unready."""
+    import parse_pool
+    from parsers.resume_parser import resume_data_from_text
+    from parsers.jd_parser import extract_jd_data
+    from llm_scorer import get_detailed_score
+    import llm_client
+
+    samples = {}
+
+    def _pdf():
+        samples["resume_text"] = parse_pool.warm_up(SAMPLE_RESUME)
+        samples["jd"] = extract_jd_data(str(SAMPLE_JD))
+
+    def _parse_and_score():
+        resume = resume_data_from_text(samples["resume_text"], use_llm=False)
+        get_detailed_score(resume, samples["jd"], use_llm=False)
+
+    _step("pdf", _pdf)
+    if "jd" in samples:
+        _step("parse_and_score", _parse_and_score)
+    _step("gemini", lambda: llm_client.warm_up(llm_client.MODELS))
+    if WARMUP_MODE == "blocking" and _database_expected():
+        _database_warm.wait(DB_WAIT_SECONDS)
+    _finished.set()
+
+def start() -> threading.Thread:
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+def _failed(steps: Dict[str, Dict[str, Any]]) -> bool:
+    return any(step["status"] == "failed" for name, step in steps.items() if name not in OPTIONAL_STEPS)
+
+def is_ready() -> bool:
+    with _lock:
+        failed = _failed(_steps)
+    if not _finished.is_set() or failed:
+        return False
+    return _database_warm.is_set() or not _database_expected()
+
+def readiness() -> Dict[str, Any]:
+    """Readiness with the outcome of each warm-up step, as /readyz returns it."""
+    with _lock:
+        steps = {name: dict(step) for name, step in _steps.items()}
+    if is_ready():
+        status = "ready"
+    elif _failed(steps):
+        status = "failed"
+    else:
+        status = "warming"
+    if not _database_expected():
+        database = "not configured"
+    else:
+        database = "connected" if _database_warm.is_set() else "connecting"
+    return {
+        "status": status,
+        "uptime_seconds": round(time.monotonic() - _started_at, 1),
+        "database": database,
+        "steps": steps
+    }
@@ -0,0 +1,50 @@
+"""
+Standalone job worker.
+
+Run one or more of these on any node that can reach MongoDB to scale screening
+horizontally; every worker leases items from the same queue:
+
+    python -m worker --threads 4
+"""
+from dotenv import load_dotenv
+import argparse
+import signal
+import threading
+
+load_dotenv()
+
+def main():
+    from database import get_db_client, close_db_client
+    from llm_client import configure_gemini
+    from jobs import run_worker
+    import os
+    import socket
+
+    parser = argparse.ArgumentParser(description="Smart Resume Screener job worker")
+    parser.add_argument("--threads", type=int, default=1, help="number of worker threads in this process")
+    parser.add_argument("--poll-interval", type=float, default=None, help="seconds to wait when the queue is empty")
+    args = parser.parse_args()
+
+    if get_db_client() is None:
+        raise SystemExit("MongoDB is not reachable, set MONGO_URI")
+    configure_gemini()
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    threads = []
+    for i in range(args.threads):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:thread-{i}"
+        thread = threading.Thread(target=run_worker, args=(worker_id, stop_event, args.poll_interval), name=f"job-worker-{i}")
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(0.5)
+
+    close_db_client()
+
+if __name__ == "__main__":
+    main()